@@ -0,0 +1,781 @@
+#Benchmark
+
+if __name__ == "__main__":
+    # Run as a script: load the modules this file shares a namespace with.
+    import runtime
+
+    runtime.load_modules()
+    runtime.export(globals())
+
+
+def load_page_corpus(corpus_dir: Union[str, Path]) -> List[str]:
+    """Saved pages from a directory of ``.html`` files or snapshot ``.gz`` blobs."""
+    pages = []
+    for path in sorted(Path(corpus_dir).rglob("*")):
+        if path.suffix == ".html":
+            pages.append(path.read_text(encoding="utf-8"))
+        elif path.suffix == ".gz":
+            pages.append(gzip.decompress(path.read_bytes()).decode("utf-8"))
+    return pages
+
+
+def benchmark_parsers(
+    pages: List[str],
+    categories: List[str],
+    backends: Tuple[str, ...] = TeamRankingExtractor.PARSER_BACKENDS,
+    repeat: int = 3,
+) -> Dict[str, Dict[str, Any]]:
+    """Parse throughput and peak memory per backend, checked against bs4."""
+    reference = [
+        TeamRankingExtractor(parser_backend="bs4")._parse_html(page, categories)
+        for page in pages
+    ]
+    results = {}
+    for backend in backends:
+        extractor = TeamRankingExtractor(parser_backend=backend)
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parsed = [extractor._parse_html(page, categories) for page in pages]
+            best = min(best, time.perf_counter() - started)
+
+        tracemalloc.start()
+        for page in pages:
+            extractor._parse_html(page, categories)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        mismatches = sum(1 for got, want in zip(parsed, reference) if got != want)
+        results[backend] = {
+            "pages": len(pages),
+            "pages_per_sec": len(pages) / best if best else float("inf"),
+            "peak_memory_kb": peak / 1024,
+            "mismatches": mismatches,
+        }
+        logging.info(
+            "%s: %.1f pages/sec, peak %.0f KiB, %d mismatches vs bs4",
+            backend,
+            results[backend]["pages_per_sec"],
+            results[backend]["peak_memory_kb"],
+            mismatches,
+        )
+    return results
+
+
+SCENARIOS = {"day": 1, "month": 30, "season": 186}
+FIXTURE_START = "2023-03-30"
+
+
+def fixture_dates(days: int, start: str = FIXTURE_START) -> List[str]:
+    first = datetime.strptime(start, DATE_FORMAT)
+    return [(first + timedelta(days=i)).strftime(DATE_FORMAT) for i in range(days)]
+
+
+def generate_fixtures(
+    root: Union[str, Path],
+    teams: Dict[str, str],
+    categories: List[str],
+    days: int = SCENARIOS["season"],
+    page_kb: int = 40,
+    seed: int = 0,
+) -> Path:
+    """Write synthetic schedule and team stats pages in the fixture layout.
+
+    ``teams`` maps schedule names to URL slugs. Pages follow the markup the
+    parsers read and are padded to roughly ``page_kb`` like the real site.
+    Recorded pages use the same layout: ``schedules/<date>.html`` and
+    ``teams/<slug>.html`` or ``teams/<slug>/<date>.html``.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    (root / "schedules").mkdir(parents=True, exist_ok=True)
+    (root / "teams").mkdir(parents=True, exist_ok=True)
+    names = sorted(teams)
+    filler = "".join(
+        f"<tr><td>Filler Stat {i}</td><td>{i % 97}.{i % 10} (#{i % 30 + 1})</td></tr>"
+        for i in range(page_kb * 1024 // 60)
+    )
+    for date_value in fixture_dates(days):
+        shuffled = rng.sample(names, len(names) - len(names) % 2)
+        links = "".join(
+            f'<tr><td class="text-left nowrap"><a href="/mlb/matchup/{i}">'
+            f"#{rng.randint(1, 30)} {away} at #{rng.randint(1, 30)} {home}"
+            "</a></td></tr>"
+            for i, (away, home) in enumerate(zip(shuffled[::2], shuffled[1::2]))
+        )
+        (root / "schedules" / f"{date_value}.html").write_text(
+            f"<html><body><table>{links}</table></body></html>", encoding="utf-8"
+        )
+    for name in names:
+        rows = "".join(
+            f"<tr><td>{category}</td>"
+            f"<td>{rng.uniform(0, 10):.2f} (#{rng.randint(1, 30)})</td></tr>"
+            for category in categories
+        )
+        (root / "teams" / f"{teams[name]}.html").write_text(
+            f"<html><body><table>{filler}{rows}</table></body></html>",
+            encoding="utf-8",
+        )
+    logging.info("Wrote %d days of fixtures for %d teams to %s", days, len(names), root)
+    return root
+
+
+def export_snapshot_fixtures(
+    store: "SnapshotStore", root: Union[str, Path]
+) -> int:
+    """Copy recorded schedule and team pages from a snapshot store into fixtures."""
+    root = Path(root)
+    exported = 0
+    for entry in store.index.values():
+        url = urlparse(entry["url"])
+        parts = url.path.strip("/").split("/")
+        if parts[:2] == ["mlb", "schedules"]:
+            target = root / "schedules" / f"{entry['date']}.html"
+        elif parts[:2] == ["mlb", "team"] and len(parts) >= 3:
+            target = root / "teams" / parts[2] / f"{entry['date']}.html"
+        else:
+            continue
+        content = store.get(entry["url"], entry["date"])
+        if content is None:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+        exported += 1
+    return exported
+
+
+class StubSite:
+    """Local aiohttp server replaying fixture pages under the real URL paths.
+
+    Every response waits ``latency`` seconds (uniformly jittered by
+    ``jitter``) and fails with a 503 at ``error_rate``, so retries and
+    backpressure are exercised the way the live site does.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.root = Path(root)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.pages: Dict[Path, Optional[str]] = {}
+        self.requests = 0
+        self.errors = 0
+        self.runner = None
+        self.base_url = None
+
+    def _page(self, *candidates: Path) -> Optional[str]:
+        for path in candidates:
+            if path not in self.pages:
+                self.pages[path] = (
+                    path.read_text(encoding="utf-8") if path.exists() else None
+                )
+            if self.pages[path] is not None:
+                return self.pages[path]
+        return None
+
+    async def _respond(self, content: Optional[str]):
+        from aiohttp import web
+
+        self.requests += 1
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503)
+        if content is None:
+            return web.Response(status=404)
+        return web.Response(text=content, content_type="text/html")
+
+    async def _schedule(self, request):
+        date_value = request.query.get("date", "")
+        return await self._respond(
+            self._page(self.root / "schedules" / f"{date_value}.html")
+        )
+
+    async def _team(self, request):
+        slug = request.match_info["slug"]
+        date_value = request.query.get("date", "")
+        return await self._respond(
+            self._page(
+                self.root / "teams" / slug / f"{date_value}.html",
+                self.root / "teams" / f"{slug}.html",
+            )
+        )
+
+    async def __aenter__(self) -> "StubSite":
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/mlb/schedules/", self._schedule)
+        app.router.add_get("/mlb/team/{slug}/stats", self._team)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        host, port = self.runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.runner.cleanup()
+
+
+async def benchmark_scenario(
+    site: StubSite,
+    dates: List[str],
+    categories: List[str],
+    scoring_criteria: Dict[str, float],
+    team_name_mapping: Dict[str, str],
+    out_dir: Union[str, Path],
+    parser_backend: str = "stream",
+    http_options: Optional[Dict[str, Any]] = None,
+    window_days: int = 7,
+) -> Dict[str, Dict[str, Any]]:
+    """Schedule, scrape, score and write one window against the stub site.
+
+    The scrape stage reports page fetches next to the teams, rank windows
+    and games they served, so fetch scaling is visible per scenario.
+    """
+    METRICS.reset()
+    results = {}
+    async with HttpClient(**(http_options or {})) as session:
+        processor = ScheduleProcessor()
+        processor.SCHEDULE_URL = site.base_url + "/mlb/schedules/?date={date}"
+        started = time.perf_counter()
+        schedule = await processor.get_schedule(session, len(dates), dates=dates)
+        elapsed = time.perf_counter() - started
+        matchups = schedule["matchups"]
+        results["schedule"] = {
+            "days": len(dates),
+            "games": len(matchups),
+            "failed_days": len(processor.last_fetch_stats["failed_days"]),
+            "seconds": elapsed,
+            "days_per_sec": len(dates) / elapsed if elapsed else 0.0,
+        }
+
+        resolver = RankResolver(
+            TeamRankingExtractor(parser_backend=parser_backend),
+            categories,
+            list(scoring_criteria),
+            team_name_mapping,
+            window_days=window_days,
+        )
+        resolver.STATS_URL = site.base_url + "/mlb/team/{slug}/stats"
+        started = time.perf_counter()
+        await resolver.resolve_matchups(session, matchups)
+        elapsed = time.perf_counter() - started
+        results["scrape"] = {
+            "pages": resolver.fetch_count,
+            "teams": len({m[side] for m in matchups for side in ("home", "away")}),
+            "windows": len({resolver.as_of_for(m["date"]) for m in matchups}),
+            "games": len(matchups),
+            "window_days": window_days,
+            "resolved": len(resolver.table),
+            "seconds": elapsed,
+            "pages_per_sec": resolver.fetch_count / elapsed if elapsed else 0.0,
+        }
+        results["http"] = {
+            key: dict(value) if isinstance(value, defaultdict) else value
+            for key, value in session.stats.items()
+        }
+
+    paired = [resolver.ranks_for(matchup) for matchup in matchups]
+    home = [ranks["home"] for ranks in paired]
+    away = [ranks["away"] for ranks in paired]
+    projector = PointsProjector(None, None)
+    started = time.perf_counter()
+    for home_ranks, away_ranks in zip(home, away):
+        await projector.calculate_score(home_ranks, away_ranks, scoring_criteria)
+    per_game = time.perf_counter() - started
+    started = time.perf_counter()
+    scores = projector.calculate_scores_batch(home, away, scoring_criteria)
+    batch = time.perf_counter() - started
+    results["score"] = {
+        "games": len(paired),
+        "seconds": per_game,
+        "batch_seconds": batch,
+        "games_per_sec": len(paired) / per_game if per_game else 0.0,
+        "batch_games_per_sec": len(paired) / batch if batch else 0.0,
+    }
+
+    rows = [
+        {
+            "date": matchup["date"],
+            "home": matchup["home"],
+            "away": matchup["away"],
+            "projected": int(score),
+        }
+        for matchup, score in zip(matchups, scores)
+    ]
+    formats = [".csv", ".jsonl"]
+    try:
+        _require_pyarrow()
+        formats.append(".parquet")
+    except DataWriterError:
+        pass
+    for ext in formats:
+        filename = str(Path(out_dir) / f"benchmark{ext}")
+        writer = DataWriter.infer_writer(
+            filename, columnar_options={"fields": list(rows[0]) if rows else []}
+        )
+        started = time.perf_counter()
+        written = writer.write_stream(filename, rows) if rows else 0
+        elapsed = time.perf_counter() - started
+        results[f"write_{ext[1:]}"] = {
+            "rows": written,
+            "seconds": elapsed,
+            "rows_per_sec": written / elapsed if elapsed else 0.0,
+        }
+    results["metrics"] = METRICS.summary()
+    return results
+
+
+async def benchmark_suite(
+    fixtures: Union[str, Path],
+    scenarios: List[str],
+    categories: List[str],
+    scoring_criteria: Dict[str, float],
+    team_name_mapping: Dict[str, str],
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+    parser_backend: str = "stream",
+    http_options: Optional[Dict[str, Any]] = None,
+    window_days: int = 7,
+) -> Dict[str, Any]:
+    """Run each named scenario against one stub site; returns a JSON-able report."""
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "seed": seed,
+            "parser_backend": parser_backend,
+            "window_days": window_days,
+        },
+        "scenarios": {},
+    }
+    async with StubSite(fixtures, latency, jitter, error_rate, seed) as site:
+        with tempfile.TemporaryDirectory() as out_dir:
+            for name in scenarios:
+                report["scenarios"][name] = await benchmark_scenario(
+                    site,
+                    fixture_dates(SCENARIOS[name]),
+                    categories,
+                    scoring_criteria,
+                    team_name_mapping,
+                    out_dir,
+                    parser_backend,
+                    http_options,
+                    window_days,
+                )
+                logging.info("Scenario %s finished", name)
+    return report
+
+
+def compare_results(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2
+) -> List[str]:
+    """Throughput figures that fell more than ``tolerance`` below the baseline."""
+    regressions = []
+    for scenario, stages in current["scenarios"].items():
+        for stage, figures in stages.items():
+            previous = baseline.get("scenarios", {}).get(scenario, {}).get(stage, {})
+            for key, value in figures.items():
+                if not key.endswith("_per_sec") or not previous.get(key):
+                    continue
+                if value < previous[key] * (1 - tolerance):
+                    regressions.append(
+                        f"{scenario}.{stage}.{key}: {value:.1f} vs {previous[key]:.1f}"
+                    )
+    return regressions
+
+
+def _suite_summary(report: Dict[str, Any]) -> str:
+    lines = []
+    for scenario, stages in report["scenarios"].items():
+        for stage, figures in stages.items():
+            rates = {k: v for k, v in figures.items() if k.endswith("_per_sec")}
+            if rates:
+                shown = ", ".join(f"{k}={v:,.1f}" for k, v in rates.items())
+                lines.append(f"{scenario:<8}{stage:<15}{shown}")
+            if stage == "scrape":
+                lines.append(
+                    f"{scenario:<8}{'fetches':<15}pages={figures['pages']} for "
+                    f"{figures['teams']} teams x {figures['windows']} windows, "
+                    f"{figures['games']} games"
+                )
+    return "\n".join(lines)
+
+
+async def benchmark_service(
+    fixtures: Union[str, Path],
+    dates: List[str],
+    categories: List[str],
+    scoring_criteria: Dict[str, float],
+    team_name_mapping: Dict[str, str],
+    clients: int = 16,
+    requests_per_client: int = 50,
+    latency: float = 0.0,
+    seed: int = 0,
+    parser_backend: str = "stream",
+) -> Dict[str, Any]:
+    """Load-test ``ProjectionService`` over HTTP against the stub site.
+
+    The fixture dates are warmed first; then ``clients`` concurrent
+    clients alternate slate and single-matchup requests for random dates.
+    Latency is reported as seen by the clients and by the service.
+    """
+    METRICS.reset()
+    rng = random.Random(seed)
+    async with StubSite(fixtures, latency, seed=seed) as site:
+        async with HttpClient(backoff=0.05) as session:
+            processor = ScheduleProcessor()
+            processor.SCHEDULE_URL = site.base_url + "/mlb/schedules/?date={date}"
+            resolver = RankResolver(
+                TeamRankingExtractor(parser_backend=parser_backend),
+                categories,
+                list(scoring_criteria),
+                team_name_mapping,
+                window_days=1,
+            )
+            resolver.STATS_URL = site.base_url + "/mlb/team/{slug}/stats"
+            service = ProjectionService(
+                session,
+                processor,
+                resolver,
+                PointsProjector(None, None),
+                scoring_criteria,
+                refresh_interval=0,
+            )
+            async with service:
+                started = time.perf_counter()
+                games = await service.refresh(dates)
+                warm_seconds = time.perf_counter() - started
+                address = await service.start(port=0, warm=False)
+                slates = {d: service.slates.get(d) or [] for d in dates}
+                playable = [d for d in dates if slates[d]]
+
+                async def client(requests: List[str]) -> List[float]:
+                    latencies = []
+                    async with aiohttp.ClientSession() as http:
+                        for url in requests:
+                            started = time.perf_counter()
+                            async with http.get(url) as response:
+                                response.raise_for_status()
+                                await response.read()
+                            latencies.append(time.perf_counter() - started)
+                    return latencies
+
+                workload = []
+                for _ in range(clients):
+                    requests = []
+                    for i in range(requests_per_client):
+                        date_value = rng.choice(playable)
+                        if i % 2:
+                            game = rng.choice(slates[date_value])
+                            requests.append(
+                                f"{address}/matchup?date={date_value}"
+                                f"&home={game['home']}&away={game['away']}"
+                            )
+                        else:
+                            requests.append(f"{address}/slate?date={date_value}")
+                    workload.append(requests)
+                started = time.perf_counter()
+                observed = np.concatenate(
+                    await asyncio.gather(*(client(requests) for requests in workload))
+                )
+                elapsed = time.perf_counter() - started
+                server = service.stats()
+    p50, p99 = np.percentile(observed, [50, 99])
+    return {
+        "warm": {"days": len(dates), "games": games, "seconds": warm_seconds},
+        "load": {
+            "clients": clients,
+            "requests": len(observed),
+            "seconds": elapsed,
+            "requests_per_sec": len(observed) / elapsed if elapsed else 0.0,
+            "p50_ms": float(p50) * 1000,
+            "p99_ms": float(p99) * 1000,
+            "max_ms": float(observed.max()) * 1000,
+        },
+        "server": server,
+    }
+
+
+HEAVY_MODULES = ("pandas", "sklearn", "selenium", "bs4", "joblib", "aiohttp", "pyarrow")
+
+
+def _import_times(stderr: str) -> Dict[str, float]:
+    """Cumulative seconds per top-level package from ``-X importtime`` output."""
+    times = defaultdict(float)
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1]) / 1e6
+        except ValueError:
+            continue
+        name = parts[2]
+        # Nested imports are indented under their importer; count roots only.
+        if name.startswith("  "):
+            continue
+        times[name.strip().split(".")[0]] += cumulative
+    return dict(times)
+
+
+def benchmark_startup(argv: List[str], repeat: int = 5) -> Dict[str, Any]:
+    """Cold-start wall time of ``python <argv>`` and what it imported."""
+    wall = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", *argv], capture_output=True, text=True
+        )
+        wall.append(time.perf_counter() - started)
+    imports = _import_times(completed.stderr)
+    errors = [
+        line
+        for line in completed.stderr.splitlines()
+        if not line.startswith("import time:")
+    ]
+    return {
+        "command": " ".join(argv),
+        "returncode": completed.returncode,
+        "stderr": "\n".join(errors[-20:]) if completed.returncode else "",
+        "best_s": min(wall),
+        "median_s": statistics.median(wall),
+        "heavy_imports": sorted(name for name in imports if name in HEAVY_MODULES),
+        "slowest_imports": dict(
+            sorted(imports.items(), key=lambda kv: -kv[1])[:10]
+        ),
+    }
+
+
+def check_startup(
+    results: List[Dict[str, Any]],
+    budget: float,
+    baseline: Optional[List[Dict[str, Any]]] = None,
+    tolerance: float = 0.2,
+) -> List[str]:
+    """Startup failures: over budget, heavy imports on --help, or slower than before."""
+    previous = {result["command"]: result for result in baseline or []}
+    failures = []
+    for result in results:
+        command = result["command"]
+        if result["returncode"]:
+            # A crash is not a startup time; report why instead of timing it.
+            failures.append(
+                f"{command}: exited with {result['returncode']}\n{result['stderr']}"
+            )
+            continue
+        if result["best_s"] > budget:
+            failures.append(f"{command}: {result['best_s']:.3f}s over {budget:.3f}s")
+        if "--help" in command and result["heavy_imports"]:
+            failures.append(
+                f"{command}: imported {', '.join(result['heavy_imports'])}"
+            )
+        before = previous.get(command)
+        if before and result["best_s"] > before["best_s"] * (1 + tolerance):
+            failures.append(
+                f"{command}: {result['best_s']:.3f}s vs {before['best_s']:.3f}s before"
+            )
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parsers_cmd = commands.add_parser("parsers", help="Compare team stats parsers.")
+    parsers_cmd.add_argument("corpus", help="Directory of saved team stats pages.")
+    parsers_cmd.add_argument("--repeat", type=int, default=3)
+    parsers_cmd.add_argument("--output", type=str, help="Write results as JSON.")
+
+    suite_cmd = commands.add_parser(
+        "suite", help="Schedule, scrape, score and write against a local stub site."
+    )
+    suite_cmd.add_argument(
+        "--fixtures",
+        default="fixtures",
+        help="Fixture directory; synthetic pages are generated if it is empty.",
+    )
+    suite_cmd.add_argument(
+        "--snapshot_dir", type=str, help="Export recorded pages from this store first."
+    )
+    suite_cmd.add_argument(
+        "--scenarios", default="day,month,season", help="Comma-separated scenarios."
+    )
+    suite_cmd.add_argument("--latency", type=float, default=0.0, help="Seconds.")
+    suite_cmd.add_argument("--jitter", type=float, default=0.0, help="Seconds.")
+    suite_cmd.add_argument("--error_rate", type=float, default=0.0)
+    suite_cmd.add_argument("--seed", type=int, default=0)
+    suite_cmd.add_argument("--backend", default="stream")
+    suite_cmd.add_argument("--config", default="config.ini")
+    suite_cmd.add_argument("--output", type=str, help="Write results as JSON.")
+    suite_cmd.add_argument("--baseline", type=str, help="Earlier results JSON.")
+    suite_cmd.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed throughput drop."
+    )
+    service_cmd = commands.add_parser(
+        "service", help="Load-test the projection service against a stub site."
+    )
+    service_cmd.add_argument("--fixtures", default="fixtures")
+    service_cmd.add_argument("--snapshot_dir", type=str)
+    service_cmd.add_argument("--days", type=int, default=SCENARIOS["month"])
+    service_cmd.add_argument("--clients", type=int, default=16)
+    service_cmd.add_argument("--requests", type=int, default=50, help="Per client.")
+    service_cmd.add_argument("--latency", type=float, default=0.0, help="Seconds.")
+    service_cmd.add_argument("--seed", type=int, default=0)
+    service_cmd.add_argument("--backend", default="stream")
+    service_cmd.add_argument("--config", default="config.ini")
+    service_cmd.add_argument("--output", type=str, help="Write results as JSON.")
+
+    startup_cmd = commands.add_parser(
+        "startup", help="Cold-start time of CLI commands; fails on regressions."
+    )
+    startup_cmd.add_argument("--script", default="main.py")
+    startup_cmd.add_argument(
+        "--commands",
+        default="--help;backtest --help;write --help",
+        help="Semicolon-separated argument lists to time.",
+    )
+    startup_cmd.add_argument("--repeat", type=int, default=5)
+    startup_cmd.add_argument(
+        "--budget", type=float, default=1.0, help="Max seconds per command."
+    )
+    startup_cmd.add_argument("--output", type=str, help="Write results as JSON.")
+    startup_cmd.add_argument("--baseline", type=str, help="Earlier results JSON.")
+    startup_cmd.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "startup":
+        results = [
+            benchmark_startup([args.script, *shlex.split(command)], args.repeat)
+            for command in args.commands.split(";")
+        ]
+        for result in results:
+            print(
+                f"{result['command']:<36}{result['best_s'] * 1000:>9.1f} ms  "
+                f"heavy: {', '.join(result['heavy_imports']) or '-'}"
+            )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        failures = check_startup(results, args.budget, baseline, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        sys.exit(1 if failures else 0)
+
+    if args.command == "parsers":
+        categories = Config("config.ini").get_categories()
+        results = benchmark_parsers(
+            load_page_corpus(args.corpus), categories, repeat=args.repeat
+        )
+        print(json.dumps(results, indent=2))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        if any(result["mismatches"] for result in results.values()):
+            sys.exit(1)
+        sys.exit(0)
+
+    settings = load_settings(args.config)
+    categories = [
+        category.strip()
+        for category in settings.get("categories", "categories").split(",")
+    ]
+    # Ranks are compared under the lowercased keys validate_ranks produces.
+    scoring_criteria = {
+        key.lower(): float(value) for key, value in settings["scoring_criteria"].items()
+    }
+    team_name_mapping = dict(settings["team_name_mapping"])
+    fixtures = Path(args.fixtures)
+    if args.snapshot_dir:
+        count = export_snapshot_fixtures(SnapshotStore(args.snapshot_dir), fixtures)
+        print(f"Exported {count} recorded pages to {fixtures}")
+    if not (fixtures / "schedules").is_dir():
+        generate_fixtures(
+            fixtures,
+            {name.title(): slug for name, slug in team_name_mapping.items()},
+            categories,
+            seed=args.seed,
+        )
+
+    if args.command == "service":
+        report = asyncio.run(
+            benchmark_service(
+                fixtures,
+                fixture_dates(args.days),
+                categories,
+                scoring_criteria,
+                team_name_mapping,
+                clients=args.clients,
+                requests_per_client=args.requests,
+                latency=args.latency,
+                seed=args.seed,
+                parser_backend=args.backend,
+            )
+        )
+        load = report["load"]
+        print(
+            f"Warmed {report['warm']['games']} games in "
+            f"{report['warm']['seconds']:.2f}s; {load['requests']} requests at "
+            f"{load['requests_per_sec']:,.0f}/s, p50 {load['p50_ms']:.2f} ms, "
+            f"p99 {load['p99_ms']:.2f} ms"
+        )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        sys.exit(0)
+
+    report = asyncio.run(
+        benchmark_suite(
+            fixtures,
+            [name.strip() for name in args.scenarios.split(",")],
+            categories,
+            scoring_criteria,
+            team_name_mapping,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            seed=args.seed,
+            parser_backend=args.backend,
+            http_options={
+                "limit_per_host": settings.getint(
+                    "http", "limit_per_host", fallback=10
+                ),
+                "max_retries": settings.getint("http", "max_retries", fallback=3),
+                "backoff": 0.05,
+            },
+            window_days=settings.getint("ranks", "window_days", fallback=7),
+        )
+    )
+    print(_suite_summary(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_results(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
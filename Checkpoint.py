@@ -0,0 +1,197 @@
+#Checkpoint
+
+class RunCheckpointError(Exception):
+    """Raised when a checkpoint does not belong to the run it is used with."""
+
+
+class RunCheckpoint:
+    """Persisted progress of incremental runs.
+
+    Records which days have been scheduled, scored and written to the
+    output, the projections still waiting on a result, and backtest totals
+    per game date, so a nightly run only has to handle the new days and
+    the rolling metrics cover just the dates of its backtest window.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Union[str, Path], output: str, categories: List[str]):
+        self.path = Path(path)
+        self.output = output
+        self.categories = list(categories)
+        self.state = self._load()
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {
+            "version": self.VERSION,
+            "output": self.output,
+            "categories": self.categories,
+            "days": {},
+            "unsettled": [],
+            "settled": {},
+        }
+
+    def _empty_totals(self) -> Dict[str, Any]:
+        return {
+            "matched": 0,
+            "bets": 0,
+            "wins": 0,
+            "profit": 0.0,
+            "category_hits": [0] * len(self.categories),
+            "category_calls": [0] * len(self.categories),
+        }
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return self._empty_state()
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != self.VERSION:
+            raise RunCheckpointError(f"Unsupported checkpoint version in {self.path}")
+        if state["output"] != self.output or state["categories"] != self.categories:
+            raise RunCheckpointError(
+                f"Checkpoint {self.path} was written for {state['output']} with "
+                f"categories {state['categories']}; start a new checkpoint file."
+            )
+        if state["days"] and not Path(self.output).exists():
+            logging.warning(
+                f"{self.output} is gone; discarding checkpoint {self.path} "
+                "and rebuilding from scratch."
+            )
+            return self._empty_state()
+        return state
+
+    def save(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def has_output(self) -> bool:
+        return any(day["written"] for day in self.state["days"].values())
+
+    def pending(self, dates: List[str]) -> List[str]:
+        """Dates in ``dates`` that have not been written yet."""
+        days = self.state["days"]
+        return [d for d in dates if not days.get(d, {}).get("written")]
+
+    def mark_days(
+        self, dates: List[str], batches: List["DayBatch"], failed: List[str]
+    ) -> None:
+        """Record the days a run finished; failed schedule fetches stay pending."""
+        games = {batch.date: len(batch.projections) for batch in batches}
+        failed = set(failed)
+        for date_value in dates:
+            if date_value in failed:
+                continue
+            self.state["days"][date_value] = {
+                "games": games.get(date_value, 0),
+                "scored": True,
+                "written": True,
+            }
+
+    def settle(
+        self,
+        backtest: "Backtest",
+        projections: List[Dict[str, Any]],
+        category_signals: np.ndarray,
+        actual_results: Optional["pd.DataFrame"],
+        odds: float = -110,
+        window: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Fold games with a final score into the totals of their date.
+
+        New projections join the ones still waiting on a result; those that
+        match a row of ``actual_results`` with both scores known are scored
+        and dropped, the rest (including games whose scores are still NaN)
+        are kept for the next run. Returns ``metrics(window)``.
+        """
+        rows = self.state["unsettled"] + [
+            {**row, "signals": signals}
+            for row, signals in zip(projections, np.asarray(category_signals).tolist())
+        ]
+        if rows and actual_results is not None and len(actual_results):
+            scores = actual_results[["home_score", "away_score"]].to_numpy(np.float64)
+            final = actual_results[np.isfinite(scores).all(axis=1)]
+            index = ScheduleIndex(rows)
+            settled = set()
+            for day in index.days():
+                day_rows = index.on(day)
+                date_value = day_rows[0]["date"]
+                signals = np.array(
+                    [row["signals"] for row in day_rows], dtype=np.int64
+                ).reshape(len(day_rows), len(self.categories))
+                games = [
+                    {k: v for k, v in row.items() if k != "signals"} for row in day_rows
+                ]
+                batch = backtest.evaluate(games, final, signals, self.categories, odds)
+                if not batch["matched"]:
+                    continue
+                self._add_totals(date_value, batch)
+                settled.update(
+                    backtest.last_results[["date", "home", "away"]].itertuples(
+                        index=False, name=None
+                    )
+                )
+            rows = [
+                row
+                for row in rows
+                if (row["date"], row["home"], row["away"]) not in settled
+            ]
+        self.state["unsettled"] = rows
+        return self.metrics(window)
+
+    def _add_totals(self, date_value: str, batch: Dict[str, Any]) -> None:
+        totals = self.state["settled"].setdefault(date_value, self._empty_totals())
+        totals["matched"] += batch["matched"]
+        totals["bets"] += batch["bets"]
+        totals["wins"] += batch["wins"]
+        totals["profit"] += batch["profit"]
+        for i, key in enumerate(self.categories):
+            calls = batch["category_calls"][key]
+            hits = round(batch["category_hit_rates"][key] * calls)
+            totals["category_calls"][i] += calls
+            totals["category_hits"][i] += hits
+
+    def metrics(self, dates: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Rolling metrics over the settled games of ``dates``, like ``evaluate``'s.
+
+        ``dates`` is the run's backtest window; without it every settled
+        date counts.
+        """
+        window = None if dates is None else set(dates)
+        days = {
+            d: day
+            for d, day in self.state["days"].items()
+            if window is None or d in window
+        }
+        totals = self._empty_totals()
+        for date_value, day in self.state["settled"].items():
+            if window is not None and date_value not in window:
+                continue
+            for key in ("matched", "bets", "wins", "profit"):
+                totals[key] += day[key]
+            for key in ("category_hits", "category_calls"):
+                totals[key] = [a + b for a, b in zip(totals[key], day[key])]
+        bets = totals["bets"]
+        calls = np.array(totals["category_calls"])
+        rates = np.divide(
+            np.array(totals["category_hits"]),
+            calls,
+            out=np.zeros(len(self.categories)),
+            where=calls > 0,
+        )
+        return {
+            "days": len(days),
+            "games": sum(day["games"] for day in days.values()),
+            "matched": totals["matched"],
+            "unsettled": len(self.state["unsettled"]),
+            "bets": bets,
+            "wins": totals["wins"],
+            "win_rate": totals["wins"] / bets if bets else 0.0,
+            "profit": totals["profit"],
+            "roi": totals["profit"] / bets if bets else 0.0,
+            "category_hit_rates": dict(zip(self.categories, rates.tolist())),
+            "category_calls": dict(zip(self.categories, calls.tolist())),
+        }
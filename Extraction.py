@@ -1,16 +1,298 @@
 #extraction
+RANK_PATTERN = re.compile(r"\(#(\d+)\)")
+
+
+# Elements html.parser never sees closed; BeautifulSoup closes them at once.
+VOID_TAGS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+
+
+class _Element:
+    """An open element: just enough state to compute bs4's ``.string``."""
+
+    __slots__ = ("tag", "id", "children", "string", "last_was_text")
+
+    def __init__(self, tag: str, element_id: int):
+        self.tag = tag
+        self.id = element_id
+        self.children = 0
+        self.string: Optional[str] = None
+        self.last_was_text = False
+
+
+class StatsRowParser(HTMLParser):
+    """Single streaming pass over a stats page collecting ``(#N)`` ranks.
+
+    Matches ``soup.find("td", string=category).find_next_sibling("td")``
+    exactly without building a tree. Only the first cell whose ``.string``
+    equals a category counts, so a cell with text plus a ``<br>`` never
+    matches, and a category whose first cell has no rank beside it stays
+    missing even if the label repeats later. The rank comes from the next
+    ``td`` with the same parent. The parser keeps a stack of open
+    elements with their child counts; end tags pop to the nearest open
+    element of the same name, like BeautifulSoup's ``html.parser`` builder.
+    Comments and ``<![CDATA[...]]>`` sections are child nodes of their own,
+    and CDATA text counts toward a rank as it does in ``get_text``.
+    """
+
+    def __init__(self, categories: List[str]):
+        super().__init__(convert_charrefs=True)
+        self.wanted = set(categories)
+        self.data: Dict[str, int] = {}
+        # Categories whose first matching cell has been seen.
+        self.found: set = set()
+        self._open: List[_Element] = [_Element("[document]", 0)]
+        self._next_id = 1
+        # id of the parent a rank cell must share -> its category
+        self._pending: Dict[int, str] = {}
+        # id of an open rank cell -> (category, text collected so far)
+        self._ranks: Dict[int, Tuple[str, List[str]]] = {}
+
+    @property
+    def done(self) -> bool:
+        return (
+            len(self.found) == len(self.wanted)
+            and not self._pending
+            and not self._ranks
+        )
+
+    def _add_child(self) -> _Element:
+        parent = self._open[-1]
+        parent.children += 1
+        parent.last_was_text = False
+        return parent
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        parent = self._add_child()
+        if tag in VOID_TAGS:
+            if parent.children == 1:
+                parent.string = None
+            return
+        element = _Element(tag, self._next_id)
+        self._next_id += 1
+        if tag == "td" and parent.id in self._pending:
+            self._ranks[element.id] = (self._pending.pop(parent.id), [])
+        self._open.append(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        for depth in range(len(self._open) - 1, 0, -1):
+            if self._open[depth].tag == tag:
+                break
+        else:
+            return
+        while len(self._open) > depth:
+            self._close(self._open.pop())
+
+    def _close(self, element: _Element) -> None:
+        string = element.string if element.children == 1 else None
+        parent = self._open[-1]
+        if parent.children == 1:
+            parent.string = string
+        if element.id in self._ranks:
+            category, parts = self._ranks.pop(element.id)
+            rank = RANK_PATTERN.search("".join(parts))
+            if rank:
+                self.data[category] = int(rank.group(1))
+            else:
+                logging.warning(f"No rank found for {category}")
+        if element.id in self._pending:
+            category = self._pending.pop(element.id)
+            logging.warning(f"No rank element found for {category}")
+        if element.tag == "td" and string in self.wanted and string not in self.found:
+            self.found.add(string)
+            self._pending[parent.id] = string
+
+    def handle_data(self, data: str) -> None:
+        element = self._open[-1]
+        if element.last_was_text:
+            # Text split across feeds is still one string node.
+            if element.children == 1:
+                element.string += data
+        else:
+            element.children += 1
+            element.last_was_text = True
+            if element.children == 1:
+                element.string = data
+        for _, parts in self._ranks.values():
+            parts.append(data)
+
+    def close(self) -> None:
+        """Flush buffered text and close open elements, as at end of document."""
+        super().close()
+        while len(self._open) > 1:
+            self._close(self._open.pop())
+
+    def handle_comment(self, data: str) -> None:
+        element = self._add_child()
+        if element.children == 1:
+            element.string = data
+
+    def unknown_decl(self, data: str) -> None:
+        # bs4 keeps <![CDATA[...]]> as a text node of its own that get_text
+        # includes; any other marked section is a node it leaves out.
+        cdata = data.upper().startswith("CDATA[")
+        if cdata:
+            data = data[len("CDATA[") :]
+        element = self._add_child()
+        if element.children == 1:
+            element.string = data
+        if cdata:
+            for _, parts in self._ranks.values():
+                parts.append(data)
+
+
+def parse_stats_stream(
+    html_content: str, categories: List[str], chunk_size: int = 65536
+) -> Dict[str, int]:
+    """Extract category ranks in one pass, stopping once all are found."""
+    parser = StatsRowParser(categories)
+    for start in range(0, len(html_content), chunk_size):
+        parser.feed(html_content[start : start + chunk_size])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    for category in categories:
+        if category not in parser.found:
+            logging.warning(f"No category element found for {category}")
+    return parser.data
+
+
+def parse_team_ranks(
+    html_content: str, categories: List[str], backend: str = "bs4"
+) -> Dict[str, int]:
+    """Module-level parse entry point so pool workers can unpickle it."""
+    if backend == "stream":
+        return parse_stats_stream(html_content, categories)
+    return TeamRankingExtractor._parse_html_bs4(html_content, categories)
+
+
+def _timed_call(fn: Callable, *args) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class ParseExecutor:
+    """Runs CPU-bound page parsing in a worker pool off the event loop.
+
+    Fetch coroutines hand raw HTML to ``run`` and keep downloading while
+    workers parse. Queue depth and parse/wait times are tracked so the
+    pool can be sized from ``metrics()``. ``workers`` defaults to the CPU
+    count.
+    """
+
+    def __init__(self, workers: Optional[int] = None, kind: str = "process"):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if kind == "process":
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+        elif kind == "thread":
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+        else:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.parse_times: List[float] = []
+        self.wait_times: List[float] = []
+
+    async def run(self, fn: Callable, *args, stage: Optional[str] = None) -> Any:
+        """``fn(*args)`` in the pool.
+
+        With ``stage`` set, the time ``fn`` ran is recorded under that
+        METRICS stage and the time spent queued under ``<stage>_wait``.
+        """
+        loop = asyncio.get_running_loop()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+        try:
+            result, parse_time = await loop.run_in_executor(
+                self.pool, _timed_call, fn, *args
+            )
+        finally:
+            self.queue_depth -= 1
+        wait_time = time.perf_counter() - submitted - parse_time
+        self.parse_times.append(parse_time)
+        self.wait_times.append(wait_time)
+        if stage is not None:
+            METRICS.observe(stage, parse_time)
+            METRICS.observe(f"{stage}_wait", wait_time)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        parse_times = sorted(self.parse_times)
+        count = len(parse_times)
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "tasks": count,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "parse_total_s": sum(parse_times),
+            "parse_mean_s": sum(parse_times) / count if count else 0.0,
+            "parse_p95_s": parse_times[int(0.95 * (count - 1))] if count else 0.0,
+            "wait_mean_s": sum(self.wait_times) / count if count else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True)
+        logging.info("Parse executor metrics: %s", self.metrics())
+
+    def __enter__(self) -> "ParseExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
 class TeamRankingExtractor:
-    def __init__(self, max_cache_size: int = 100, concurrent_limit: int = 10):
+    PARSER_BACKENDS = ("bs4", "stream")
+
+    def __init__(
+        self,
+        max_cache_size: int = 100,
+        snapshot_store: Optional["SnapshotStore"] = None,
+        parser_backend: str = "bs4",
+        parse_executor: Optional[ParseExecutor] = None,
+    ):
+        if parser_backend not in self.PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser_backend}")
         self.max_cache_size = max_cache_size
         self.ranks_cache = LRUCache(max_cache_size)
-        self._semaphore = asyncio.Semaphore(concurrent_limit)
+        self.snapshot_store = snapshot_store
+        self.parser_backend = parser_backend
+        self.parse_executor = parse_executor
 
     async def _make_request(
-        self, session: aiohttp.ClientSession, url: str, **kwargs
+        self,
+        session: "HttpClient",
+        url: str,
+        as_of: Optional[str] = None,
+        **kwargs,
     ) -> Optional[str]:
         """Make an HTTP request and return the content."""
-        async with session.get(url, **kwargs) as response:
-            return await response.text()
+        if self.snapshot_store is not None:
+            return await self.snapshot_store.fetch(session, url, as_of=as_of, **kwargs)
+        return await session.get_text(url, **kwargs)
 
     async def _handle_errors(self, content: str, url: str) -> Optional[str]:
         """Handle errors and return the content if valid."""
@@ -20,30 +302,42 @@ class TeamRankingExtractor:
         return content
 
     async def _fetch(
-        self, session: aiohttp.ClientSession, url: str, **kwargs
+        self,
+        session: "HttpClient",
+        url: str,
+        as_of: Optional[str] = None,
+        **kwargs,
     ) -> Optional[str]:
-        """Fetch content from a URL, handling errors and concurrency."""
-        async with self._semaphore:
-            logging.debug(f"Starting fetch for URL: {url}")
-            try:
-                content = await self._make_request(session, url, **kwargs)
-                return await self._handle_errors(content, url)
-            except (aiohttp.ClientError, asyncio.TimeoutError, Exception) as e:
-                logging.error(f"Error fetching data from {url}, due to {str(e)}")
-                return None
+        """Fetch content from a URL, handling errors.
+
+        Concurrency, rate limiting and retries belong to the shared client.
+        """
+        logging.debug("Starting fetch for URL: %s", url)
+        try:
+            with METRICS.timer("fetch"):
+                content = await self._make_request(session, url, as_of=as_of, **kwargs)
+            return await self._handle_errors(content, url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, Exception) as e:
+            logging.error(f"Error fetching data from {url}, due to {str(e)}")
+            return None
 
     def _parse_html(self, html_content: str, categories: List[str]) -> Dict[str, int]:
+        with METRICS.timer("parse"):
+            return parse_team_ranks(html_content, categories, self.parser_backend)
+
+    @staticmethod
+    def _parse_html_bs4(html_content: str, categories: List[str]) -> Dict[str, int]:
         soup = BeautifulSoup(html_content, "html.parser")
         data = {}
         for config_category in categories:
             try:
                 category_element = soup.find("td", string=config_category)
                 if category_element:
-                    logging.debug(f"Found category_element for {config_category}")
+                    logging.debug("Found category_element for %s", config_category)
                     rank_element = category_element.find_next_sibling("td")
                     if rank_element:
-                        logging.debug(f"Found rank_element for {config_category}")
-                        rank = re.search(r"\(#(\d+)\)", rank_element.text)
+                        logging.debug("Found rank_element for %s", config_category)
+                        rank = RANK_PATTERN.search(rank_element.text)
                         if rank:
                             data[config_category] = int(rank.group(1))
                         else:
@@ -56,25 +350,52 @@ class TeamRankingExtractor:
                 logging.error(f"Error processing category {config_category}: {str(e)}")
         return data
 
-    def extract(self, html_content: str, categories: List[str]) -> Dict[str, int]:
-        logging.debug(f"Raw HTML content: {html_content[:100]}...")
-
+    def _cached(self, html_content: str) -> Tuple[int, Optional[Dict[str, int]]]:
+        """Cache key of a page and its cached ranks, if any."""
         cache_key = hash(html_content)
         cached_data = self.ranks_cache.get(cache_key)
+        METRICS.cache_lookup("ranks_cache", bool(cached_data))
         if cached_data:
             logging.debug("Cache hit for key: %s", cache_key)
+        return cache_key, cached_data
+
+    def extract(self, html_content: str, categories: List[str]) -> Dict[str, int]:
+        logging.debug("Raw HTML content: %.100s...", html_content)
+
+        cache_key, cached_data = self._cached(html_content)
+        if cached_data:
             return cached_data
 
         data = self._parse_html(html_content, categories)
         self.ranks_cache.put(cache_key, data)
         return data
 
+    async def extract_async(
+        self, html_content: str, categories: List[str]
+    ) -> Dict[str, int]:
+        """``extract`` with parsing handed to the parse executor, if any."""
+        if self.parse_executor is None:
+            return self.extract(html_content, categories)
+
+        cache_key, cached_data = self._cached(html_content)
+        if cached_data:
+            return cached_data
+
+        # Only the parse itself counts as "parse"; queueing is "parse_wait".
+        data = await self.parse_executor.run(
+            parse_team_ranks,
+            html_content,
+            categories,
+            self.parser_backend,
+            stage="parse",
+        )
+        self.ranks_cache.put(cache_key, data)
+        return data
+
     def validate_ranks(
         self, ranks: Dict[str, int], expected_keys: List[str]
     ) -> Dict[str, int]:
-        ranks_lower = {
-            key.lower().replace("%", "").strip(): value for key, value in ranks.items()
-        }
+        ranks_lower = {normalize_category(key): value for key, value in ranks.items()}
         logging.debug("Before validation: %s", ranks)
         missing_keys = [key for key in expected_keys if key not in ranks_lower]
         if missing_keys:
@@ -89,25 +410,212 @@ class TeamRankingExtractor:
 
     async def fetch_and_extract(
         self,
-        session: aiohttp.ClientSession,
+        session: "HttpClient",
         url: str,
         team_name: str,
         categories: List[str],
+        as_of: Optional[str] = None,
     ) -> Dict[str, int]:
-        logging.info(
-            f"Starting fetch and extraction for team {team_name} and URL {url}"
+        logging.debug(
+            "Starting fetch and extraction for team %s and URL %s", team_name, url
         )
-        html_content = await self._fetch(session, url)
+        html_content = await self._fetch(session, url, as_of=as_of)
 
         if not html_content:
             logging.error(f"No HTML content fetched for {url}")
             return {}
 
-        extracted_ranks = self.extract(html_content, categories)
-        logging.info(f"Extracted ranks for {team_name}: {extracted_ranks}")
+        extracted_ranks = await self.extract_async(html_content, categories)
+        logging.debug("Extracted ranks for %s: %s", team_name, extracted_ranks)
 
         return extracted_ranks
 
     def clear_cache(self) -> None:
         self.ranks_cache.cache.clear()
         logging.info("Cache cleared")
+
+
+class RankResolver:
+    """Resolves validated team ranks once per (team slug, rank window).
+
+    Every stage that needs ranks asks the resolver, so a team page is
+    fetched once per window no matter how many games reference it.
+    Windows are ``window_days`` long and start on Mondays for weekly
+    windows (on fixed days counted from 0001-01-01 in general), so every
+    team shares the same as-of dates. A game reads its teams' ranks as of
+    the first day of its window, never later than the game itself; with
+    ``window_days=1`` ranks are taken as of each game date. Fetches then
+    grow with teams x windows instead of teams x game dates. Concurrent
+    requests for the same key share one in-flight future.
+    """
+
+    STATS_URL = "https://www.teamrankings.com/mlb/team/{slug}/stats"
+
+    def __init__(
+        self,
+        extractor: TeamRankingExtractor,
+        categories: List[str],
+        expected_keys: List[str],
+        team_name_mapping: Optional[Dict[str, str]] = None,
+        history: Optional["RankHistory"] = None,
+        window_days: int = 7,
+    ):
+        if window_days < 1:
+            raise ValueError(f"Rank window must be at least one day: {window_days}")
+        self.extractor = extractor
+        self.window_days = window_days
+        self._as_of: Dict[str, str] = {}
+        self.categories = categories
+        self.expected_keys = expected_keys
+        self.team_name_mapping = team_name_mapping or {}
+        self.history = history
+        self.teams = TeamRegistry(self.team_name_mapping)
+        self.schema = CategorySchema(expected_keys)
+        # (team id, window as-of date) -> int8 rank vector in ``schema`` order.
+        self.records: Dict[Tuple[int, str], TeamRanks] = {}
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.fetch_count = 0
+
+    def team_slug(self, team_name: str) -> str:
+        return self.teams.slug(self.teams.id_for(team_name))
+
+    def as_of_for(self, game_date: str) -> str:
+        """First day of the rank window ``game_date`` falls in."""
+        as_of = self._as_of.get(game_date)
+        if as_of is None:
+            ordinal = parse_date(game_date).toordinal()
+            start = ordinal - (ordinal - 1) % self.window_days
+            as_of = date.fromordinal(start).strftime(DATE_FORMAT)
+            self._as_of[game_date] = as_of
+        return as_of
+
+    def key_for(self, team_name: str, game_date: str) -> Tuple[str, str]:
+        return self.team_slug(team_name), self.as_of_for(game_date)
+
+    def _record_key(self, team_name: str, game_date: str) -> Tuple[int, str]:
+        return self.teams.id_for(team_name), self.as_of_for(game_date)
+
+    @property
+    def table(self) -> Dict[Tuple[str, str], Dict[str, int]]:
+        """Resolved ranks as ``{(slug, date): validated rank dict}``."""
+        return {
+            (self.teams.slug(team_id), as_of): record.to_dict(self.schema)
+            for (team_id, as_of), record in self.records.items()
+        }
+
+    def team_url(self, slug: str, as_of: str) -> str:
+        return f"{self.STATS_URL.format(slug=slug)}?date={as_of}"
+
+    async def _load(
+        self, session: "HttpClient", team_name: str, key: Tuple[int, str]
+    ) -> TeamRanks:
+        team_id, as_of = key
+        slug = self.teams.slug(team_id)
+        if self.history is not None:
+            in_history = self.history.has(slug, as_of)
+            METRICS.cache_lookup("rank_history", in_history)
+            if in_history:
+                record = TeamRanks(
+                    team_id,
+                    parse_date(as_of),
+                    self.schema.vector(self.history.as_of(slug, as_of)),
+                )
+                self.records[key] = record
+                return record
+        self.fetch_count += 1
+        ranks = await self.extractor.fetch_and_extract(
+            session, self.team_url(slug, as_of), team_name, self.categories, as_of
+        )
+        validated = self.extractor.validate_ranks(ranks, self.expected_keys)
+        record = TeamRanks(team_id, parse_date(as_of), self.schema.vector(validated))
+        if ranks:
+            self.records[key] = record
+            if self.history is not None:
+                self.history.ingest(slug, as_of, validated)
+        return record
+
+    async def resolve(
+        self, session: "HttpClient", team_name: str, as_of: str
+    ) -> TeamRanks:
+        key = self._record_key(team_name, as_of)
+        record = self.records.get(key)
+        METRICS.cache_lookup("rank_table", record is not None)
+        if record is not None:
+            return record
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(session, team_name, key))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def record_keys(
+        self, matchups: Iterable[Dict[str, str]]
+    ) -> Dict[Tuple[int, str], str]:
+        """Each (team id, window) key ``matchups`` read, with a team name for it."""
+        unique = {}
+        for matchup in matchups:
+            for side in ("home", "away"):
+                key = self._record_key(matchup[side], matchup["date"])
+                unique.setdefault(key, matchup[side])
+        return unique
+
+    async def refetch(
+        self, session: "HttpClient", keys: Dict[Tuple[int, str], str]
+    ) -> None:
+        """Load ``keys`` again while their current records keep being served.
+
+        A record is replaced only by ranks that were actually fetched; a
+        failed fetch leaves the old one in place.
+        """
+        await asyncio.gather(
+            *(self._load(session, team, key) for key, team in keys.items())
+        )
+        if self.history is not None:
+            self.history.flush()
+
+    async def resolve_matchups(
+        self, session: "HttpClient", matchups: List[Dict[str, str]]
+    ) -> Dict[Tuple[int, str], TeamRanks]:
+        """Resolve every unique (team, window) in ``matchups`` concurrently."""
+        unique = self.record_keys(matchups)
+        await asyncio.gather(
+            *(self.resolve(session, team, as_of) for (_, as_of), team in unique.items())
+        )
+        if self.history is not None:
+            self.history.flush()
+        logging.info(
+            f"Resolved ranks for {len(unique)} team-windows across {len(matchups)} "
+            f"games with {self.fetch_count} page fetches"
+        )
+        return self.records
+
+    def ranks_for(self, matchup: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+        """Resolved home/away ranks for a matchup; unresolved teams get -1s."""
+        missing = {key: -1 for key in self.expected_keys}
+        ranks = {}
+        for side in ("home", "away"):
+            record = self.records.get(self._record_key(matchup[side], matchup["date"]))
+            ranks[side] = missing if record is None else record.to_dict(self.schema)
+        return ranks
+
+    def rank_matrices(
+        self, matchups: List[Dict[str, str]], categories: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Home/away (games x categories) matrices straight from rank vectors.
+
+        Same values as ``build_rank_matrix`` over ``ranks_for`` without
+        building a dict per game.
+        """
+        missing = self.schema.empty()
+        vectors = {"home": [], "away": []}
+        for matchup in matchups:
+            for side in ("home", "away"):
+                record = self.records.get(
+                    self._record_key(matchup[side], matchup["date"])
+                )
+                vectors[side].append(missing if record is None else record.ranks)
+        return (
+            self.schema.matrix(vectors["home"], categories),
+            self.schema.matrix(vectors["away"], categories),
+        )
@@ -0,0 +1,197 @@
+#History
+
+class RankHistory:
+    """Columnar on-disk store of daily per-team category ranks.
+
+    Ranks live in a memory-mapped ``(day, team, category)`` int16 array
+    with -1 for a missing rank, the same sentinel ``validate_ranks`` uses.
+    A parallel ``(day, team)`` array holds the index of the latest ingested
+    day on or before each day, so an as-of lookup is two array reads.
+    """
+
+    META_FILE = "meta.json"
+    RANKS_FILE = "ranks.npy"
+    ASOF_FILE = "asof.npy"
+    GROWTH_DAYS = 366
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        teams: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path = self.root / self.META_FILE
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.start = datetime.strptime(meta["start"], DATE_FORMAT).date()
+            self.teams = meta["teams"]
+            self.categories = meta["categories"]
+            self.ranks = np.load(self.root / self.RANKS_FILE, mmap_mode="r+")
+            self.asof = np.load(self.root / self.ASOF_FILE, mmap_mode="r+")
+        else:
+            if not teams or not categories:
+                raise ValueError("A new rank history needs teams and categories.")
+            self.start = None
+            self.teams = list(teams)
+            self.categories = list(categories)
+            self.ranks = None
+            self.asof = None
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.category_index = {key: i for i, key in enumerate(self.categories)}
+
+    @property
+    def days(self) -> int:
+        return 0 if self.ranks is None else self.ranks.shape[0]
+
+    def day_index(self, as_of: Union[str, date]) -> int:
+        if isinstance(as_of, str):
+            as_of = datetime.strptime(as_of, DATE_FORMAT).date()
+        return (as_of - self.start).days
+
+    def _allocate(self, start: date, days: int) -> None:
+        """(Re)create the arrays to cover ``days`` from ``start``, keeping data."""
+        ranks_path = self.root / self.RANKS_FILE
+        asof_path = self.root / self.ASOF_FILE
+        ranks = np.lib.format.open_memmap(
+            ranks_path.with_suffix(".tmp"),
+            mode="w+",
+            dtype=np.int16,
+            shape=(days, len(self.teams), len(self.categories)),
+        )
+        asof = np.lib.format.open_memmap(
+            asof_path.with_suffix(".tmp"),
+            mode="w+",
+            dtype=np.int32,
+            shape=(days, len(self.teams)),
+        )
+        ranks[:] = -1
+        asof[:] = -1
+        if self.ranks is not None:
+            offset = (self.start - start).days
+            ranks[offset : offset + self.days] = self.ranks
+            old_asof = np.asarray(self.asof)
+            asof[offset : offset + self.days] = np.where(
+                old_asof >= 0, old_asof + offset, -1
+            )
+            # Carry the last known row forward into newly added days.
+            asof[offset + self.days :] = asof[offset + self.days - 1]
+        ranks.flush()
+        asof.flush()
+        del ranks, asof
+        self.ranks = self.asof = None
+        os.replace(ranks_path.with_suffix(".tmp"), ranks_path)
+        os.replace(asof_path.with_suffix(".tmp"), asof_path)
+        self.start = start
+        self.ranks = np.load(ranks_path, mmap_mode="r+")
+        self.asof = np.load(asof_path, mmap_mode="r+")
+        self._save_meta()
+
+    def _save_meta(self) -> None:
+        meta = {
+            "start": self.start.strftime(DATE_FORMAT),
+            "teams": self.teams,
+            "categories": self.categories,
+        }
+        with open(self.root / self.META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _ensure_covers(self, as_of: date) -> None:
+        if self.ranks is None:
+            self._allocate(as_of, self.GROWTH_DAYS)
+            return
+        day = self.day_index(as_of)
+        if day < 0:
+            self._allocate(as_of, self.days - day)
+        elif day >= self.days:
+            self._allocate(self.start, day + self.GROWTH_DAYS)
+
+    def ingest(self, team: str, as_of: str, ranks: Dict[str, int]) -> None:
+        """Record one team's ranks for a date and refresh as-of pointers."""
+        if team not in self.team_index:
+            logging.warning(f"Skipping ranks for unknown team {team}")
+            return
+        self._ensure_covers(datetime.strptime(as_of, DATE_FORMAT).date())
+        day = self.day_index(as_of)
+        t = self.team_index[team]
+        row = np.full(len(self.categories), -1, dtype=np.int16)
+        for key, value in ranks.items():
+            c = self.category_index.get(key)
+            if c is not None:
+                row[c] = value
+        self.ranks[day, t] = row
+
+        later = self.asof[day + 1 :, t]
+        own_rows = np.flatnonzero(later == np.arange(day + 1, self.days))
+        stop = day + 1 + own_rows[0] if own_rows.size else self.days
+        self.asof[day:stop, t] = day
+
+    def ingest_table(self, table: Dict[Tuple[str, str], Dict[str, int]]) -> int:
+        """Ingest a ``RankResolver.table``; returns the number of new rows."""
+        added = 0
+        for (team, as_of), ranks in sorted(table.items(), key=lambda kv: kv[0][1]):
+            if not self.has(team, as_of):
+                self.ingest(team, as_of, ranks)
+                added += 1
+        self.flush()
+        logging.info(f"Ingested {added} team-date rank rows into {self.root}")
+        return added
+
+    def has(self, team: str, as_of: str) -> bool:
+        """Whether ranks were ingested for exactly this team and date."""
+        if self.ranks is None or team not in self.team_index:
+            return False
+        day = self.day_index(as_of)
+        return 0 <= day < self.days and self.asof[day, self.team_index[team]] == day
+
+    def missing(self, keys: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        return [key for key in keys if not self.has(*key)]
+
+    def _asof_row(self, team: str, as_of: Union[str, date]) -> int:
+        if self.ranks is None or team not in self.team_index:
+            return -1
+        day = min(self.day_index(as_of), self.days - 1)
+        if day < 0:
+            return -1
+        return int(self.asof[day, self.team_index[team]])
+
+    def as_of_vector(self, team: str, as_of: Union[str, date]) -> Optional[np.ndarray]:
+        """Rank vector in ``categories`` order as of a date, or None."""
+        row = self._asof_row(team, as_of)
+        if row < 0:
+            return None
+        return self.ranks[row, self.team_index[team]]
+
+    def as_of(self, team: str, as_of: Union[str, date]) -> Optional[Dict[str, int]]:
+        """Ranks as of a date in the dict shape ``validate_ranks`` returns."""
+        vector = self.as_of_vector(team, as_of)
+        if vector is None:
+            return None
+        return dict(zip(self.categories, vector.tolist()))
+
+    def as_of_matrix(
+        self, teams: List[str], dates: List[Union[str, date]]
+    ) -> np.ndarray:
+        """Gather (n x categories) ranks for parallel team/date lists.
+
+        Teams or dates with no history come back as rows of -1.
+        """
+        out = np.full((len(teams), len(self.categories)), -1, dtype=np.int16)
+        if self.ranks is None or not teams:
+            return out
+        team_idx = np.array([self.team_index.get(team, -1) for team in teams])
+        day_idx = np.array([self.day_index(d) for d in dates])
+        day_idx = np.minimum(day_idx, self.days - 1)
+        valid = (team_idx >= 0) & (day_idx >= 0)
+        rows = np.full(len(teams), -1)
+        rows[valid] = self.asof[day_idx[valid], team_idx[valid]]
+        found = rows >= 0
+        out[found] = self.ranks[rows[found], team_idx[found]]
+        return out
+
+    def flush(self) -> None:
+        if self.ranks is not None:
+            self.ranks.flush()
+            self.asof.flush()
@@ -0,0 +1,194 @@
+#Http
+
+class TokenBucket:
+    """Global token bucket: ``rate`` requests per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or (rate or 1.0)
+        self._tokens = self.capacity
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.rate:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._updated is not None:
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                self._updated = loop.time()
+                self._tokens = 0.0
+            else:
+                self._tokens -= 1
+
+
+class HttpClient:
+    """Pooled, rate-limited HTTP client shared by every scraper.
+
+    One keep-alive connection pool with a per-host limit and DNS cache,
+    one token bucket across all requests, retries with full-jitter
+    exponential backoff on 429/5xx and connection errors, and conditional
+    GETs that answer 304s from the last body seen for a URL.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 60.0,
+        dns_ttl: int = 300,
+        keepalive: float = 30.0,
+        conditional: bool = True,
+        validator_cache_size: int = 1024,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = ClientTimeout(total=timeout)
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.conditional = conditional
+        self.validator_cache_size = validator_cache_size
+        self._validators: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "retries": 0,
+            "not_modified": 0,
+            "bytes": 0,
+            "status": defaultdict(int),
+        }
+
+    @staticmethod
+    def accept_encoding() -> str:
+        """aiohttp only decodes brotli when a brotli package is installed."""
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            try:
+                import brotlicffi  # noqa: F401
+            except ImportError:
+                return "gzip, deflate"
+        return "gzip, deflate, br"
+
+    async def __aenter__(self) -> "HttpClient":
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"Accept-Encoding": self.accept_encoding()},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            logging.info("HTTP client stats: %s", self.stats)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        validator = self._validators.get(url)
+        if not self.conditional or validator is None:
+            return {}
+        headers = {}
+        if validator.get("etag"):
+            headers["If-None-Match"] = validator["etag"]
+        if validator.get("last_modified"):
+            headers["If-Modified-Since"] = validator["last_modified"]
+        return headers
+
+    def _remember(
+        self, url: str, response: "aiohttp.ClientResponse", body: str
+    ) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not self.conditional or not (etag or last_modified):
+            return
+        self._validators[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        }
+        self._validators.move_to_end(url)
+        while len(self._validators) > self.validator_cache_size:
+            self._validators.popitem(last=False)
+
+    async def get_text(self, url: str, **kwargs) -> str:
+        """GET ``url`` and return the decoded body, retrying transient failures."""
+        if self.session is None:
+            raise RuntimeError("HttpClient must be used inside 'async with'.")
+        headers = {**kwargs.pop("headers", {}), **self._conditional_headers(url)}
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.stats["requests"] += 1
+            try:
+                with METRICS.timer("http"):
+                    async with self.session.get(
+                        url, headers=headers, **kwargs
+                    ) as response:
+                        self.stats["status"][response.status] += 1
+                        if response.status == 304 and url in self._validators:
+                            self.stats["not_modified"] += 1
+                            self._validators.move_to_end(url)
+                            return self._validators[url]["body"]
+                        if (
+                            response.status in self.RETRY_STATUSES
+                            and attempt < self.max_retries
+                        ):
+                            delay = self._retry_delay(
+                                attempt, response.headers.get("Retry-After")
+                            )
+                            logging.warning(
+                                f"HTTP {response.status} from {url}, "
+                                f"retrying in {delay:.1f}s"
+                            )
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            self.stats["bytes"] += len(body)
+                            text = body.decode(response.get_encoding())
+                            self._remember(url, response, text)
+                            return text
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logging.warning(f"Error fetching {url} ({e}), retrying in {delay:.1f}s")
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        return json.loads(await self.get_text(url, **kwargs))
@@ -0,0 +1,92 @@
+#Lazy
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access.
+
+    ``pd.read_csv`` or ``aiohttp.ClientError`` work unchanged; the import
+    cost is paid by the first command that actually reaches them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+            logging.debug(
+                "Imported %s in %.3fs", self.__name__, time.perf_counter() - started
+            )
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+
+class LazyAttribute:
+    """Stand-in for ``from module import name`` for callables.
+
+    Calling it or reading an attribute resolves the real object. It cannot
+    be used in ``except`` or ``isinstance``; keep exception classes on a
+    ``LazyModule`` instead (``aiohttp.ClientError``).
+    """
+
+    __slots__ = ("module", "name", "_target")
+
+    def __init__(self, module: str, name: str):
+        self.module = module
+        self.name = name
+        self._target = None
+
+    def resolve(self) -> Any:
+        if self._target is None:
+            self._target = getattr(importlib.import_module(self.module), self.name)
+        return self._target
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy {self.module}.{self.name}>"
+
+
+# Heavy third-party names, bound lazily in place of eager imports. NumPy stays
+# eager: it is cheap next to these and used in class bodies.
+pd = LazyModule("pandas")
+aiohttp = LazyModule("aiohttp")
+joblib = LazyModule("joblib")
+webdriver = LazyModule("selenium.webdriver")
+BeautifulSoup = LazyAttribute("bs4", "BeautifulSoup")
+ClientTimeout = LazyAttribute("aiohttp", "ClientTimeout")
+dump = LazyAttribute("joblib", "dump")
+load = LazyAttribute("joblib", "load")
+SGDClassifier = LazyAttribute("sklearn.linear_model", "SGDClassifier")
+MLPClassifier = LazyAttribute("sklearn.neural_network", "MLPClassifier")
+StandardScaler = LazyAttribute("sklearn.preprocessing", "StandardScaler")
+train_test_split = LazyAttribute("sklearn.model_selection", "train_test_split")
+accuracy_score = LazyAttribute("sklearn.metrics", "accuracy_score")
+precision_recall_fscore_support = LazyAttribute(
+    "sklearn.metrics", "precision_recall_fscore_support"
+)
+
+
+def loaded_modules() -> Dict[str, bool]:
+    """Which lazily bound modules a run has actually imported."""
+    return {
+        name: value.loaded
+        for name, value in globals().items()
+        if isinstance(value, LazyModule)
+    }
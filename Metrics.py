@@ -0,0 +1,180 @@
+#Metrics
+
+class _Timer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "RunMetrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+
+
+class RunMetrics:
+    """Per-stage timers and counters shared by every component of a run.
+
+    A timer keeps the call count, total and worst seconds for a stage;
+    counters are plain integers such as cache hits or HTTP statuses. Both
+    cost a couple of dict operations, so they are always on.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        # name -> [calls, total seconds, max seconds]
+        self.timers: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def timer(self, name: str) -> _Timer:
+        """Context manager timing one call of stage ``name``."""
+        return _Timer(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, seconds, seconds]
+            return
+        timer[0] += 1
+        timer[1] += seconds
+        if seconds > timer[2]:
+            timer[2] = seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        self.counters[f"{cache}.hit" if hit else f"{cache}.miss"] += 1
+
+    def cache_hit_rates(self) -> Dict[str, float]:
+        caches = {
+            name.rsplit(".", 1)[0]
+            for name in self.counters
+            if name.endswith((".hit", ".miss"))
+        }
+        rates = {}
+        for cache in sorted(caches):
+            hits = self.counters.get(f"{cache}.hit", 0)
+            lookups = hits + self.counters.get(f"{cache}.miss", 0)
+            rates[cache] = hits / lookups if lookups else 0.0
+        return rates
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "timers": {
+                name: {
+                    "calls": int(calls),
+                    "total_s": total,
+                    "mean_s": total / calls,
+                    "max_s": worst,
+                }
+                for name, (calls, total, worst) in sorted(
+                    self.timers.items(), key=lambda kv: -kv[1][1]
+                )
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "cache_hit_rates": self.cache_hit_rates(),
+        }
+
+    def report(self) -> str:
+        """Human-readable per-stage table, slowest stage first."""
+        summary = self.summary()
+        lines = [
+            f"{'stage':<16}{'calls':>8}{'total s':>11}{'mean ms':>11}{'max ms':>11}"
+        ]
+        for name, timer in summary["timers"].items():
+            lines.append(
+                f"{name:<16}{timer['calls']:>8}{timer['total_s']:>11.3f}"
+                f"{timer['mean_s'] * 1000:>11.2f}{timer['max_s'] * 1000:>11.2f}"
+            )
+        for cache, rate in summary["cache_hit_rates"].items():
+            lines.append(f"{cache} hit rate: {rate * 100:.1f}%")
+        return "\n".join(lines)
+
+
+METRICS = RunMetrics()
+
+
+class Profiler:
+    """Optional cProfile and tracemalloc capture around a whole run."""
+
+    def __init__(self, cpu: bool = True, memory: bool = True, top: int = 25):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.profile = None
+        self.snapshot = None
+        self.peak_bytes = 0
+
+    def start(self) -> None:
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def cpu_summary(self) -> List[Dict[str, Any]]:
+        if self.profile is None:
+            return []
+        import pstats
+
+        stats = pstats.Stats(self.profile).stats
+        rows = sorted(stats.items(), key=lambda kv: -kv[1][3])[: self.top]
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "own_s": own,
+                "cumulative_s": cumulative,
+            }
+            for (filename, line, name), (_, calls, own, cumulative, _) in rows
+        ]
+
+    def memory_summary(self) -> Dict[str, Any]:
+        if self.snapshot is None:
+            return {}
+        top = self.snapshot.statistics("lineno")[: self.top]
+        return {
+            "peak_bytes": self.peak_bytes,
+            "top": [
+                {
+                    "location": str(stat.traceback),
+                    "bytes": stat.size,
+                    "blocks": stat.count,
+                }
+                for stat in top
+            ],
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {"cpu": self.cpu_summary(), "memory": self.memory_summary()}
+
+
+def export_profile(path: Union[str, Path], **sections: Any) -> None:
+    """Write the run metrics plus any extra sections to a JSON file."""
+    report = {"metrics": METRICS.summary(), **sections}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    logging.info("Profile written to %s", path)
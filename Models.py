@@ -0,0 +1,195 @@
+#Models
+
+# Shard units and the length of the date prefix that names a shard; here
+# rather than in Shards.py so the CLI can offer them without loading it.
+SHARD_UNITS = {"month": 7, "season": 4}
+
+
+@lru_cache(maxsize=4096)
+def parse_date(date_str: str) -> date:
+    """``strptime`` once per distinct date string."""
+    return datetime.strptime(date_str, DATE_FORMAT).date()
+
+
+@lru_cache(maxsize=256)
+def normalize_category(key: str) -> str:
+    """Category key as ``validate_ranks`` stores it: lowercase, no ``%``."""
+    return key.lower().replace("%", "").strip()
+
+
+class TeamRegistry:
+    """Interned integer IDs for teams, seeded from ``[team_name_mapping]``.
+
+    A schedule name is lowercased and mapped to its URL slug once; after
+    that every lookup is a single dict hit. Names that are not in the
+    mapping get the ``name.lower().replace(" ", "-")`` slug, as before.
+    """
+
+    def __init__(self, team_name_mapping: Optional[Dict[str, str]] = None):
+        self.mapping = {
+            name.lower(): slug for name, slug in (team_name_mapping or {}).items()
+        }
+        self.slugs: List[str] = []
+        self.names: List[str] = []
+        self._by_slug: Dict[str, int] = {}
+        self._by_name: Dict[str, int] = {}
+        for slug in sorted(set(self.mapping.values())):
+            self._add(slug, slug)
+
+    # ``lookup`` result for a team that has no ID.
+    UNKNOWN = -1
+
+    def __len__(self) -> int:
+        return len(self.slugs)
+
+    def _add(self, slug: str, name: str) -> int:
+        team_id = len(self.slugs)
+        self.slugs.append(sys.intern(slug))
+        self.names.append(sys.intern(name))
+        self._by_slug[self.slugs[team_id]] = team_id
+        return team_id
+
+    def id_for(self, name: str) -> int:
+        team_id = self._by_name.get(name)
+        if team_id is None:
+            lowered = name.lower()
+            slug = self.mapping.get(lowered, lowered.replace(" ", "-"))
+            team_id = self._by_slug.get(slug)
+            if team_id is None:
+                team_id = self._add(slug, name)
+            elif self.names[team_id] == slug:
+                # Seeded from the mapping; remember how the schedule spells it.
+                self.names[team_id] = sys.intern(name)
+            self._by_name[sys.intern(name)] = team_id
+        return team_id
+
+    def lookup(self, name: str) -> int:
+        """``name``'s ID, or ``UNKNOWN``; unlike ``id_for`` it registers nothing."""
+        team_id = self._by_name.get(name)
+        if team_id is None:
+            lowered = name.lower()
+            slug = self.mapping.get(lowered, lowered.replace(" ", "-"))
+            team_id = self._by_slug.get(slug, self.UNKNOWN)
+        return team_id
+
+    def known(self, name: str) -> bool:
+        """Whether ``name`` is a mapped or already seen team; registers nothing."""
+        return self.lookup(name) != self.UNKNOWN
+
+    def id_for_slug(self, slug: str) -> int:
+        team_id = self._by_slug.get(slug)
+        return self._add(slug, slug) if team_id is None else team_id
+
+    def slug(self, team_id: int) -> str:
+        return self.slugs[team_id]
+
+    def name(self, team_id: int) -> str:
+        return self.names[team_id]
+
+
+class Matchup:
+    """One scheduled game: a real ``date`` and interned home/away team IDs."""
+
+    __slots__ = ("date", "home", "away")
+
+    def __init__(self, date_value: date, home: int, away: int):
+        self.date = date_value
+        self.home = home
+        self.away = away
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, str], teams: TeamRegistry) -> "Matchup":
+        return cls(
+            parse_date(row["date"]),
+            teams.id_for(row["home"]),
+            teams.id_for(row["away"]),
+        )
+
+    def to_dict(self, teams: TeamRegistry) -> Dict[str, str]:
+        return {
+            "date": self.date.strftime(DATE_FORMAT),
+            "home": teams.name(self.home),
+            "away": teams.name(self.away),
+        }
+
+    def key(self) -> Tuple[date, int, int]:
+        return self.date, self.home, self.away
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Matchup) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return f"Matchup({self.date}, home={self.home}, away={self.away})"
+
+
+class CategorySchema:
+    """Fixed column order for rank vectors.
+
+    Ranks are stored as int8 vectors indexed by category, with -1 for a
+    missing rank like ``validate_ranks``. Thirty teams fit with room to
+    spare, and a vector is a handful of bytes instead of a dict.
+    """
+
+    DTYPE = np.int8
+    MISSING = -1
+
+    def __init__(self, keys: List[str]):
+        self.keys = [normalize_category(key) for key in keys]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def empty(self) -> np.ndarray:
+        return np.full(len(self.keys), self.MISSING, dtype=self.DTYPE)
+
+    def vector(self, ranks: Dict[str, int]) -> np.ndarray:
+        """Rank vector from a raw or validated rank dict."""
+        vector = self.empty()
+        for key, value in ranks.items():
+            col = self.index.get(normalize_category(key))
+            if col is not None:
+                vector[col] = value
+        return vector
+
+    def to_dict(self, vector: np.ndarray) -> Dict[str, int]:
+        return dict(zip(self.keys, vector.tolist()))
+
+    def columns(self, categories: List[str]) -> np.ndarray:
+        """Schema column of each category, -1 where it is not tracked."""
+        return np.array([self.index.get(c, -1) for c in categories], dtype=np.intp)
+
+    def matrix(self, vectors: List[np.ndarray], categories: List[str]) -> np.ndarray:
+        """(rows x categories) float matrix for scoring.
+
+        Untracked categories are NaN and skipped, like a category missing
+        from a rank dict in ``build_rank_matrix``.
+        """
+        columns = self.columns(categories)
+        stacked = (
+            np.stack(vectors) if vectors else np.empty((0, len(self.keys)), self.DTYPE)
+        )
+        matrix = np.full((len(vectors), len(categories)), np.nan)
+        tracked = columns >= 0
+        matrix[:, tracked] = stacked[:, columns[tracked]]
+        return matrix
+
+
+class TeamRanks:
+    """A team's rank vector as of one date."""
+
+    __slots__ = ("team", "date", "ranks")
+
+    def __init__(self, team: int, date_value: date, ranks: np.ndarray):
+        self.team = team
+        self.date = date_value
+        self.ranks = ranks
+
+    def to_dict(self, schema: CategorySchema) -> Dict[str, int]:
+        return schema.to_dict(self.ranks)
+
+    def __repr__(self) -> str:
+        return f"TeamRanks(team={self.team}, date={self.date}, ranks={self.ranks})"
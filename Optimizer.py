@@ -0,0 +1,382 @@
+#Optimizer
+
+if __name__ == "__main__":
+    # Run as a script: load the modules this file shares a namespace with.
+    import runtime
+
+    runtime.load_modules()
+    runtime.export(globals())
+
+
+_SHARED_ARRAYS: Dict[str, np.ndarray] = {}
+_SHARED_BLOCKS: List[shared_memory.SharedMemory] = []
+
+
+def _attach_shared_arrays(specs: Dict[str, Tuple[str, Tuple[int, ...], str]]) -> None:
+    """Pool initializer: map the parent's shared rank arrays without copying."""
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _SHARED_BLOCKS.append(block)
+        _SHARED_ARRAYS[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def evaluate_thresholds(
+    thresholds: np.ndarray,
+    rank_diff: np.ndarray,
+    rank_sign: np.ndarray,
+    outcome: np.ndarray,
+    win_payout: float,
+) -> np.ndarray:
+    """Score a (K x categories) batch of thresholds over every game at once.
+
+    Returns a (K x 4) array of bets, wins, win rate and ROI. The scoring
+    rule is ``PointsProjector.calculate_scores``: a category awards a point
+    when the rank difference exceeds its threshold.
+    """
+    with np.errstate(invalid="ignore"):
+        awarded = rank_diff[None, :, :] > thresholds[:, None, :]
+    scores = (awarded * rank_sign[None, :, :]).sum(axis=2)
+    pick = np.sign(scores)
+    bets = (pick != 0) & (outcome != 0)[None, :]
+    wins = bets & (pick == outcome[None, :])
+    bet_count = bets.sum(axis=1).astype(np.float64)
+    win_count = wins.sum(axis=1).astype(np.float64)
+    profit = win_count * win_payout - (bet_count - win_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(bet_count > 0, win_count / bet_count, 0.0)
+        roi = np.where(bet_count > 0, profit / bet_count, 0.0)
+    return np.column_stack([bet_count, win_count, win_rate, roi])
+
+
+def _evaluate_shared(
+    thresholds: np.ndarray, start: int, stop: int, win_payout: float
+) -> np.ndarray:
+    return evaluate_thresholds(
+        thresholds,
+        _SHARED_ARRAYS["rank_diff"][start:stop],
+        _SHARED_ARRAYS["rank_sign"][start:stop],
+        _SHARED_ARRAYS["outcome"][start:stop],
+        win_payout,
+    )
+
+
+class ThresholdOptimizer:
+    """Searches ``[scoring_criteria]`` thresholds over fixed rank matrices.
+
+    Rank differences, point directions and outcomes are computed once,
+    sorted by game date and placed in shared memory. Pool workers attach
+    to them at start-up, so each task ships only a batch of candidate
+    thresholds and a row range.
+    """
+
+    OBJECTIVES = ("win_rate", "roi")
+
+    def __init__(
+        self,
+        home_matrix: np.ndarray,
+        away_matrix: np.ndarray,
+        outcome: np.ndarray,
+        game_dates: List[str],
+        categories: List[str],
+        workers: Optional[int] = None,
+        odds: float = -110,
+        objective: str = "win_rate",
+        min_bets: int = 50,
+        batch_size: int = 128,
+    ):
+        if objective not in self.OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        order = np.argsort(np.asarray(game_dates), kind="stable")
+        self.game_dates = np.asarray(game_dates)[order]
+        self.categories = categories
+        self.workers = workers
+        self.win_payout = Backtest.decimal_odds(odds) - 1
+        self.objective = objective
+        self.min_bets = min_bets
+        self.batch_size = batch_size
+        home = np.asarray(home_matrix, dtype=np.float32)[order]
+        away = np.asarray(away_matrix, dtype=np.float32)[order]
+        self.arrays = {
+            "rank_diff": np.abs(home - away),
+            "rank_sign": np.nan_to_num(np.sign(away - home)).astype(np.int8),
+            "outcome": np.sign(np.asarray(outcome)[order]).astype(np.int8),
+        }
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_history(
+        cls,
+        results: "pd.DataFrame",
+        rank_history: "RankHistory",
+        categories: List[str],
+        team_slug: Callable[[str], str],
+        **kwargs,
+    ) -> "ThresholdOptimizer":
+        """Build matrices for every game in ``results`` from the rank history."""
+        projector = PointsProjector(None, None, rank_history=rank_history)
+        matchups = results[["date", "home", "away"]].to_dict("records")
+        home_matrix, away_matrix = projector.history_rank_matrices(
+            matchups, categories, team_slug
+        )
+        outcome = (results["home_score"] - results["away_score"]).to_numpy()
+        return cls(
+            home_matrix,
+            away_matrix,
+            outcome,
+            results["date"].tolist(),
+            categories,
+            **kwargs,
+        )
+
+    def __enter__(self) -> "ThresholdOptimizer":
+        specs = {}
+        for key, array in self.arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            shared[:] = array
+            self._blocks.append(block)
+            specs[key] = (block.name, array.shape, array.dtype.str)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach_shared_arrays,
+            initargs=(specs,),
+        )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def _rows(self, dates: Optional[Tuple[str, str]]) -> Tuple[int, int]:
+        if dates is None:
+            return 0, len(self.game_dates)
+        start = int(np.searchsorted(self.game_dates, dates[0], side="left"))
+        stop = int(np.searchsorted(self.game_dates, dates[1], side="left"))
+        return start, stop
+
+    def evaluate(
+        self, thresholds: np.ndarray, dates: Optional[Tuple[str, str]] = None
+    ) -> np.ndarray:
+        """(K x 4) bets, wins, win rate, ROI for games in ``[start, stop)`` dates."""
+        thresholds = np.atleast_2d(np.asarray(thresholds, dtype=np.float32))
+        start, stop = self._rows(dates)
+        batches = [
+            thresholds[i : i + self.batch_size]
+            for i in range(0, len(thresholds), self.batch_size)
+        ]
+        if self._pool is None:
+            parts = [
+                evaluate_thresholds(
+                    batch,
+                    self.arrays["rank_diff"][start:stop],
+                    self.arrays["rank_sign"][start:stop],
+                    self.arrays["outcome"][start:stop],
+                    self.win_payout,
+                )
+                for batch in batches
+            ]
+        else:
+            futures = [
+                self._pool.submit(_evaluate_shared, batch, start, stop, self.win_payout)
+                for batch in batches
+            ]
+            parts = [future.result() for future in futures]
+        return np.vstack(parts) if parts else np.empty((0, 4))
+
+    def _objective(self, metrics: np.ndarray) -> np.ndarray:
+        column = 2 if self.objective == "win_rate" else 3
+        return np.where(metrics[:, 0] >= self.min_bets, metrics[:, column], -np.inf)
+
+    @staticmethod
+    def grid_candidates(values: List[float], categories: int) -> np.ndarray:
+        return np.array(list(itertools.product(values, repeat=categories)))
+
+    @staticmethod
+    def random_candidates(
+        samples: int, low: float, high: float, categories: int, seed: int = 0
+    ) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        return np.round(rng.uniform(low, high, size=(samples, categories)), 1)
+
+    def coordinate_descent(
+        self,
+        start: np.ndarray,
+        values: List[float],
+        dates: Optional[Tuple[str, str]] = None,
+        max_rounds: int = 10,
+    ) -> np.ndarray:
+        """Improve one category at a time until no single change helps."""
+        best = np.asarray(start, dtype=np.float32).copy()
+        best_score = self._objective(self.evaluate(best, dates))[0]
+        for _ in range(max_rounds):
+            improved = False
+            for c in range(len(best)):
+                candidates = np.repeat(best[None, :], len(values), axis=0)
+                candidates[:, c] = values
+                scores = self._objective(self.evaluate(candidates, dates))
+                i = int(np.argmax(scores))
+                if scores[i] > best_score:
+                    best, best_score = candidates[i], scores[i]
+                    improved = True
+            if not improved:
+                break
+        return best[None, :]
+
+    def search(
+        self,
+        candidates: np.ndarray,
+        dates: Optional[Tuple[str, str]] = None,
+        top: int = 10,
+    ) -> "pd.DataFrame":
+        """Rank ``candidates`` by the objective over the given date window."""
+        metrics = self.evaluate(candidates, dates)
+        scores = self._objective(metrics)
+        order = np.argsort(-scores, kind="stable")[:top]
+        ranked = pd.DataFrame(np.asarray(candidates)[order], columns=self.categories)
+        ranked[["bets", "wins", "win_rate", "roi"]] = metrics[order]
+        return ranked
+
+    def walk_forward(
+        self,
+        propose: Callable[[Optional[Tuple[str, str]]], np.ndarray],
+        folds: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """Expanding-window validation over contiguous date blocks.
+
+        For each fold the best candidate from ``propose(train_window)`` is
+        chosen on all earlier dates and scored on the next block.
+        """
+        dates = np.unique(self.game_dates)
+        edges = np.linspace(0, len(dates), folds + 2).astype(int)
+        report = []
+        for i in range(1, folds + 1):
+            if edges[i] >= len(dates):
+                break
+            train = (dates[0], dates[edges[i]])
+            test_end = "9999-12-31"
+            if edges[i + 1] < len(dates):
+                test_end = dates[edges[i + 1]]
+            test = (dates[edges[i]], test_end)
+            best = self.search(propose(train), train, top=1)
+            thresholds = best[self.categories].to_numpy()
+            test_metrics = self.evaluate(thresholds, test)[0]
+            report.append(
+                {
+                    "train": list(train),
+                    "test": [test[0], test_end],
+                    "thresholds": dict(zip(self.categories, thresholds[0].tolist())),
+                    "train_win_rate": float(best["win_rate"].iloc[0]),
+                    "train_roi": float(best["roi"].iloc[0]),
+                    "test_bets": int(test_metrics[0]),
+                    "test_win_rate": float(test_metrics[2]),
+                    "test_roi": float(test_metrics[3]),
+                }
+            )
+        return report
+
+    @staticmethod
+    def config_section(thresholds: Dict[str, float]) -> str:
+        lines = ["[scoring_criteria]"]
+        lines += [f"{category} = {value:g}" for category, value in thresholds.items()]
+        return "\n".join(lines)
+
+
+def run_optimizer(args: argparse.Namespace) -> Dict[str, Any]:
+    settings = load_settings(args.config, preserve_case=True)
+    criteria = {
+        key: float(value) for key, value in settings["scoring_criteria"].items()
+    }
+    # History columns use the lowercased keys validate_ranks produces.
+    categories = [key.lower() for key in criteria]
+    mapping = {
+        name.lower(): slug for name, slug in settings["team_name_mapping"].items()
+    }
+    history = RankHistory(args.history_dir)
+
+    def team_slug(name: str) -> str:
+        return mapping.get(name.lower(), name.lower().replace(" ", "-"))
+
+    values = [float(v) for v in args.values.split(",")]
+    if args.mode == "grid" and len(values) ** len(categories) > args.max_candidates:
+        raise ValueError(
+            f"Grid of {len(values)}^{len(categories)} candidates exceeds "
+            f"--max_candidates={args.max_candidates}; pass fewer --values."
+        )
+    optimizer = ThresholdOptimizer.from_history(
+        load_actual_results(args.results),
+        history,
+        categories,
+        team_slug,
+        workers=args.workers,
+        objective=args.objective,
+        min_bets=args.min_bets,
+    )
+
+    def propose(dates: Optional[Tuple[str, str]]) -> np.ndarray:
+        if args.mode == "grid":
+            return ThresholdOptimizer.grid_candidates(values, len(categories))
+        if args.mode == "random":
+            return ThresholdOptimizer.random_candidates(
+                args.samples, min(values), max(values), len(categories), args.seed
+            )
+        start = np.array(list(criteria.values()))
+        return optimizer.coordinate_descent(start, values, dates)
+
+    with optimizer:
+        best = optimizer.search(propose(None), top=args.top)
+        report = optimizer.walk_forward(propose, folds=args.folds)
+
+    winner = dict(zip(criteria, best[categories].iloc[0].tolist()))
+    summary = {
+        "mode": args.mode,
+        "objective": args.objective,
+        "best": best.to_dict("records"),
+        "walk_forward": report,
+        "config_section": ThresholdOptimizer.config_section(winner),
+    }
+    print(best.to_string(index=False))
+    for fold in report:
+        print(
+            f"{fold['test'][0]}..{fold['test'][1]}: "
+            f"train {fold['train_win_rate'] * 100:.2f}% -> "
+            f"test {fold['test_win_rate'] * 100:.2f}% over {fold['test_bets']} bets"
+        )
+    print()
+    print(summary["config_section"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search scoring_criteria thresholds.")
+    parser.add_argument("--history_dir", required=True, help="Rank history directory.")
+    parser.add_argument("--results", required=True, help="Actual results file.")
+    parser.add_argument("--config", default="config.ini")
+    parser.add_argument(
+        "--mode", choices=("grid", "random", "coordinate"), default="coordinate"
+    )
+    parser.add_argument(
+        "--values",
+        default="3,3.5,4,4.5,5,5.5,6,6.5,7",
+        help="Comma-separated threshold values (grid/coordinate) or range (random).",
+    )
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--max_candidates", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--objective", choices=ThresholdOptimizer.OBJECTIVES, default="win_rate"
+    )
+    parser.add_argument("--min_bets", type=int, default=50)
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", type=str, help="Write the report as JSON.")
+    run_optimizer(parser.parse_args())
@@ -0,0 +1,193 @@
+#Pipeline
+
+class DayBatch:
+    """One day's games and everything resolved for them so far."""
+
+    __slots__ = ("seq", "date", "matchups", "ranks", "projections", "signals")
+
+    def __init__(self, seq: int, date_value: str, matchups: List[Dict[str, str]]):
+        self.seq = seq
+        self.date = date_value
+        self.matchups = matchups
+        self.ranks: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.projections: List[Dict[str, Any]] = []
+        self.signals: Optional[np.ndarray] = None
+
+
+class RunPipeline:
+    """schedule -> ranks -> scores -> writer as a streaming asyncio DAG.
+
+    Each stage reads from a bounded queue, so a day's games are ranked and
+    scored as soon as its schedule arrives, and a slow stage pushes back
+    on the ones before it instead of letting lists pile up in memory.
+    Games travel with their own ranks, never paired up by list position.
+
+    Days finish out of order; the score stage holds early finishers in a
+    reorder buffer and releases days in date order, so the written
+    file, ``batches``, ``projections()`` and ``category_signals()`` all
+    list the same games in the same order on every run.
+    """
+
+    _DONE = None
+
+    def __init__(
+        self,
+        session: "HttpClient",
+        schedule_processor: ScheduleProcessor,
+        resolver: RankResolver,
+        projector: PointsProjector,
+        scoring_criteria: Dict[str, float],
+        writer: Optional[DataWriter] = None,
+        filename: Optional[str] = None,
+        append: bool = False,
+        queue_size: int = 4,
+        rank_workers: int = 2,
+    ):
+        self.session = session
+        self.schedule_processor = schedule_processor
+        self.resolver = resolver
+        self.projector = projector
+        self.scoring_criteria = scoring_criteria
+        self.categories = list(scoring_criteria)
+        self.weights = PointsProjector.score_weights(scoring_criteria)
+        self.writer = writer
+        self.filename = filename
+        self.append = append
+        self.queue_size = queue_size
+        self.rank_workers = rank_workers
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.batches: List[DayBatch] = []
+        self.rows_written = 0
+
+    async def _schedule_stage(self, dates: List[str], out_queue: asyncio.Queue) -> None:
+        stats = {"latency": {}, "failed_days": []}
+        semaphore = asyncio.Semaphore(self.schedule_processor.concurrency)
+
+        async def load_day(seq: int, date_value: str) -> None:
+            matchups = await self.schedule_processor._fetch_day(
+                self.session, date_value, semaphore, stats
+            )
+            self.stage_seconds["schedule"] += stats["latency"].get(date_value, 0.0)
+            # Empty and failed days still pass through to keep the sequence.
+            batch = DayBatch(seq, date_value, ScheduleProcessor.deduplicate(matchups))
+            await out_queue.put(batch)
+
+        try:
+            await asyncio.gather(
+                *(load_day(seq, d) for seq, d in enumerate(sorted(set(dates))))
+            )
+        finally:
+            ScheduleProcessor.log_fetch_stats(stats, len(set(dates)))
+            self.schedule_processor.last_fetch_stats = stats
+            for _ in range(self.rank_workers):
+                await out_queue.put(self._DONE)
+
+    async def _rank_stage(
+        self, in_queue: asyncio.Queue, out_queue: asyncio.Queue
+    ) -> None:
+        while True:
+            batch = await in_queue.get()
+            if batch is self._DONE:
+                await out_queue.put(self._DONE)
+                return
+            if batch.matchups:
+                started = time.perf_counter()
+                await self.resolver.resolve_matchups(self.session, batch.matchups)
+                batch.ranks = self.resolver.rank_matrices(
+                    batch.matchups, self.categories
+                )
+                self.stage_seconds["ranks"] += time.perf_counter() - started
+            await out_queue.put(batch)
+
+    async def _score_stage(
+        self, in_queue: asyncio.Queue, out_queue: asyncio.Queue
+    ) -> None:
+        remaining = self.rank_workers
+        pending: Dict[int, DayBatch] = {}
+        next_seq = 0
+        while remaining:
+            batch = await in_queue.get()
+            if batch is self._DONE:
+                remaining -= 1
+                continue
+            pending[batch.seq] = batch
+            while next_seq in pending:
+                batch = pending.pop(next_seq)
+                next_seq += 1
+                if batch.matchups:
+                    self._score(batch)
+                    await out_queue.put(batch)
+        await out_queue.put(self._DONE)
+
+    def _score(self, batch: DayBatch) -> None:
+        started = time.perf_counter()
+        with METRICS.timer("score_batch"):
+            batch.signals = self.projector.category_signals(*batch.ranks, self.weights)
+        batch.projections = [
+            {
+                "date": matchup["date"],
+                "home": matchup["home"],
+                "away": matchup["away"],
+                "projected": int(score),
+            }
+            for matchup, score in zip(batch.matchups, batch.signals.sum(axis=1))
+        ]
+        batch.ranks = None
+        self.batches.append(batch)
+        self.stage_seconds["score"] += time.perf_counter() - started
+
+    async def _rows(self, in_queue: asyncio.Queue) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            batch = await in_queue.get()
+            if batch is self._DONE:
+                return
+            for row in batch.projections:
+                yield row
+
+    async def _write_stage(self, in_queue: asyncio.Queue) -> None:
+        started = time.perf_counter()
+        if self.writer is None or self.filename is None:
+            async for _ in self._rows(in_queue):
+                pass
+        else:
+            self.rows_written = await self.writer.write_stream_async(
+                self.filename, self._rows(in_queue), append=self.append
+            )
+        self.stage_seconds["write"] = time.perf_counter() - started
+
+    async def run(self, dates: List[str]) -> List[DayBatch]:
+        """Run every stage concurrently; returns the scored batches in date order."""
+        day_queue = asyncio.Queue(self.queue_size)
+        ranked_queue = asyncio.Queue(self.queue_size)
+        scored_queue = asyncio.Queue(self.queue_size)
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._schedule_stage(dates, day_queue)),
+            *(
+                asyncio.create_task(self._rank_stage(day_queue, ranked_queue))
+                for _ in range(self.rank_workers)
+            ),
+            asyncio.create_task(self._score_stage(ranked_queue, scored_queue)),
+            asyncio.create_task(self._write_stage(scored_queue)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        self.stage_seconds["total"] = time.perf_counter() - started
+        logging.info(
+            "Pipeline stage seconds: %s",
+            {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+        )
+        return self.batches
+
+    def projections(self) -> List[Dict[str, Any]]:
+        return [row for batch in self.batches for row in batch.projections]
+
+    def category_signals(self) -> np.ndarray:
+        signals = [batch.signals for batch in self.batches]
+        if not signals:
+            return np.zeros((0, len(self.scoring_criteria)), dtype=np.int64)
+        return np.vstack(signals)
@@ -2,10 +2,18 @@
 class PointsProjector:
     BASE_URL = "https://www.teamrankings.com/mlb/team/"
 
-    def __init__(self, config_manager: Any, session: aiohttp.ClientSession):
+    def __init__(
+        self,
+        config_manager: Any,
+        session: "HttpClient",
+        rank_resolver: Optional["RankResolver"] = None,
+        rank_history: Optional["RankHistory"] = None,
+    ):
         self.config_manager = config_manager
         self.session = session
-        self.rankings_cache = {}  # A simple dictionary to cache team rankings.
+        # Shared (team slug, date) -> ranks table, filled once per run.
+        self.rank_resolver = rank_resolver
+        self.rank_history = rank_history
 
     @staticmethod
     def transform_ranks(ranks_dictionary: Dict[str, Any]) -> Dict[str, Any]:
@@ -27,8 +35,16 @@ class PointsProjector:
         away_ranks: Dict[str, Any],
         scoring_criteria: Dict[str, float],  # Change int to float for decimal values
     ) -> int:
-        logging.info("Starting to calculate score with PointsProjector")
-        logging.info("Received home_ranks: %s, away_ranks: %s", home_ranks, away_ranks)
+        with METRICS.timer("score"):
+            return self._score(home_ranks, away_ranks, scoring_criteria)
+
+    @staticmethod
+    def _score(
+        home_ranks: Dict[str, Any],
+        away_ranks: Dict[str, Any],
+        scoring_criteria: Dict[str, float],
+    ) -> int:
+        logging.debug("Received home_ranks: %s, away_ranks: %s", home_ranks, away_ranks)
 
         score = 0
 
@@ -39,29 +55,98 @@ class PointsProjector:
             # Check if both ranks are present and valid
             if home_category_rank is not None and away_category_rank is not None:
                 difference = abs(home_category_rank - away_category_rank)
-                logging.debug(f"Difference in ranks for {category}: {difference}")
+                logging.debug("Difference in ranks for %s: %s", category, difference)
 
                 # Check if the difference exceeds the scoring criteria
                 if difference > weight:
                     if away_category_rank < home_category_rank:
                         score -= 1  # award point to away team
                         logging.debug(
-                            f"Awarded a point to the away team for {category}"
+                            "Awarded a point to the away team for %s", category
                         )
                     elif home_category_rank < away_category_rank:
                         score += 1  # award point to home team
                         logging.debug(
-                            f"Awarded a point to the home team for {category}"
+                            "Awarded a point to the home team for %s", category
                         )
 
-        logging.info("Score calculated: %s", score)
+        logging.debug("Score calculated: %s", score)
         return score
 
+    @staticmethod
+    def score_weights(scoring_criteria: Dict[str, float]) -> np.ndarray:
+        """Weight vector in ``scoring_criteria`` order."""
+        return np.fromiter(scoring_criteria.values(), dtype=np.float64)
+
+    @staticmethod
+    def build_rank_matrix(
+        ranks_list: List[Dict[str, Any]], categories: List[str]
+    ) -> np.ndarray:
+        """Stack rank dicts into a (games x categories) matrix.
+
+        Categories absent from a dict become NaN so they are skipped exactly
+        like ``calculate_score`` skips a ``None`` rank. The -1 sentinel from
+        ``validate_ranks`` is kept as a real value.
+        """
+        matrix = np.full((len(ranks_list), len(categories)), np.nan)
+        for row, ranks in enumerate(ranks_list):
+            for col, category in enumerate(categories):
+                rank = ranks.get(category)
+                if rank is not None:
+                    matrix[row, col] = rank
+        return matrix
+
+    @staticmethod
+    def category_signals(
+        home_matrix: np.ndarray, away_matrix: np.ndarray, weights: np.ndarray
+    ) -> np.ndarray:
+        """Per-category points: +1 home, -1 away, 0 no award."""
+        with np.errstate(invalid="ignore"):
+            awarded = np.abs(home_matrix - away_matrix) > weights
+        return np.where(awarded, np.sign(away_matrix - home_matrix), 0).astype(
+            np.int64
+        )
+
+    @classmethod
+    def calculate_scores(
+        cls, home_matrix: np.ndarray, away_matrix: np.ndarray, weights: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized ``calculate_score`` over every game at once."""
+        return cls.category_signals(home_matrix, away_matrix, weights).sum(axis=1)
+
+    def calculate_signals_batch(
+        self,
+        home_ranks_list: List[Dict[str, Any]],
+        away_ranks_list: List[Dict[str, Any]],
+        scoring_criteria: Dict[str, float],
+    ) -> np.ndarray:
+        """(games x categories) per-category points in ``scoring_criteria`` order."""
+        categories = list(scoring_criteria.keys())
+        with METRICS.timer("score_batch"):
+            home_matrix = self.build_rank_matrix(home_ranks_list, categories)
+            away_matrix = self.build_rank_matrix(away_ranks_list, categories)
+            return self.category_signals(
+                home_matrix, away_matrix, self.score_weights(scoring_criteria)
+            )
+
+    def calculate_scores_batch(
+        self,
+        home_ranks_list: List[Dict[str, Any]],
+        away_ranks_list: List[Dict[str, Any]],
+        scoring_criteria: Dict[str, float],
+    ) -> np.ndarray:
+        scores = self.calculate_signals_batch(
+            home_ranks_list, away_ranks_list, scoring_criteria
+        ).sum(axis=1)
+        logging.info("Calculated %d scores in batch", len(scores))
+        return scores
+
 
     async def calculate_projections(
         self,
         matchups: List[Dict[str, str]],
         scoring_criteria: Dict[str, float],
+        paired_ranks: Optional[List[Dict[str, Dict[str, Any]]]] = None,
     ) -> List[Dict[str, Union[str, int]]]:
         
         logging.info("Starting to calculate projections")
@@ -73,19 +158,78 @@ class PointsProjector:
             logging.error("Invalid data types provided.")
             return []
 
-        projections = []
-        team_ranking_extractor = TeamRankingExtractor()
-
-        for matchup in matchups:
-            home_team = matchup["home"]
-            away_team = matchup["away"]
-
-            # Logic for Home Team
-            if home_team not in self.rankings_cache:
-                home_ranks = await team_ranking_extractor.fetch_and_extract(
-                    self.session, 
-                    f"{self.BASE_URL}{home_team.lower().replace(' ', '-')}-stats", 
-                    home_team, 
-                    self.config_manager.get_scoring_categories()
-                )
-                sel
\ No newline at end of file
+        if paired_ranks is None and self.rank_resolver is None:
+            if self.rank_history is not None:
+                return self.projections_from_history(matchups, scoring_criteria)
+
+        if paired_ranks is None:
+            if self.rank_resolver is None:
+                logging.error("No ranks provided and no rank resolver configured.")
+                return []
+            await self.rank_resolver.resolve_matchups(self.session, matchups)
+            paired_ranks = [self.rank_resolver.ranks_for(m) for m in matchups]
+
+        scores = self.calculate_scores_batch(
+            [ranks["home"] for ranks in paired_ranks],
+            [ranks["away"] for ranks in paired_ranks],
+            scoring_criteria,
+        )
+        return [
+            {
+                "date": matchup["date"],
+                "home": matchup["home"],
+                "away": matchup["away"],
+                "projected": int(score),
+            }
+            for matchup, score in zip(matchups, scores)
+        ]
+
+    def history_rank_matrices(
+        self,
+        matchups: List[Dict[str, str]],
+        categories: List[str],
+        team_slug: Optional[Callable[[str], str]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Home/away rank matrices as of each game date from ``rank_history``.
+
+        Categories the history does not track come back as NaN and are
+        skipped, like a category missing from a rank dict.
+        """
+        slug = team_slug
+        if slug is None and self.rank_resolver is not None:
+            slug = self.rank_resolver.team_slug
+        if slug is None:
+            slug = lambda name: name.lower().replace(" ", "-")
+        dates = [matchup["date"] for matchup in matchups]
+        columns = [self.rank_history.category_index.get(c, -1) for c in categories]
+        matrices = []
+        for side in ("home", "away"):
+            ranks = self.rank_history.as_of_matrix(
+                [slug(matchup[side]) for matchup in matchups], dates
+            )
+            matrix = np.full((len(matchups), len(categories)), np.nan)
+            for out_col, col in enumerate(columns):
+                if col >= 0:
+                    matrix[:, out_col] = ranks[:, col]
+            matrices.append(matrix)
+        return matrices[0], matrices[1]
+
+    def projections_from_history(
+        self, matchups: List[Dict[str, str]], scoring_criteria: Dict[str, float]
+    ) -> List[Dict[str, Union[str, int]]]:
+        """Score games from local rank history without any HTTP."""
+        home_matrix, away_matrix = self.history_rank_matrices(
+            matchups, list(scoring_criteria.keys())
+        )
+        scores = self.calculate_scores(
+            home_matrix, away_matrix, self.score_weights(scoring_criteria)
+        )
+        return [
+            {
+                "date": matchup["date"],
+                "home": matchup["home"],
+                "away": matchup["away"],
+                "projected": int(score),
+            }
+            for matchup, score in zip(matchups, scores)
+        ]
@@ -0,0 +1,310 @@
+#Service
+
+class UnknownTeamError(Exception):
+    """Raised for a team that is neither mapped nor on any loaded schedule."""
+
+
+class LatencyTracker:
+    """Most recent request latencies per endpoint in fixed-size ring buffers."""
+
+    def __init__(self, window: int = 4096):
+        self.window = window
+        self._samples: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = np.zeros(self.window)
+        samples[self._counts[endpoint] % self.window] = seconds
+        self._counts[endpoint] += 1
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for endpoint, samples in sorted(self._samples.items()):
+            count = self._counts[endpoint]
+            recent = samples[: min(count, self.window)]
+            p50, p99 = np.percentile(recent, [50, 99])
+            summary[endpoint] = {
+                "count": count,
+                "p50_ms": float(p50) * 1000,
+                "p99_ms": float(p99) * 1000,
+                "max_ms": float(recent.max()) * 1000,
+            }
+        return summary
+
+
+class ProjectionService:
+    """Resident projection server for same-day games.
+
+    Schedules (per date) and ranks (per team and date, in the resolver)
+    stay in memory between requests, so projecting a game already seen is
+    a couple of dict lookups and one vectorized score. A background task
+    refetches today's slate and ranks every ``refresh_interval`` seconds;
+    concurrent requests for a page that is being fetched share the fetch.
+    Clients may ask for any date, so at most ``max_slates`` slates and
+    ``max_team_dates`` resolved team ranks are kept, least recently used
+    dropped first.
+    """
+
+    def __init__(
+        self,
+        session: "HttpClient",
+        schedule_processor: ScheduleProcessor,
+        resolver: RankResolver,
+        projector: PointsProjector,
+        scoring_criteria: Dict[str, float],
+        refresh_interval: float = 900.0,
+        lookahead_days: int = 0,
+        max_slates: int = 256,
+        max_team_dates: int = 20000,
+    ):
+        self.session = session
+        self.schedule_processor = schedule_processor
+        self.resolver = resolver
+        self.projector = projector
+        self.categories = list(scoring_criteria)
+        self.weights = PointsProjector.score_weights(scoring_criteria)
+        self.refresh_interval = refresh_interval
+        self.lookahead_days = lookahead_days
+        self.slates = LRUCache(max_slates)
+        self.max_team_dates = max_team_dates
+        # Record keys of the resolver in least recently used order.
+        self._team_dates: "OrderedDict[Tuple[int, str], None]" = OrderedDict()
+        self._slate_inflight: Dict[str, asyncio.Future] = {}
+        self._schedule_semaphore = asyncio.Semaphore(schedule_processor.concurrency)
+        self.latency = LatencyTracker()
+        self.refreshes = 0
+        self.last_refresh: Optional[str] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.runner = None
+
+    @staticmethod
+    def today() -> str:
+        return datetime.today().strftime(DATE_FORMAT)
+
+    def live_dates(self) -> List[str]:
+        """Today plus ``lookahead_days``: the dates kept warm by refreshes."""
+        today = parse_date(self.today())
+        return [
+            (today + timedelta(days=i)).strftime(DATE_FORMAT)
+            for i in range(self.lookahead_days + 1)
+        ]
+
+    async def _load_slate(self, date_value: str) -> List[Dict[str, str]]:
+        stats = {"latency": {}, "failed_days": []}
+        matchups = ScheduleProcessor.deduplicate(
+            await self.schedule_processor._fetch_day(
+                self.session, date_value, self._schedule_semaphore, stats
+            )
+        )
+        # A failed fetch is not cached; the next request tries again.
+        if not stats["failed_days"]:
+            self.slates.put(date_value, matchups)
+        return matchups
+
+    async def slate(self, date_value: str) -> List[Dict[str, str]]:
+        """Games on ``date_value``, fetched once and then served from memory."""
+        parse_date(date_value)
+        matchups = self.slates.get(date_value)
+        METRICS.cache_lookup("slates", matchups is not None)
+        if matchups is not None:
+            return matchups
+        future = self._slate_inflight.get(date_value)
+        if future is None:
+            future = asyncio.ensure_future(self._load_slate(date_value))
+            self._slate_inflight[date_value] = future
+            future.add_done_callback(
+                lambda _: self._slate_inflight.pop(date_value, None)
+            )
+        return await asyncio.shield(future)
+
+    async def project(self, matchups: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Projection rows, with per-category signals, for ``matchups``."""
+        if not matchups:
+            return []
+        await self.resolver.resolve_matchups(self.session, matchups)
+        with METRICS.timer("score_batch"):
+            signals = self.projector.category_signals(
+                *self.resolver.rank_matrices(matchups, self.categories), self.weights
+            )
+        # Only after scoring: this batch's own ranks may be the ones dropped.
+        self._use_team_dates(self.resolver.record_keys(matchups))
+        return [
+            {
+                "date": matchup["date"],
+                "home": matchup["home"],
+                "away": matchup["away"],
+                "projected": int(row.sum()),
+                "signals": dict(zip(self.categories, row.tolist())),
+            }
+            for matchup, row in zip(matchups, signals)
+        ]
+
+    def _use_team_dates(self, keys: Iterable[Tuple[int, str]]) -> None:
+        """Mark resolver records as just used; drop the oldest over the cap."""
+        for key in keys:
+            self._team_dates[key] = None
+            self._team_dates.move_to_end(key)
+        while len(self._team_dates) > self.max_team_dates:
+            key, _ = self._team_dates.popitem(last=False)
+            self.resolver.records.pop(key, None)
+
+    async def project_slate(self, date_value: Optional[str] = None) -> Dict[str, Any]:
+        date_value = date_value or self.today()
+        return {
+            "date": date_value,
+            "games": await self.project(await self.slate(date_value)),
+        }
+
+    async def project_matchup(
+        self, home: str, away: str, date_value: Optional[str] = None
+    ) -> Dict[str, Any]:
+        date_value = date_value or self.today()
+        parse_date(date_value)
+        # Unknown names would register a new team and fetch a page for it.
+        for team in (home, away):
+            if not self.resolver.teams.known(team):
+                raise UnknownTeamError(f"Unknown team: {team}")
+        rows = await self.project([{"date": date_value, "home": home, "away": away}])
+        return rows[0]
+
+    async def refresh(self, dates: Optional[List[str]] = None) -> int:
+        """Refetch the slates and ranks of ``dates`` (default ``live_dates``).
+
+        Returns the number of games re-projected. Cached slates and ranks
+        keep answering requests while the new ones load and are replaced
+        only by successful fetches; everything else stays warm.
+        """
+        dates = dates or self.live_dates()
+        async with self._refresh_lock:
+            started = time.perf_counter()
+            stale = {self.resolver.as_of_for(date_value) for date_value in dates}
+            keys = {
+                key: self.resolver.teams.name(key[0])
+                for key in self.resolver.records
+                if key[1] in stale
+            }
+            slates = []
+            for date_value in dates:
+                fetched = await self._load_slate(date_value)
+                slates.append(self.slates.get(date_value) or fetched)
+                keys.update(self.resolver.record_keys(slates[-1]))
+            await self.resolver.refetch(self.session, keys)
+            games = 0
+            for matchups in slates:
+                games += len(await self.project(matchups))
+            self.refreshes += 1
+            self.last_refresh = datetime.now().isoformat(timespec="seconds")
+            METRICS.observe("refresh", time.perf_counter() - started)
+        logger.info(f"Refreshed {games} games for {', '.join(dates)}")
+        return games
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Background refresh failed: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.percentiles(),
+            "slates": len(self.slates.cache),
+            "team_dates": len(self.resolver.records),
+            "page_fetches": self.resolver.fetch_count,
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh,
+            "cache_hit_rates": METRICS.cache_hit_rates(),
+        }
+
+    async def _handle_slate(self, request) -> Dict[str, Any]:
+        return await self.project_slate(request.query.get("date"))
+
+    async def _handle_matchup(self, request) -> Dict[str, Any]:
+        home, away = request.query.get("home"), request.query.get("away")
+        if not home or not away:
+            raise ValueError("home and away are required")
+        return await self.project_matchup(home, away, request.query.get("date"))
+
+    async def _handle_stats(self, request) -> Dict[str, Any]:
+        return self.stats()
+
+    async def _handle_refresh(self, request) -> Dict[str, Any]:
+        dates = request.query.get("date")
+        games = await self.refresh(dates.split(",") if dates else None)
+        return {"games": games, "refreshes": self.refreshes}
+
+    def app(self) -> "aiohttp.web.Application":
+        """JSON API: ``/slate``, ``/matchup``, ``/stats`` and ``POST /refresh``."""
+        from aiohttp import web
+
+        def endpoint(name: str, handler: Callable) -> Callable:
+            async def respond(request):
+                started = time.perf_counter()
+                try:
+                    return web.json_response(await handler(request))
+                except ValueError as e:
+                    return web.json_response({"error": str(e)}, status=400)
+                except UnknownTeamError as e:
+                    return web.json_response({"error": str(e)}, status=404)
+                finally:
+                    self.latency.observe(name, time.perf_counter() - started)
+
+            return respond
+
+        app = web.Application()
+        app.router.add_get("/slate", endpoint("slate", self._handle_slate))
+        app.router.add_get("/matchup", endpoint("matchup", self._handle_matchup))
+        app.router.add_get("/stats", endpoint("stats", self._handle_stats))
+        app.router.add_post("/refresh", endpoint("refresh", self._handle_refresh))
+        return app
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        socket_path: Optional[str] = None,
+        warm: bool = True,
+    ) -> str:
+        """Serve on ``socket_path`` if given, else on host:port; returns the address.
+
+        With ``warm`` the live dates are loaded before the first request.
+        """
+        from aiohttp import web
+
+        if warm:
+            await self.refresh()
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        if socket_path:
+            await web.UnixSite(self.runner, socket_path).start()
+            address = f"unix:{socket_path}"
+        else:
+            await web.TCPSite(self.runner, host, port).start()
+            host, port = self.runner.addresses[0][:2]
+            address = f"http://{host}:{port}"
+        if self.refresh_interval > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"Projection service listening on {address}")
+        return address
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> "ProjectionService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
@@ -0,0 +1,353 @@
+#Shards
+
+class ShardError(Exception):
+    """Raised when a shard directory does not match the run or is incomplete."""
+
+
+class Shard:
+    """A named, contiguous slice of the backtest range."""
+
+    __slots__ = ("id", "dates")
+
+    def __init__(self, shard_id: str, dates: List[str]):
+        self.id = shard_id
+        self.dates = dates
+
+    def __repr__(self) -> str:
+        return f"Shard({self.id}, {self.dates[0]}..{self.dates[-1]})"
+
+
+def shard_dates(start: str, end: str, by: str = "month") -> List[Shard]:
+    """Split ``start``..``end`` into shards by calendar month or season.
+
+    Shard IDs are the ``YYYY-MM`` or ``YYYY`` prefix of their dates, so
+    they sort in date order and name the same slice on every host.
+    """
+    if by not in SHARD_UNITS:
+        raise ValueError(f"Unknown shard unit: {by}")
+    shards: Dict[str, List[str]] = {}
+    for date_value in ScheduleProcessor.date_range(start, end):
+        shards.setdefault(date_value[: SHARD_UNITS[by]], []).append(date_value)
+    return [Shard(shard_id, dates) for shard_id, dates in shards.items()]
+
+
+class ShardedBacktest:
+    """Multi-season backtest split into shards that run in worker processes.
+
+    Each shard runs schedule -> ranks -> score -> evaluate on its own and
+    leaves ``projections.csv``, ``signals.npz`` and ``metrics.json`` in
+    ``<root>/<shard id>/``, then a ``_SUCCESS`` marker. Signals are saved
+    with the date, home and away of their games and joined back to the
+    projection rows by those keys, never by position. A worker claims
+    a shard with an exclusive ``.lock`` file first, so processes on
+    several hosts sharing ``root`` never run the same shard twice. A
+    rerun skips finished shards and retries the rest. The worker touches
+    its lock every ``lock_timeout / 4`` seconds while the shard runs, so
+    only a lock left untouched for ``lock_timeout`` seconds is taken over,
+    and never while the process that wrote it is still alive on this host.
+
+    Worker processes do not share writable state: each shard records pages
+    in its own ``<snapshot_dir>/<shard id>`` store, and an ``offline``
+    rerun replays that same store read-only.
+    """
+
+    KEYS = ["date", "home", "away"]
+    MANIFEST = "manifest.json"
+    SUCCESS = "_SUCCESS"
+    LOCK = ".lock"
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        start: str,
+        end: str,
+        by: str = "month",
+        results_path: Optional[str] = None,
+        config_path: str = "config.ini",
+        snapshot_dir: Optional[str] = None,
+        offline: bool = False,
+        lock_timeout: float = 6 * 3600,
+    ):
+        self.root = Path(root)
+        self.start = start
+        self.end = end
+        self.by = by
+        self.results_path = results_path
+        self.config_path = config_path
+        self.snapshot_dir = snapshot_dir
+        self.offline = offline
+        self.lock_timeout = lock_timeout
+        self.shards = shard_dates(start, end, by)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._check_manifest()
+
+    def _check_manifest(self) -> None:
+        manifest = {"start": self.start, "end": self.end, "by": self.by}
+        path = self.root / self.MANIFEST
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            if existing != manifest:
+                raise ShardError(
+                    f"{self.root} holds shards for {existing}; use a new directory "
+                    f"for {manifest}."
+                )
+            return
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def shard_dir(self, shard_id: str) -> Path:
+        return self.root / shard_id
+
+    def is_done(self, shard_id: str) -> bool:
+        return (self.shard_dir(shard_id) / self.SUCCESS).exists()
+
+    def pending(self) -> List[Shard]:
+        return [shard for shard in self.shards if not self.is_done(shard.id)]
+
+    @staticmethod
+    def _holder_alive(lock: Path) -> bool:
+        """Whether the lock was written by a process still running on this host.
+
+        Holders on other hosts cannot be checked and count as gone once
+        their lock goes stale.
+        """
+        try:
+            with open(lock, "r", encoding="utf-8") as f:
+                holder = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if holder.get("host") != os.uname().nodename:
+            return False
+        try:
+            os.kill(int(holder["pid"]), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def claim(self, shard_id: str) -> bool:
+        """Take the shard's lock file; False if a live worker holds it."""
+        lock = self.shard_dir(shard_id) / self.LOCK
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    age = time.time() - lock.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if age < self.lock_timeout or self._holder_alive(lock):
+                    return False
+                logger.warning(f"Taking over stale lock on shard {shard_id}")
+                lock.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "host": os.uname().nodename,
+                        "pid": os.getpid(),
+                        "claimed_at": time.time(),
+                    },
+                    f,
+                )
+            return True
+        return False
+
+    async def _heartbeat(self, shard_id: str) -> None:
+        """Keep the shard's lock fresh for as long as its pipeline runs."""
+        lock = self.shard_dir(shard_id) / self.LOCK
+        while True:
+            await asyncio.sleep(self.lock_timeout / 4)
+            try:
+                os.utime(lock)
+            except FileNotFoundError:
+                logger.warning(f"Lock on shard {shard_id} disappeared")
+                return
+
+    def release(self, shard_id: str) -> None:
+        (self.shard_dir(shard_id) / self.LOCK).unlink(missing_ok=True)
+
+    def _snapshot_store(self, shard_id: str) -> Optional[SnapshotStore]:
+        if self.snapshot_dir is None:
+            return None
+        return SnapshotStore(Path(self.snapshot_dir) / shard_id, offline=self.offline)
+
+    async def _run_pipeline(self, shard: Shard) -> Dict[str, Any]:
+        shard_dir = self.shard_dir(shard.id)
+        for name in ("projections.csv", "signals.npz", "metrics.json"):
+            (shard_dir / name).unlink(missing_ok=True)
+
+        heartbeat = asyncio.create_task(self._heartbeat(shard.id))
+        try:
+            return await self._run_shard_pipeline(shard, shard_dir)
+        finally:
+            heartbeat.cancel()
+
+    async def _run_shard_pipeline(
+        self, shard: Shard, shard_dir: Path
+    ) -> Dict[str, Any]:
+        config = Config(self.config_path)
+        settings = load_settings(self.config_path)
+        snapshot_store = self._snapshot_store(shard.id)
+        started = time.perf_counter()
+        async with http_client(settings) as session:
+            # Shards already run one per worker process; parse on the loop.
+            components = build_components(
+                config, settings, session, snapshot_store, parse_workers=0
+            )
+            resolver = components.resolver
+            schedule_processor = components.schedule_processor
+            scoring_criteria = components.scoring_criteria
+            filename = str(shard_dir / "projections.csv")
+            pipeline = RunPipeline(
+                session,
+                schedule_processor,
+                resolver,
+                components.projector,
+                scoring_criteria,
+                writer=DataWriter.infer_writer(filename),
+                filename=filename,
+                queue_size=settings.getint("pipeline", "queue_size", fallback=4),
+                rank_workers=settings.getint("pipeline", "rank_workers", fallback=2),
+            )
+            try:
+                await pipeline.run(shard.dates)
+            finally:
+                components.close()
+        failed = schedule_processor.last_fetch_stats["failed_days"]
+        if failed:
+            raise ShardError(
+                f"Schedules for {len(failed)} days failed: {', '.join(sorted(failed))}"
+            )
+
+        signals = pipeline.category_signals()
+        projections = pipeline.projections()
+        np.savez(
+            shard_dir / "signals.npz",
+            signals=signals,
+            **{
+                key: np.array([row[key] for row in projections], dtype=str)
+                for key in self.KEYS
+            },
+        )
+        metrics = {
+            "days": len(shard.dates),
+            "games": pipeline.rows_written,
+            "page_fetches": resolver.fetch_count,
+            "seconds": time.perf_counter() - started,
+        }
+        if self.results_path and projections:
+            metrics.update(
+                Backtest().evaluate(
+                    projections,
+                    load_actual_results(self.results_path),
+                    signals,
+                    list(scoring_criteria),
+                )
+            )
+        return metrics
+
+    def run_shard(self, shard: Shard) -> Dict[str, Any]:
+        """Claim, run and mark one shard. Safe to call from any process."""
+        status = {"shard": shard.id, "status": "done"}
+        if self.is_done(shard.id):
+            return status
+        if not self.claim(shard.id):
+            status["status"] = "claimed"
+            return status
+        try:
+            metrics = asyncio.run(self._run_pipeline(shard))
+            metrics_path = self.shard_dir(shard.id) / "metrics.json"
+            with open(metrics_path, "w", encoding="utf-8") as f:
+                json.dump(metrics, f, indent=2, sort_keys=True)
+            (self.shard_dir(shard.id) / self.SUCCESS).touch()
+            status["status"] = "ok"
+            logger.info(f"Shard {shard.id} finished: {metrics['games']} games")
+        except Exception as e:
+            logger.error(f"Shard {shard.id} failed: {e}", exc_info=True)
+            status.update(status="failed", error=str(e))
+        finally:
+            self.release(shard.id)
+        return status
+
+    def run(self, workers: int = 1) -> List[Dict[str, Any]]:
+        """Run every unfinished shard across ``workers`` processes."""
+        pending = self.pending()
+        logger.info(
+            f"{len(pending)} of {len(self.shards)} shards to run with {workers} workers"
+        )
+        if workers <= 1:
+            return [self.run_shard(shard) for shard in pending]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.run_shard, pending))
+
+    def _aligned_signals(self, shard_dir: Path, rows: "pd.DataFrame") -> np.ndarray:
+        """The shard's saved signals reordered to match ``rows`` by game key."""
+        with np.load(shard_dir / "signals.npz") as saved:
+            keys = pd.DataFrame({key: saved[key] for key in self.KEYS})
+            keys["_signal"] = np.arange(len(keys))
+            matched = rows[self.KEYS].merge(
+                keys.drop_duplicates(self.KEYS), on=self.KEYS, how="left"
+            )
+            if matched["_signal"].isna().any():
+                raise ShardError(f"{shard_dir} has projection rows without signals")
+            return saved["signals"][matched["_signal"].to_numpy(dtype=np.int64)]
+
+    def merge(self, output: Optional[str] = None) -> Dict[str, Any]:
+        """Combine finished shards in shard order into one output and report.
+
+        Rows and signals are concatenated in shard ID order, so the result
+        does not depend on which worker finished first; each shard's
+        signals are aligned to its rows by (date, home, away). With results,
+        the combined metrics are evaluated over every game at once.
+        """
+        missing = [shard.id for shard in self.pending()]
+        if missing:
+            raise ShardError(f"Shards not finished: {', '.join(missing)}")
+        rows: List[Dict[str, Any]] = []
+        signals = []
+        shard_metrics = {}
+        for shard in self.shards:
+            shard_dir = self.shard_dir(shard.id)
+            if (shard_dir / "projections.csv").exists():
+                shard_rows = load_actual_results(
+                    str(shard_dir / "projections.csv"), require_scores=False
+                )
+                signals.append(self._aligned_signals(shard_dir, shard_rows))
+                rows.extend(shard_rows.to_dict("records"))
+            with open(shard_dir / "metrics.json", "r", encoding="utf-8") as f:
+                shard_metrics[shard.id] = json.load(f)
+
+        categories = list(Config(self.config_path).scoring_criteria())
+        metrics = {
+            "start": self.start,
+            "end": self.end,
+            "by": self.by,
+            "games": len(rows),
+        }
+        if self.results_path and rows:
+            metrics.update(
+                Backtest().evaluate(
+                    rows,
+                    load_actual_results(self.results_path),
+                    np.vstack(signals),
+                    categories,
+                )
+            )
+        metrics["shards"] = shard_metrics
+        with open(self.root / "metrics.json", "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+        if output and rows:
+            writer = DataWriter.infer_writer(
+                output,
+                columnar_options=columnar_options(load_settings(self.config_path)),
+            )
+            writer.write_stream(output, rows)
+        return metrics
@@ -0,0 +1,289 @@
+#Snapshots
+
+class SnapshotStoreError(Exception):
+    """Raised when a page is not in the store and the network is off limits."""
+
+
+class SnapshotStore:
+    """Content-addressed, gzip-compressed on-disk store of fetched pages.
+
+    Pages are keyed by (URL, as-of date). The body is stored once per
+    distinct content hash under ``blobs/`` and the index maps each key to
+    its blob, so identical pages fetched on different days share storage.
+
+    The index lives in ``index.json`` plus an append-only journal: a put
+    appends one line, lookups are batched into the journal as access
+    times, and the journal is folded back into ``index.json`` once it has
+    more lines than half the index, so rewrites cost O(1) per put
+    amortized. Entries are kept in least-recently-used order with
+    per-blob reference counts, so a put only evicts when the store is
+    over ``max_bytes`` and then drops entries from the cold end; expired
+    entries and orphaned blobs are swept when the store is closed. An
+    offline store is read-only and writes nothing, so worker processes
+    can share one, and it serves expired pages rather than miss.
+    """
+
+    INDEX_FILE = "index.json"
+    JOURNAL_FILE = "index.journal"
+    # Access times buffered before they are appended to the journal.
+    TOUCH_BATCH = 256
+    # Journal lines before compaction: more than max(this, half the index).
+    MIN_COMPACT_LINES = 1024
+
+    def __init__(
+        self,
+        root: Union[str, Path] = "snapshots",
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        offline: bool = False,
+    ):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._refs: Dict[str, int] = defaultdict(int)
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self._touched: Dict[str, float] = {}
+        self._journal_lines = 0
+        self.index = self._load_index()
+
+    @staticmethod
+    def make_key(url: str, as_of: str) -> str:
+        return hashlib.sha256(f"{url}|{as_of}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def today() -> str:
+        return datetime.today().strftime(DATE_FORMAT)
+
+    def _load_index(self) -> "OrderedDict[str, Dict[str, Any]]":
+        """``index.json`` with the journal replayed, oldest access first."""
+        index_path = self.root / self.INDEX_FILE
+        index: Dict[str, Dict[str, Any]] = {}
+        if index_path.exists():
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(
+                    f"Discarding unreadable snapshot index {index_path}: {e}"
+                )
+        journal_path = self.root / self.JOURNAL_FILE
+        if journal_path.exists():
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A write cut short by a crash; later lines are intact.
+                        continue
+                    self._journal_lines += 1
+                    key = record["key"]
+                    if record["op"] == "put":
+                        index[key] = record["entry"]
+                    elif record["op"] == "del":
+                        index.pop(key, None)
+                    elif key in index:
+                        index[key]["accessed_at"] = record["at"]
+        ordered = OrderedDict(
+            sorted(index.items(), key=lambda item: item[1]["accessed_at"])
+        )
+        for entry in ordered.values():
+            self._add_ref(entry)
+        return ordered
+
+    def _add_ref(self, entry: Dict[str, Any]) -> None:
+        digest = entry["digest"]
+        if not self._refs[digest]:
+            self._sizes[digest] = entry["size"]
+            self.total_bytes += entry["size"]
+        self._refs[digest] += 1
+
+    def _drop_ref(self, entry: Dict[str, Any]) -> None:
+        """Release one reference; the blob is deleted with its last one."""
+        digest = entry["digest"]
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            del self._refs[digest]
+            self.total_bytes -= self._sizes.pop(digest, 0)
+            if not self.offline:
+                self._blob_path(digest).unlink(missing_ok=True)
+
+    def _append_journal(self, records: List[Dict[str, Any]]) -> None:
+        if self.offline or not records:
+            return
+        with open(self.root / self.JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        self._journal_lines += len(records)
+        if self._journal_lines > max(self.MIN_COMPACT_LINES, len(self.index) // 2):
+            self._save_index()
+
+    def _touch_records(self) -> List[Dict[str, Any]]:
+        records = [
+            {"op": "touch", "key": key, "at": at} for key, at in self._touched.items()
+        ]
+        self._touched.clear()
+        return records
+
+    def _save_index(self) -> None:
+        """Rewrite ``index.json`` from memory and start an empty journal."""
+        if self.offline:
+            return
+        self._touched.clear()
+        index_path = self.root / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, index_path)
+        (self.root / self.JOURNAL_FILE).unlink(missing_ok=True)
+        self._journal_lines = 0
+
+    def flush(self) -> None:
+        """Persist buffered access times."""
+        self._append_journal(self._touch_records())
+
+    def close(self) -> None:
+        """Persist access times, then drop expired entries and orphan blobs."""
+        self.flush()
+        self.evict()
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.gz"
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl is not None and now - entry["fetched_at"] > self.ttl
+
+    def _remove(self, key: str) -> Dict[str, Any]:
+        entry = self.index.pop(key)
+        self._touched.pop(key, None)
+        self._drop_ref(entry)
+        return entry
+
+    def get(self, url: str, as_of: Optional[str] = None) -> Optional[str]:
+        """Return the stored page for (url, as_of), or None on a miss."""
+        key = self.make_key(url, as_of or self.today())
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        # An offline replay has nothing to refetch with, so it serves stale pages.
+        if not self.offline and self._is_expired(entry, now):
+            logging.debug("Snapshot expired for %s", url)
+            return None
+        try:
+            with open(self._blob_path(entry["digest"]), "rb") as f:
+                content = gzip.decompress(f.read()).decode("utf-8")
+        except OSError as e:
+            logging.warning(f"Snapshot blob missing for {url}: {e}")
+            self._remove(key)
+            self._append_journal([{"op": "del", "key": key}])
+            return None
+        entry["accessed_at"] = now
+        self.index.move_to_end(key)
+        if not self.offline:
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self.flush()
+        return content
+
+    def put(self, url: str, content: str, as_of: Optional[str] = None) -> str:
+        """Store a page and return its content digest."""
+        as_of = as_of or self.today()
+        raw = content.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(raw))
+            os.replace(tmp_path, blob_path)
+        now = time.time()
+        key = self.make_key(url, as_of)
+        entry = {
+            "url": url,
+            "date": as_of,
+            "digest": digest,
+            "size": blob_path.stat().st_size,
+            "fetched_at": now,
+            "accessed_at": now,
+        }
+        # Reference the new blob before releasing the old one: a refetch
+        # of unchanged content must not delete the blob it points at.
+        self._add_ref(entry)
+        if key in self.index:
+            self._remove(key)
+        self.index[key] = entry
+        records = self._touch_records()
+        records.append({"op": "put", "key": key, "entry": entry})
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            evicted = self._evict_to_cap()
+            records.extend({"op": "del", "key": k} for k in evicted)
+            logging.info(f"Evicted {len(evicted)} snapshots")
+        self._append_journal(records)
+        return digest
+
+    def _evict_to_cap(self) -> List[str]:
+        """Drop least recently used entries until the store fits in max_bytes.
+
+        The newest entry is always kept.
+        """
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self.index) > 1:
+            key = next(iter(self.index))
+            self._remove(key)
+            evicted.append(key)
+        return evicted
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones over max_bytes.
+
+        Also removes blobs no entry points at, such as those left by an
+        interrupted put. Returns the number of entries dropped.
+        """
+        if self.offline:
+            return 0
+        now = time.time()
+        expired = [k for k, e in self.index.items() if self._is_expired(e, now)]
+        for key in expired:
+            self._remove(key)
+        evicted = len(expired)
+        if self.max_bytes is not None:
+            evicted += len(self._evict_to_cap())
+        self._remove_orphan_blobs()
+        if evicted:
+            self._save_index()
+            logging.info(f"Evicted {evicted} snapshots")
+        return evicted
+
+    def _remove_orphan_blobs(self) -> None:
+        for blob_path in self.blob_dir.glob("*/*.gz"):
+            if blob_path.name[: -len(".gz")] not in self._refs:
+                blob_path.unlink(missing_ok=True)
+
+    async def fetch(
+        self,
+        session: "HttpClient",
+        url: str,
+        as_of: Optional[str] = None,
+        **kwargs,
+    ) -> str:
+        """Read (url, as_of) through the store, hitting the network on a miss."""
+        content = self.get(url, as_of)
+        METRICS.cache_lookup("snapshots", content is not None)
+        if content is not None:
+            logging.debug("Snapshot hit for %s", url)
+            return content
+        if self.offline:
+            raise SnapshotStoreError(f"No snapshot for {url} ({as_of}) in offline mode")
+        content = await session.get_text(url, **kwargs)
+        self.put(url, content, as_of)
+        return content
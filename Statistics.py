@@ -0,0 +1,203 @@
+#Statistics
+
+class GameOutcomes:
+    """Per-game bet results as flat arrays, ready for resampling.
+
+    ``stats`` is a (games x 3) float matrix of bets, wins and profit per
+    game, so any resample's totals are a sum of rows. ``day`` holds each
+    game's date as an integer code for block resampling by date.
+    """
+
+    __slots__ = ("keys", "day", "stats")
+
+    def __init__(self, keys: "pd.DataFrame", day: np.ndarray, stats: np.ndarray):
+        self.keys = keys
+        self.day = day
+        self.stats = stats
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    @classmethod
+    def from_results(cls, games: "pd.DataFrame", odds: float = -110) -> "GameOutcomes":
+        """From ``Backtest.last_results``: projections joined to their results."""
+        games = games.sort_values(["date", "home", "away"], kind="stable")
+        actual = games["actual"].to_numpy(np.float64)
+        outcome = np.where(np.isfinite(actual), np.sign(actual), 0.0)
+        pick = np.sign(games["projected"].to_numpy())
+        bets = (pick != 0) & (outcome != 0)
+        wins = bets & (pick == outcome)
+        profit = np.where(wins, Backtest.decimal_odds(odds) - 1, -1.0) * bets
+        day = pd.factorize(games["date"], sort=True)[0]
+        return cls(
+            games[["date", "home", "away"]].reset_index(drop=True),
+            day,
+            np.column_stack([bets, wins, profit]).astype(np.float64),
+        )
+
+    @classmethod
+    def from_projections(
+        cls,
+        projections: Union["pd.DataFrame", List[Dict[str, Any]]],
+        actual_results: "pd.DataFrame",
+        odds: float = -110,
+    ) -> "GameOutcomes":
+        backtest = Backtest()
+        backtest.evaluate(projections, actual_results, odds=odds)
+        return cls.from_results(backtest.last_results, odds)
+
+    def totals(self) -> np.ndarray:
+        return self.stats.sum(axis=0)
+
+    def units(self, by_date: bool = False) -> np.ndarray:
+        """Rows to resample: games, or per-date totals for the block bootstrap."""
+        if not by_date:
+            return self.stats
+        days = np.zeros((self.day.max() + 1 if len(self.day) else 0, 3))
+        np.add.at(days, self.day, self.stats)
+        return days
+
+    def align(self, other: "GameOutcomes") -> Tuple["GameOutcomes", "GameOutcomes"]:
+        """Both sides restricted to the games they share, in the same order."""
+        on = ["date", "home", "away"]
+        left = self.keys.reset_index().rename(columns={"index": "_left"})
+        right = other.keys.reset_index().rename(columns={"index": "_right"})
+        shared = left.merge(right, on=on, how="inner").drop_duplicates(on)
+        rows = shared["_left"].to_numpy(), shared["_right"].to_numpy()
+        day = pd.factorize(shared["date"], sort=True)[0]
+        keys = shared[on].reset_index(drop=True)
+        return (
+            GameOutcomes(keys, day, self.stats[rows[0]]),
+            GameOutcomes(keys, day, other.stats[rows[1]]),
+        )
+
+
+class Bootstrap:
+    """Percentile bootstrap intervals for win rate and ROI.
+
+    Each chunk of resamples draws unit indices once and counts how often
+    every unit was picked with one offset ``bincount``; totals are that
+    (chunk x units) count matrix times the unit stats. Memory stays at a
+    couple of integers per unit per resample in the chunk, never a copy
+    of the stats per pick, and ten thousand resamples of a season are a
+    few array operations rather than a Python loop. Units are games, or whole
+    dates when ``by_date`` is set, which keeps same-day games (shared
+    ranks, shared conditions) together. Every call starts from ``seed``.
+    """
+
+    def __init__(
+        self,
+        resamples: int = 10000,
+        confidence: float = 0.95,
+        seed: int = 0,
+        chunk_size: int = 1000,
+    ):
+        if not 0 < confidence < 1:
+            raise ValueError(f"Confidence must be between 0 and 1: {confidence}")
+        self.resamples = resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    def resample_totals(self, units: np.ndarray) -> np.ndarray:
+        """(resamples x columns) totals of ``units`` resampled with replacement."""
+        rng = np.random.default_rng(self.seed)
+        count = len(units)
+        totals = np.empty((self.resamples, units.shape[1]))
+        if count == 0:
+            totals.fill(0.0)
+            return totals
+        chunk_size = min(self.chunk_size, self.resamples)
+        offsets = (np.arange(chunk_size) * count)[:, None]
+        for start in range(0, self.resamples, chunk_size):
+            rows = min(chunk_size, self.resamples - start)
+            # Offset each resample's picks into its own block of count bins.
+            picks = rng.integers(0, count, size=(rows, count))
+            picks += offsets[:rows]
+            counts = np.bincount(picks.ravel(), minlength=rows * count)
+            del picks
+            totals[start : start + rows] = counts.reshape(rows, count) @ units
+        return totals
+
+    @staticmethod
+    def rates(totals: np.ndarray) -> Dict[str, np.ndarray]:
+        """Win rate and ROI per row of (bets, wins, profit) totals; NaN without bets."""
+        bets = totals[..., 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "win_rate": np.where(bets > 0, totals[..., 1] / bets, np.nan),
+                "roi": np.where(bets > 0, totals[..., 2] / bets, np.nan),
+            }
+
+    def _interval(self, estimate: float, samples: np.ndarray) -> Dict[str, float]:
+        tail = (1 - self.confidence) / 2 * 100
+        low, high = np.nanpercentile(samples, [tail, 100 - tail])
+        return {
+            "estimate": float(estimate),
+            "low": float(low),
+            "high": float(high),
+            "std_error": float(np.nanstd(samples)),
+        }
+
+    def interval(self, outcomes: GameOutcomes, by_date: bool = False) -> Dict[str, Any]:
+        """Confidence intervals for win rate and ROI of one backtest."""
+        totals = outcomes.totals()
+        estimates = self.rates(totals)
+        samples = self.rates(self.resample_totals(outcomes.units(by_date)))
+        return {
+            "games": len(outcomes),
+            "bets": int(totals[0]),
+            "resamples": self.resamples,
+            "confidence": self.confidence,
+            "method": "block-by-date" if by_date else "game",
+            **{
+                metric: self._interval(estimates[metric], samples[metric])
+                for metric in ("win_rate", "roi")
+            },
+        }
+
+    def compare(
+        self, base: GameOutcomes, candidate: GameOutcomes, by_date: bool = False
+    ) -> Dict[str, Any]:
+        """Paired bootstrap of ``candidate`` minus ``base`` over their shared games.
+
+        Both sides are resampled with the same draws, so game-to-game
+        noise common to both cancels. ``p_value`` is the two-sided share of
+        resampled differences on the other side of zero.
+        """
+        base, candidate = base.align(candidate)
+        paired = np.hstack([base.units(by_date), candidate.units(by_date)])
+        totals = self.resample_totals(paired)
+        before, after = self.rates(totals[:, :3]), self.rates(totals[:, 3:])
+        before_estimate = self.rates(base.totals())
+        after_estimate = self.rates(candidate.totals())
+        result = {
+            "games": len(base),
+            "resamples": self.resamples,
+            "confidence": self.confidence,
+            "method": "block-by-date" if by_date else "game",
+        }
+        for metric in ("win_rate", "roi"):
+            diff = after[metric] - before[metric]
+            valid = diff[~np.isnan(diff)]
+            if len(valid):
+                below, above = (valid <= 0).mean(), (valid >= 0).mean()
+                p_value = min(1.0, 2 * min(below, above))
+            else:
+                p_value = float("nan")
+            change = after_estimate[metric] - before_estimate[metric]
+            result[metric] = {
+                **self._interval(change, diff),
+                "base": float(before_estimate[metric]),
+                "candidate": float(after_estimate[metric]),
+                "p_value": float(p_value),
+            }
+        return result
+
+
+def format_interval(name: str, interval: Dict[str, float], confidence: float) -> str:
+    return (
+        f"{name}: {interval['estimate'] * 100:.2f}% "
+        f"({confidence * 100:.0f}% CI {interval['low'] * 100:.2f}% "
+        f"to {interval['high'] * 100:.2f}%)"
+    )
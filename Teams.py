@@ -1,10 +1,38 @@
 #Teams
 
+def parse_schedule_html(schedule_html: str, date_value: str) -> List[Dict[str, str]]:
+    soup = BeautifulSoup(schedule_html, "html.parser")
+    schedule_data = []
+    for td in soup.find_all("td", {"class": "text-left nowrap"}):
+        for link in td.find_all("a"):
+            if "matchup" in link.get("href"):
+                team_names = re.sub(r"#[0-9]*", "", link.string).strip()
+                away_team, home_team = [
+                    team.strip() for team in team_names.split(" at ")
+                ]
+                schedule_data.append(
+                    {"date": date_value, "home": home_team, "away": away_team}
+                )
+    return schedule_data
+
+
 class ScheduleProcessor:
     """Processor for handling schedules."""
 
-    def __init__(self, cache_size: int = CACHE_SIZE):
+    SCHEDULE_URL = "https://www.teamrankings.com/mlb/schedules/?date={date}"
+
+    def __init__(
+        self,
+        cache_size: int = CACHE_SIZE,
+        snapshot_store: Optional["SnapshotStore"] = None,
+        concurrency: int = 8,
+        parse_executor: Optional["ParseExecutor"] = None,
+    ):
         self.cache_size = cache_size
+        self.snapshot_store = snapshot_store
+        self.concurrency = concurrency
+        self.parse_executor = parse_executor
+        self.last_fetch_stats: Dict[str, Any] = {}
 
     @staticmethod
     def convert_to_date(date_str: str) -> Optional[datetime]:
@@ -31,24 +59,16 @@ class ScheduleProcessor:
                 )
         return matchups
 
-    @lru_cache(maxsize=CACHE_SIZE)
     def group_by_date(
         self, matchups: List[Dict[str, str]]
-    ) -> Dict[datetime, List[Dict[str, str]]]:
-        grouped = defaultdict(list)
-        for matchup in matchups:
-            date_value = self.convert_to_date(matchup["date"])
-            if date_value:
-                grouped[date_value].append(matchup)
-        return grouped
+    ) -> Dict[date, List[Dict[str, str]]]:
+        """Matchups per game date; build a ``ScheduleIndex`` to query repeatedly."""
+        return ScheduleIndex(matchups).group_by_date()
 
-    async def fetch_data(self, url: str) -> Dict:
+    async def fetch_data(self, session: "HttpClient", url: str) -> Dict:
         """Fetch data from a given URL."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            return await session.get_json(url)
         except aiohttp.ClientError as e:
             logger.error(f"Client error fetching data: {e}")
             return {}
@@ -57,61 +77,235 @@ class ScheduleProcessor:
             return {}
 
     async def fetch_schedule_data(
-        self, session: aiohttp.ClientSession, date_value: str
+        self, session: "HttpClient", date_value: str
     ) -> List[Dict[str, str]]:
-        url = f"https://www.teamrankings.com/mlb/schedules/?date={date_value}"
+        url = self.SCHEDULE_URL.format(date=date_value)
         logger.info("Fetching schedule from: %s", url)
-        response = await session.get(url)
-        schedule_html = await response.text()
-        soup = BeautifulSoup(schedule_html, "html.parser")
-        schedule_data = []
-        for td in soup.find_all("td", {"class": "text-left nowrap"}):
-            for link in td.find_all("a"):
-                if "matchup" in link.get("href"):
-                    team_names = re.sub(r"#[0-9]*", "", link.string).strip()
-                    away_team, home_team = [
-                        team.strip() for team in team_names.split(" at ")
-                    ]
-                    schedule_data.append(
-                        {"date": date_value, "home": home_team, "away": away_team}
-                    )
-        return schedule_data
+        with METRICS.timer("schedule"):
+            if self.snapshot_store is not None:
+                schedule_html = await self.snapshot_store.fetch(
+                    session, url, as_of=date_value
+                )
+            else:
+                schedule_html = await session.get_text(url)
+            if self.parse_executor is not None:
+                return await self.parse_executor.run(
+                    parse_schedule_html, schedule_html, date_value
+                )
+            return parse_schedule_html(schedule_html, date_value)
 
-    async def get_schedule(
-        self, backtest_period: int
-    ) -> Dict[str, List[Dict[str, str]]]:
+    @staticmethod
+    def schedule_dates(backtest_period: int) -> List[str]:
         end_date = datetime.today() - timedelta(days=1)
         start_date = end_date - timedelta(days=backtest_period - 1)
-        delta = end_date - start_date
-        schedule_data = []
-        async with aiohttp.ClientSession() as session:
-            for i in range(delta.days + 1):
-                date_value = (start_date + timedelta(days=i)).strftime(DATE_FORMAT)
+        return [
+            (start_date + timedelta(days=i)).strftime(DATE_FORMAT)
+            for i in range((end_date - start_date).days + 1)
+        ]
+
+    @staticmethod
+    def date_range(start: str, end: str) -> List[str]:
+        """Every date from ``start`` to ``end`` inclusive."""
+        first = datetime.strptime(start, DATE_FORMAT)
+        last = datetime.strptime(end, DATE_FORMAT)
+        if last < first:
+            raise ValueError(f"End date {end} is before start date {start}")
+        return [
+            (first + timedelta(days=i)).strftime(DATE_FORMAT)
+            for i in range((last - first).days + 1)
+        ]
+
+    async def _fetch_day(
+        self,
+        session: "HttpClient",
+        date_value: str,
+        semaphore: asyncio.Semaphore,
+        stats: Dict[str, Any],
+    ) -> List[Dict[str, str]]:
+        """Fetch one day's schedule; the client handles rate limits and retries."""
+        async with semaphore:
+            started = time.perf_counter()
+            try:
                 daily_schedule = await self.fetch_schedule_data(session, date_value)
-                schedule_data.extend(daily_schedule)
+                stats["latency"][date_value] = time.perf_counter() - started
+                return daily_schedule
+            except SnapshotStoreError as e:
+                logger.error(f"Schedule for {date_value} unavailable: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Giving up on schedule for {date_value}: {e}")
+        stats["failed_days"].append(date_value)
+        return []
+
+    @staticmethod
+    def deduplicate(matchups: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Drop repeated (date, home, away) entries such as doubleheaders."""
+        unique = {}
+        for matchup in matchups:
+            key = (matchup["date"], matchup["home"], matchup["away"])
+            unique.setdefault(key, matchup)
+        return list(unique.values())
+
+    async def get_schedule(
+        self,
+        session: "HttpClient",
+        backtest_period: int,
+        dates: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """Fetch every day of the window concurrently over the caller's session.
+
+        Matchups are returned in date order with duplicates removed.
+        Per-day latency and failures are kept in ``last_fetch_stats``.
+        """
+        if dates is None:
+            dates = self.schedule_dates(backtest_period)
+        dates = sorted(set(dates))
+        stats = {"latency": {}, "failed_days": []}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        daily_schedules = await asyncio.gather(
+            *(self._fetch_day(session, day, semaphore, stats) for day in dates)
+        )
+        schedule_data = self.deduplicate(
+            [matchup for daily in daily_schedules for matchup in daily]
+        )
+        self.last_fetch_stats = stats
+        self.log_fetch_stats(stats, len(dates))
         return {"matchups": schedule_data}
 
+    @staticmethod
+    def log_fetch_stats(stats: Dict[str, Any], day_count: int) -> None:
+        latencies = sorted(stats["latency"].values())
+        if latencies:
+            logger.info(
+                "Schedule fetch: %d/%d days ok, latency mean %.3fs, median %.3fs, "
+                "max %.3fs",
+                len(latencies),
+                day_count,
+                sum(latencies) / len(latencies),
+                latencies[len(latencies) // 2],
+                latencies[-1],
+            )
+        if stats["failed_days"]:
+            logger.warning(
+                "Schedule fetch failed for %d days: %s",
+                len(stats["failed_days"]),
+                ", ".join(sorted(stats["failed_days"])),
+            )
+
+
+class ScheduleIndex:
+    """Games of a run indexed by date and by team, built once.
+
+    Games are kept sorted by date, so a day or a date window is a pair of
+    ``bisect`` lookups, and each team's games are a sorted list of
+    positions into the same order. Queries return the original rows.
+    """
+
+    def __init__(
+        self,
+        matchups: Iterable[Dict[str, str]],
+        teams: Optional[TeamRegistry] = None,
+    ):
+        self.teams = teams or TeamRegistry()
+        games = []
+        for row in matchups:
+            try:
+                games.append((Matchup.from_dict(row, self.teams), row))
+            except ValueError:
+                logger.warning(f"Invalid date format: {row.get('date')}")
+        games.sort(key=lambda pair: pair[0].date)
+        self.games: List[Matchup] = [game for game, _ in games]
+        self.rows: List[Dict[str, str]] = [row for _, row in games]
+        self.dates: List[date] = [game.date for game in self.games]
+        self._by_team: Dict[int, List[int]] = defaultdict(list)
+        for position, game in enumerate(self.games):
+            self._by_team[game.home].append(position)
+            if game.away != game.home:
+                self._by_team[game.away].append(position)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    @staticmethod
+    def _as_date(value: Union[str, date]) -> date:
+        return parse_date(value) if isinstance(value, str) else value
+
+    def span(
+        self,
+        start: Optional[Union[str, date]] = None,
+        end: Optional[Union[str, date]] = None,
+    ) -> slice:
+        """Positions of games dated ``start``..``end`` inclusive, as a slice.
+
+        The slice applies to any array aligned with ``rows``, such as the
+        per-game signals of the scoring stage.
+        """
+        lo, hi = 0, len(self.dates)
+        if start is not None:
+            lo = bisect.bisect_left(self.dates, self._as_date(start))
+        if end is not None:
+            hi = bisect.bisect_right(self.dates, self._as_date(end))
+        return slice(lo, max(lo, hi))
+
+    def days(self) -> List[date]:
+        return sorted(set(self.dates))
+
+    def on(self, day: Union[str, date]) -> List[Dict[str, str]]:
+        return self.rows[self.span(day, day)]
+
+    def between(
+        self, start: Union[str, date], end: Union[str, date]
+    ) -> List[Dict[str, str]]:
+        return self.rows[self.span(start, end)]
+
+    def team_positions(
+        self,
+        team_name: str,
+        start: Optional[Union[str, date]] = None,
+        end: Optional[Union[str, date]] = None,
+    ) -> List[int]:
+        """Positions of a team's games, optionally within a date window.
+
+        A team the index has never seen has no games; looking it up does
+        not register it.
+        """
+        positions = self._by_team.get(self.teams.lookup(team_name), [])
+        window = self.span(start, end)
+        lo = bisect.bisect_left(positions, window.start)
+        hi = bisect.bisect_left(positions, window.stop)
+        return positions[lo:hi]
+
+    def for_team(
+        self,
+        team_name: str,
+        start: Optional[Union[str, date]] = None,
+        end: Optional[Union[str, date]] = None,
+    ) -> List[Dict[str, str]]:
+        return [self.rows[i] for i in self.team_positions(team_name, start, end)]
+
+    def group_by_date(self) -> Dict[date, List[Dict[str, str]]]:
+        grouped = {}
+        for day, group in itertools.groupby(
+            range(len(self.rows)), key=self.dates.__getitem__
+        ):
+            grouped[day] = [self.rows[i] for i in group]
+        return grouped
+
 
 class TeamHelper:
     def __init__(self, config):
         self.config = config
 
-    @lru_cache(maxsize=1000)
-    async def group_by_date(self, matchups: List[Dict]) -> Dict[datetime, List[Dict]]:
-        grouped = defaultdict(list)
-        for matchup in matchups:
-            grouped[matchup["date"]].append(matchup)
-        return grouped
+    async def group_by_date(self, matchups: List[Dict]) -> Dict[date, List[Dict]]:
+        return ScheduleIndex(matchups).group_by_date()
 
 
-async def process_data(url: str, categories: List[str]):
+async def process_data(session: "HttpClient", url: str, categories: List[str]):
     try:
-        async with aiohttp.ClientSession() as session:
-            extractor = TeamRankingExtractor()
-            raw_data = await extractor.fetch_and_extract(session, url, "", categories)
-            cleaned_data = clean_data(raw_data)
-            logging.info("Processed data successfully")
-            return cleaned_data
+        extractor = TeamRankingExtractor()
+        raw_data = await extractor.fetch_and_extract(session, url, "", categories)
+        cleaned_data = clean_data(raw_data)
+        logging.info("Processed data successfully")
+        return cleaned_data
     except Exception as e:
         logging.error(f"Error processing data: {str(e)}")
         return None
@@ -120,7 +314,7 @@ async def process_data(url: str, categories: List[str]):
 def clean_data(raw_data: List[Matchup]) -> List[Matchup]:
     cleaned_data = []
     for matchup in raw_data:
-        if matchup.date and matchup.home and matchup.away:
+        if None not in (matchup.date, matchup.home, matchup.away):
             cleaned_data.append(matchup)
         else:
             logging.warning("Incomplete matchup data")
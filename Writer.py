@@ -5,49 +5,202 @@ class DataWriterError(Exception):
 
 
 class DataWriter:
-    supported_extensions = {".csv", ".tsv", ".txt", ".json", ".xlsx"}
+    supported_extensions = {
+        ".csv",
+        ".tsv",
+        ".txt",
+        ".json",
+        ".jsonl",
+        ".xlsx",
+        ".parquet",
+        ".arrow",
+        ".feather",
+    }
+    # Formats that can be appended to chunk by chunk.
+    supports_streaming = False
 
     def __init__(
         self,
         compression: Optional[str] = None,
         dialect: Optional[str] = None,
         validate_headers: bool = True,
+        chunk_size: int = 1000,
     ):
         self.compression = compression
         self.dialect = dialect
         self.validate_headers = validate_headers
+        self.chunk_size = chunk_size
 
     @classmethod
-    def infer_writer(cls, filename: str) -> "DataWriter":
+    def infer_writer(
+        cls, filename: str, columnar_options: Optional[Dict[str, Any]] = None
+    ) -> "DataWriter":
         ext = Path(filename).suffix
-        if ext == ".json":
+        if ext in ColumnarDataWriter.FORMATS:
+            return ColumnarDataWriter(
+                ColumnarDataWriter.FORMATS[ext], **(columnar_options or {})
+            )
+        elif ext == ".json":
             return JSONDataWriter()
+        elif ext == ".jsonl":
+            return JSONLinesDataWriter()
         elif ext == ".xlsx":
             return ExcelDataWriter()
+        elif ext == ".tsv":
+            return CSVDataWriter(sep="\t")
         else:
             return CSVDataWriter()
 
+    def _validate_chunk(
+        self, chunk: List[Dict[str, Any]], headers: Optional[List[str]] = None
+    ) -> "pd.DataFrame":
+        """Frame a chunk of rows, checking every row's keys against ``headers``."""
+        if self.validate_headers and headers is not None:
+            expected = set(headers)
+            # from_records takes the union of keys, so check row by row.
+            if any(row.keys() != expected for row in chunk):
+                raise ValueError("Inconsistent data headers.")
+        df = pd.DataFrame.from_records(chunk)
+        if self.validate_headers and headers is not None:
+            if list(df.columns) != headers:
+                raise ValueError("Inconsistent data headers.")
+        return df
+
     def _validate_data(self, data: List[Dict[str, Any]]) -> None:
         if not data:
             raise ValueError("Data is empty.")
-        if self.validate_headers:
-            headers = list(data[0].keys())
-            for item in data:
-                if list(item.keys()) != headers:
-                    raise ValueError("Inconsistent data headers.")
+        headers = list(data[0].keys())
+        for start in range(0, len(data), self.chunk_size):
+            self._validate_chunk(data[start : start + self.chunk_size], headers)
 
     def write_data(self, file: IO, data: List[Dict[str, Any]]) -> None:
-        self._validate_data(data)
-        self._write_data(file, data)
+        with METRICS.timer("write"):
+            self._validate_data(data)
+            self._write_data(file, data)
 
     def _write_data(self, file: IO, data: List[Dict[str, Any]]) -> None:
         raise NotImplementedError
 
+    def _open(self, filename: str, append: bool) -> IO:
+        mode = "a" if append else "w"
+        if self.compression == "gzip":
+            return gzip.open(filename, mode + "t", encoding="utf-8", newline="")
+        if self.compression:
+            raise DataWriterError(
+                f"Streaming does not support {self.compression} compression."
+            )
+        return open(filename, mode, encoding="utf-8", newline="")
+
+    def _write_chunk(self, handle: IO, df: "pd.DataFrame", header: bool) -> None:
+        raise NotImplementedError
+
+    def _chunks(self, rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _check_append(self, filename: str, append: bool) -> None:
+        if append:
+            raise DataWriterError(
+                f"{type(self).__name__} cannot append to {filename}; "
+                "use a streaming format such as CSV or JSON lines."
+            )
+
+    def write_stream(
+        self, filename: str, rows: Iterable[Dict[str, Any]], append: bool = False
+    ) -> int:
+        """Write rows in bounded chunks as they arrive; returns the row count.
+
+        Memory stays at one chunk. With ``append`` the rows are added to an
+        existing file and no header is repeated. Formats that cannot be
+        appended to are buffered and written with ``write_data``; asking
+        them to append raises ``DataWriterError`` rather than overwrite.
+        """
+        if not self.supports_streaming:
+            self._check_append(filename, append)
+            data = list(rows)
+            self.write_data(filename, data)
+            return len(data)
+
+        writer = self.stream_writer(filename, append)
+        try:
+            for chunk in self._chunks(rows):
+                writer.send(chunk)
+        finally:
+            writer.close()
+        return self.rows_written
+
+    async def write_stream_async(
+        self,
+        filename: str,
+        rows: AsyncIterable[Dict[str, Any]],
+        append: bool = False,
+    ) -> int:
+        """``write_stream`` for rows produced by an async iterator."""
+        if not self.supports_streaming:
+            self._check_append(filename, append)
+            data = [row async for row in rows]
+            await asyncio.to_thread(self.write_data, filename, data)
+            return len(data)
+
+        writer = self.stream_writer(filename, append)
+        chunk = []
+        try:
+            async for row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    await asyncio.to_thread(writer.send, chunk)
+                    chunk = []
+            if chunk:
+                await asyncio.to_thread(writer.send, chunk)
+        finally:
+            writer.close()
+        return self.rows_written
+
+    def stream_writer(
+        self, filename: str, append: bool = False
+    ) -> Generator[None, List[Dict[str, Any]], None]:
+        """Primed generator that writes each chunk of rows sent to it."""
+        path = Path(filename)
+        has_header = append and path.exists() and path.stat().st_size > 0
+        self.rows_written = 0
+
+        def write() -> Generator[None, List[Dict[str, Any]], None]:
+            # Nothing is opened until the first chunk, so no rows means no file.
+            chunk = yield
+            headers = list(chunk[0].keys())
+            header = not has_header
+            with self._open(filename, append) as handle:
+                while True:
+                    with METRICS.timer("write"):
+                        df = self._validate_chunk(chunk, headers)
+                        self._write_chunk(handle, df, header=header)
+                        handle.flush()
+                    header = False
+                    self.rows_written += len(df)
+                    chunk = yield
+
+        generator = write()
+        next(generator)
+        return generator
+
 
 class CSVDataWriter(DataWriter):
+    supports_streaming = True
+
+    def __init__(self, sep: str = ",", **kwargs):
+        super().__init__(**kwargs)
+        self.sep = csv.get_dialect(self.dialect).delimiter if self.dialect else sep
+
     def _write_data(self, file: IO, data: List[Dict[str, Any]]) -> None:
         df = pd.DataFrame(data)
-        df.to_csv(file, index=False, dialect=self.dialect, compression=self.compression)
+        df.to_csv(file, index=False, sep=self.sep, compression=self.compression)
+
+    def _write_chunk(self, handle: IO, df: "pd.DataFrame", header: bool) -> None:
+        df.to_csv(handle, index=False, sep=self.sep, header=header)
 
 
 class JSONDataWriter(DataWriter):
@@ -56,28 +209,248 @@ class JSONDataWriter(DataWriter):
         df.to_json(file)
 
 
+class JSONLinesDataWriter(DataWriter):
+    supports_streaming = True
+
+    def _write_data(self, file: IO, data: List[Dict[str, Any]]) -> None:
+        df = pd.DataFrame(data)
+        df.to_json(file, orient="records", lines=True, compression=self.compression)
+
+    def _write_chunk(self, handle: IO, df: "pd.DataFrame", header: bool) -> None:
+        text = df.to_json(orient="records", lines=True)
+        handle.write(text if text.endswith("\n") else text + "\n")
+
+
 class ExcelDataWriter(DataWriter):
     def _write_data(self, file: IO, data: List[Dict[str, Any]]) -> None:
         df = pd.DataFrame(data)
         df.to_excel(file, index=False)
 
 
-async def fetch_and_extract_team_ranks(session, config, schedule, categories):
-    team_ranking_extractor = TeamRankingExtractor()
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise DataWriterError("Columnar output requires pyarrow.") from e
+    return pyarrow
+
+
+class ColumnarDataWriter(DataWriter):
+    """Parquet or Arrow IPC writer with a typed, dictionary-encoded schema.
+
+    Columns follow the ``[CSV] fields`` order. Team names are dictionary
+    encoded and dates stored as ``date32``. With ``partition_by`` set to
+    ``season`` or ``month`` the output is a hive-partitioned directory, so
+    readers can load only the slices they need.
+    """
+
+    FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+    DEFAULT_FIELDS = ["date", "home", "away", "projected", "actual", "diff"]
+    PARTITIONS = {"season": ["season"], "month": ["season", "month"]}
+    supports_streaming = True
 
-    semaphore = asyncio.Semaphore(10)
-    tasks = [
-        asyncio.create_task(
-            team_ranking_extractor.fetch_and_extract(
-                session,
-                config.get_team_url(matchup[team]) + "/stats",
-                matchup[team],
-                categories,
-                semaphore,
+    def __init__(
+        self,
+        file_format: str = "parquet",
+        fields: Optional[List[str]] = None,
+        partition_by: Optional[str] = None,
+        compression: Optional[str] = "zstd",
+        **kwargs,
+    ):
+        super().__init__(compression=compression, **kwargs)
+        if partition_by is not None and partition_by not in self.PARTITIONS:
+            raise DataWriterError(f"Unknown partitioning: {partition_by}")
+        self.file_format = file_format
+        self.fields = fields or self.DEFAULT_FIELDS
+        self.partition_by = partition_by
+
+    def schema(self):
+        pa = _require_pyarrow()
+        types = {
+            "date": pa.date32(),
+            "home": pa.dictionary(pa.int16(), pa.string()),
+            "away": pa.dictionary(pa.int16(), pa.string()),
+            "projected": pa.int32(),
+            "actual": pa.float64(),
+            "diff": pa.float64(),
+            "home_score": pa.int32(),
+            "away_score": pa.int32(),
+        }
+        columns = [pa.field(name, types.get(name, pa.string())) for name in self.fields]
+        if self.partition_by:
+            columns += [pa.field("season", pa.int16()), pa.field("month", pa.int8())]
+        return pa.schema(columns)
+
+    def to_table(self, df: "pd.DataFrame"):
+        pa = _require_pyarrow()
+        df = df.reindex(columns=self.fields)
+        df["date"] = pd.to_datetime(df["date"]).dt.date
+        if self.partition_by:
+            dates = pd.to_datetime(df["date"])
+            df["season"] = dates.dt.year
+            df["month"] = dates.dt.month
+        return pa.Table.from_pandas(df, schema=self.schema(), preserve_index=False)
+
+    def _write_data(self, file: str, data: List[Dict[str, Any]]) -> None:
+        with self._open(file, append=False) as sink:
+            self._write_chunk(sink, pd.DataFrame(data), header=True)
+
+    def _open(self, filename: str, append: bool) -> "_ColumnarSink":
+        if append and not self.partition_by:
+            raise DataWriterError(
+                "Single-file columnar output cannot be appended; set partition_by."
+            )
+        return _ColumnarSink(self, filename, append)
+
+    def _write_chunk(
+        self, sink: "_ColumnarSink", df: "pd.DataFrame", header: bool
+    ) -> None:
+        sink.write(self.to_table(df))
+
+
+class _ColumnarSink:
+    """File-like target for ``ColumnarDataWriter`` chunks.
+
+    Partitioned output is rewritten partition by partition: without
+    ``append`` each partition a run touches is cleared before its first
+    chunk lands, and partitions the run does not touch are kept. Part
+    files carry a per-run ID only when appending, so appends never
+    overwrite earlier parts.
+    """
+
+    def __init__(self, writer: ColumnarDataWriter, filename: str, append: bool = False):
+        self.writer = writer
+        self.filename = filename
+        self.append = append
+        self._cleared: set = set()
+        self._file_writer = None
+        self._parts = 0
+        self._run_id = f"{int(time.time() * 1000)}-{os.getpid()}"
+        self._dictionaries: Dict[str, Dict[str, int]] = {}
+
+    def _extend_dictionaries(self, table):
+        """Re-encode dictionary columns against a growing per-file dictionary.
+
+        IPC files only accept dictionary deltas, so every batch's dictionary
+        must start with the previous one.
+        """
+        pa = _require_pyarrow()
+        for i, field in enumerate(table.schema):
+            if not pa.types.is_dictionary(field.type):
+                continue
+            lookup = self._dictionaries.setdefault(field.name, {})
+            values = table.column(i).to_pylist()
+            for value in values:
+                if value is not None and value not in lookup:
+                    lookup[value] = len(lookup)
+            indices = pa.array(
+                [None if v is None else lookup[v] for v in values],
+                type=field.type.index_type,
+            )
+            encoded = pa.DictionaryArray.from_arrays(
+                indices, pa.array(list(lookup), type=field.type.value_type)
             )
+            table = table.set_column(i, field, encoded)
+        return table
+
+    def _clear_partitions(self, table) -> None:
+        """Delete the existing data of partitions this run writes for the first time."""
+        columns = self.writer.PARTITIONS[self.writer.partition_by]
+        values = zip(*(table.column(name).to_pylist() for name in columns))
+        for partition in set(values) - self._cleared:
+            self._cleared.add(partition)
+            path = Path(self.filename).joinpath(
+                *(f"{name}={value}" for name, value in zip(columns, partition))
+            )
+            if path.is_dir():
+                shutil.rmtree(path)
+
+    def write(self, table) -> None:
+        pa = _require_pyarrow()
+        writer = self.writer
+        if writer.partition_by:
+            if not self.append:
+                self._clear_partitions(table)
+            run = f"{self._run_id}-" if self.append else ""
+            pa.dataset.write_dataset(
+                table,
+                self.filename,
+                format="parquet" if writer.file_format == "parquet" else "arrow",
+                partitioning=writer.PARTITIONS[writer.partition_by],
+                partitioning_flavor="hive",
+                basename_template=f"part-{run}{self._parts}-{{i}}."
+                + ("parquet" if writer.file_format == "parquet" else "arrow"),
+                existing_data_behavior="overwrite_or_ignore",
+                file_options=self._file_options(),
+            )
+            self._parts += 1
+            return
+        if self._file_writer is None:
+            if writer.file_format == "parquet":
+                self._file_writer = pa.parquet.ParquetWriter(
+                    self.filename, table.schema, compression=writer.compression
+                )
+            else:
+                self._file_writer = pa.ipc.new_file(
+                    self.filename,
+                    table.schema,
+                    options=pa.ipc.IpcWriteOptions(
+                        compression=writer.compression, emit_dictionary_deltas=True
+                    ),
+                )
+        if writer.file_format == "parquet":
+            self._file_writer.write_table(table)
+        else:
+            self._file_writer.write_table(self._extend_dictionaries(table))
+
+    def _file_options(self):
+        pa = _require_pyarrow()
+        if self.writer.file_format == "parquet":
+            return pa.dataset.ParquetFileFormat().make_write_options(
+                compression=self.writer.compression
+            )
+        return pa.dataset.IpcFileFormat().make_write_options(
+            compression=self.writer.compression
         )
-        for matchup in schedule["matchups"]
-        for team in ["home", "away"]
-    ]
 
-    return await asyncio.gather(*tasks)
\ No newline at end of file
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._file_writer is not None:
+            self._file_writer.close()
+            self._file_writer = None
+
+    def __enter__(self) -> "_ColumnarSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_columnar(
+    path: str, columns: Optional[List[str]] = None, filter: Any = None
+):
+    """Read back only the needed columns/partitions of columnar output.
+
+    Arrow IPC files are memory mapped, so column access is zero-copy.
+    ``filter`` is a ``pyarrow.dataset`` expression, for example
+    ``pyarrow.dataset.field("season") == 2024``.
+    """
+    pa = _require_pyarrow()
+    file_format = "parquet"
+    if Path(path).suffix in (".arrow", ".feather") or any(Path(path).rglob("*.arrow")):
+        file_format = "ipc"
+    if file_format == "ipc" and Path(path).is_file() and filter is None:
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return table.select(columns) if columns else table
+    dataset = pa.dataset.dataset(path, format=file_format, partitioning="hive")
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+async def fetch_and_extract_team_ranks(session, schedule, resolver):
+    """Home/away ranks per matchup, resolved once per unique team and date."""
+    await resolver.resolve_matchups(session, schedule["matchups"])
+    return [resolver.ranks_for(matchup) for matchup in schedule["matchups"]]
@@ -1,38 +1,159 @@
 #Backtest & Machine Learning
 
 class MachineLearning:
-    def __init__(self, model_type: str, model_path: str, scaler_path: str):
+    """Game classifier over rank features, with a batched float32 pipeline.
+
+    Features are built once per batch of games as a float32 array and
+    scaled with a cached copy of the fitted scaler's mean and scale, so a
+    full season is one vectorized ``predict`` call. ``train_model`` with
+    ``incremental=True`` (or ``train_stream`` over day chunks) updates the
+    scaler and model through ``partial_fit`` instead of refitting history.
+    Saved models are memory-mapped copy-on-write when loaded.
+    """
+
+    def __init__(
+        self,
+        model_type: str,
+        model_path: str,
+        scaler_path: str,
+        mmap_mode: Optional[str] = "c",
+    ):
         self.model_type = model_type
         self.model_path = model_path
         self.scaler_path = scaler_path
+        self.mmap_mode = mmap_mode
         self.model = None
         self.scaler = None
+        self._scale_cache: Optional[Tuple[np.ndarray, np.ndarray]] = None
         self._initialize_model_and_scaler()
 
     def _initialize_model_and_scaler(self):
         self.model = self._get_model()
         self.scaler = self._get_scaler()
 
+    def _load(self, path: str) -> Any:
+        return joblib.load(path, mmap_mode=self.mmap_mode)
+
     def _get_model(self) -> Any:
-        if self.model_type == "linear":
-            return joblib.load(self.model_path)
-        elif self.model_type == "neural":
-            # Assuming using some framework like TensorFlow or PyTorch
-            return self._load_neural_model(self.model_path)
-        else:
+        if self.model_type not in ("linear", "neural"):
             raise ValueError(f"Unknown model type: {self.model_type}")
+        if not Path(self.model_path).exists():
+            logging.info(f"No model at {self.model_path}; starting a new one")
+            if self.model_type == "linear":
+                return SGDClassifier(loss="log_loss", random_state=42)
+            return MLPClassifier(hidden_layer_sizes=(32,), random_state=42)
+        if self.model_type == "linear":
+            return self._load(self.model_path)
+        return self._load_neural_model(self.model_path)
+
+    def _load_neural_model(self, path: str) -> Any:
+        """scikit-learn ``MLPClassifier`` persisted with joblib."""
+        model = self._load(path)
+        if not hasattr(model, "coefs_"):
+            raise ValueError(f"{path} does not hold a fitted neural network model")
+        return model
 
     def _get_scaler(self) -> Any:
-        return joblib.load(self.scaler_path)
+        if not Path(self.scaler_path).exists():
+            return StandardScaler()
+        return self._load(self.scaler_path)
+
+    @staticmethod
+    def build_features(home_matrix: np.ndarray, away_matrix: np.ndarray) -> np.ndarray:
+        """(games x 3 * categories) float32 features from rank matrices.
+
+        Home ranks, away ranks and their difference. The -1 sentinel and
+        NaN both mean a missing rank and are imputed with the scaler mean.
+        """
+        home = np.asarray(home_matrix, dtype=np.float32)
+        away = np.asarray(away_matrix, dtype=np.float32)
+        home = np.where(home < 0, np.nan, home)
+        away = np.where(away < 0, np.nan, away)
+        return np.hstack([home, away, away - home])
+
+    @staticmethod
+    def game_labels(margins: np.ndarray) -> np.ndarray:
+        """1 for a home win, 0 otherwise."""
+        return (np.asarray(margins) > 0).astype(np.int8)
+
+    @staticmethod
+    def day_chunks(
+        features: np.ndarray, labels: np.ndarray, dates: np.ndarray
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Split date-sorted aligned arrays into one chunk per game day."""
+        _, starts = np.unique(np.asarray(dates), return_index=True)
+        bounds = list(starts[1:]) + [len(features)]
+        for start, stop in zip(starts, bounds):
+            yield features[start:stop], labels[start:stop]
+
+    def _scaling(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self._scale_cache is None and hasattr(self.scaler, "mean_"):
+            scale = np.asarray(self.scaler.scale_, dtype=np.float32)
+            self._scale_cache = (
+                np.asarray(self.scaler.mean_, dtype=np.float32),
+                np.float32(1) / np.where(scale == 0, np.float32(1), scale),
+            )
+        return self._scale_cache
+
+    def preprocess_data(self, data: Union[np.ndarray, List[List[Any]]]) -> np.ndarray:
+        """Scale a feature batch as float32; missing values become the mean."""
+        features = np.asarray(data, dtype=np.float32)
+        scaling = self._scaling()
+        if scaling is not None:
+            mean, inverse_scale = scaling
+            features = (features - mean) * inverse_scale
+        elif hasattr(self.scaler, "n_features_in_"):
+            features = self.scaler.transform(features).astype(np.float32)
+        return np.nan_to_num(features, nan=0.0, copy=False)
 
     def split_data(self, data, labels):
         return train_test_split(data, labels, test_size=0.2, random_state=42)
 
     def train_model(
-        self, data: List[List[Any]], labels: List[Any], incremental: bool = False
+        self,
+        data: Union[np.ndarray, List[List[Any]]],
+        labels: Union[np.ndarray, List[Any]],
+        incremental: bool = False,
+        classes: Optional[np.ndarray] = None,
     ) -> None:
-        data = self.preprocess_data(data)
-        self.model.fit(data, labels)
+        """Fit on ``data``, or with ``incremental`` update the current model.
+
+        Incremental updates need a model with ``partial_fit``; ``classes``
+        must list every label the first time an unfitted model is updated.
+        """
+        features = np.asarray(data, dtype=np.float32)
+        if incremental:
+            if not hasattr(self.model, "partial_fit"):
+                raise ValueError(
+                    f"{type(self.model).__name__} does not support incremental training"
+                )
+            self.scaler.partial_fit(features)
+            self._scale_cache = None
+            if not hasattr(self.model, "classes_"):
+                classes = np.unique(labels) if classes is None else classes
+                self.model.partial_fit(
+                    self.preprocess_data(features), labels, classes=classes
+                )
+            else:
+                self.model.partial_fit(self.preprocess_data(features), labels)
+            return
+        self.scaler.fit(features)
+        self._scale_cache = None
+        self.model.fit(self.preprocess_data(features), labels)
+
+    def train_stream(
+        self,
+        chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+        classes: Optional[np.ndarray] = None,
+    ) -> int:
+        """Incrementally train over streamed (features, labels) chunks."""
+        rows = 0
+        for features, labels in chunks:
+            if len(features):
+                self.train_model(features, labels, incremental=True, classes=classes)
+                rows += len(features)
+        logging.info("Trained incrementally on %d games", rows)
+        return rows
 
     def evaluate_model(
         self, data: List[List[Any]], labels: List[Any]
@@ -49,27 +170,44 @@ class MachineLearning:
         logging.info(f"Evaluation metrics: {metrics}")
         return metrics
 
-    def predict(self, data: List[List[Any]]) -> List[Any]:
-        data = self.preprocess_data(data)
-        return self.model.predict(data)
+    def predict(self, data: Union[np.ndarray, List[List[Any]]]) -> np.ndarray:
+        return self.model.predict(self.preprocess_data(data))
+
+    def predict_proba(self, data: Union[np.ndarray, List[List[Any]]]) -> np.ndarray:
+        return self.model.predict_proba(self.preprocess_data(data))
 
-    def predict_proba(self, data: List[List[Any]]) -> List[List[float]]:
-        data = self.preprocess_data(data)
-        return self.model.predict_proba(data)
+    def predict_games(
+        self, home_matrix: np.ndarray, away_matrix: np.ndarray
+    ) -> np.ndarray:
+        """Home-win probability for every game in one vectorized call."""
+        features = self.build_features(home_matrix, away_matrix)
+        return self.predict_proba(features)[:, list(self.model.classes_).index(1)]
+
+    def save(self) -> None:
+        """Write the model and scaler back to their own paths."""
+        joblib.dump(self.model, self.model_path)
+        joblib.dump(self.scaler, self.scaler_path)
 
     def save_model(self, path: str) -> None:
         joblib.dump((self.model, self.scaler), path)
 
     @staticmethod
-    def load_model(path: str) -> Tuple[Any, Any]:
-        model, scaler = joblib.load(path)
+    def load_model(path: str, mmap_mode: Optional[str] = "c") -> Tuple[Any, Any]:
+        model, scaler = joblib.load(path, mmap_mode=mmap_mode)
         logging.info(f"Model loaded from {path}")
         return model, scaler
 
 
 class Backtest:
-    def __init__(self):
+    def __init__(self, rank_history: Optional["RankHistory"] = None):
         self.cache = LRUCache(capacity=100)
+        self.rank_history = rank_history
+
+    def ranks_as_of(self, team: str, game_date: str) -> Optional[Dict[str, int]]:
+        """Team ranks as they stood on ``game_date``, from local history."""
+        if self.rank_history is None:
+            return None
+        return self.rank_history.as_of(team, game_date)
 
     def get_backtest_period(self) -> int:
         parser = argparse.ArgumentParser()
@@ -79,18 +217,142 @@ class Backtest:
         args = parser.parse_args()
         return args.backtest_period
 
+    @staticmethod
+    def decimal_odds(american_odds: float) -> float:
+        if american_odds < 0:
+            return 1 + 100 / -american_odds
+        return 1 + american_odds / 100
+
+    def evaluate(
+        self,
+        projections: Union["pd.DataFrame", List[Dict[str, Any]]],
+        actual_results: "pd.DataFrame",
+        category_signals: Optional[np.ndarray] = None,
+        categories: Optional[List[str]] = None,
+        odds: float = -110,
+    ) -> Dict[str, Any]:
+        """Join projections to results by (date, home, away) and score them.
+
+        A positive projection picks the home team, a negative one the away
+        team; zero projections and tied, missing or unplayed (NaN score)
+        results place no bet.
+        ROI is profit per unit staked at flat ``odds`` (American).
+        ``category_signals`` holds the per-category points behind each
+        projection row, as returned by ``calculate_signals_batch``.
+        """
+        keys = ["date", "home", "away"]
+        projected = pd.DataFrame(projections)
+        projected["_row"] = np.arange(len(projected))
+        results = actual_results.drop_duplicates(keys)
+        games = projected.merge(
+            results[keys + ["home_score", "away_score"]], on=keys, how="inner"
+        )
+
+        margin = (games["home_score"] - games["away_score"]).to_numpy(np.float64)
+        # Unplayed games (NaN scores) have no outcome, so no bet and no call.
+        outcome = np.where(np.isfinite(margin), np.sign(margin), 0.0)
+        pick = np.sign(games["projected"].to_numpy())
+        bets = (pick != 0) & (outcome != 0)
+        wins = bets & (pick == outcome)
+        bet_count = int(bets.sum())
+        win_count = int(wins.sum())
+        profit = win_count * (self.decimal_odds(odds) - 1) - (bet_count - win_count)
+
+        games["actual"] = margin
+        games["diff"] = games["projected"].to_numpy() - margin
+        self.last_results = games.drop(columns=["_row"])
+
+        metrics = {
+            "games": len(projected),
+            "matched": len(games),
+            "bets": bet_count,
+            "wins": win_count,
+            "win_rate": win_count / bet_count if bet_count else 0.0,
+            "profit": profit,
+            "roi": profit / bet_count if bet_count else 0.0,
+        }
+
+        if category_signals is not None:
+            signals = np.asarray(category_signals)[games["_row"].to_numpy()]
+            called = (signals != 0) & (outcome != 0)[:, None]
+            hits = called & (signals == outcome[:, None])
+            called_count = called.sum(axis=0)
+            rates = np.divide(
+                hits.sum(axis=0),
+                called_count,
+                out=np.zeros(signals.shape[1]),
+                where=called_count > 0,
+            )
+            names = categories or [str(i) for i in range(signals.shape[1])]
+            metrics["category_hit_rates"] = dict(zip(names, rates.tolist()))
+            metrics["category_calls"] = dict(zip(names, called_count.tolist()))
+
+        return metrics
+
     def backtest_model(
-        self, projections: List[Dict[str, Any]], actual_results: Dict[str, Any]
+        self,
+        projections: List[Dict[str, Any]],
+        actual_results: Union["pd.DataFrame", Dict[str, Any], None],
+        category_signals: Optional[np.ndarray] = None,
+        categories: Optional[List[str]] = None,
     ) -> float:
-        # Implement the backtesting logic here
-        win_rate = 0.0
-        # ...
-        return win_rate
-
-    def run_backtest(self) -> None:
-        model = load("trained_model.joblib")
-        train_data, train_labels, test_data, test_labels = extract_matchups()
-        accuracy = self.backtest_model(
-            model, train_data, train_labels, test_data, test_labels
+        """Win rate of ``projections`` against actual results.
+
+        The full metrics of the last run are kept in ``last_metrics``.
+        """
+        if not projections or actual_results is None or len(actual_results) == 0:
+            logging.warning("No projections or actual results to backtest.")
+            self.last_metrics = {}
+            return 0.0
+        if not isinstance(actual_results, pd.DataFrame):
+            actual_results = pd.DataFrame(actual_results)
+        self.last_metrics = self.evaluate(
+            projections, actual_results, category_signals, categories
         )
-        print(f"Accuracy: {accuracy}")
+        logging.info(f"Backtest metrics: {self.last_metrics}")
+        return self.last_metrics["win_rate"]
+
+    def run_backtest(self, projections_path: str, results_path: str) -> Dict[str, Any]:
+        """Evaluate a saved projections file against a results file."""
+        projections = load_actual_results(projections_path, require_scores=False)
+        actual_results = load_actual_results(results_path)
+        win_rate = self.backtest_model(projections.to_dict("records"), actual_results)
+        print(f"Win Rate: {win_rate * 100:.2f}%")
+        return self.last_metrics
+
+
+def load_actual_results(
+    path: str, require_scores: bool = True
+) -> "pd.DataFrame":
+    """Load game rows from a CSV, TSV, JSON, JSON-lines or columnar file.
+
+    Results need ``date``, ``home``, ``away``, ``home_score`` and
+    ``away_score`` columns. Dates are normalized to ``DATE_FORMAT`` so
+    they join against projection rows. Parquet and Arrow output, single
+    files or partitioned directories, is read with ``read_columnar``;
+    partition columns are dropped and team names decoded to strings.
+    """
+    ext = Path(path).suffix
+    if ext in ColumnarDataWriter.FORMATS or Path(path).is_dir():
+        df = read_columnar(path).to_pandas()
+        df = df.drop(columns=["season", "month"], errors="ignore")
+        for column in ("home", "away"):
+            if column in df.columns:
+                df[column] = df[column].astype(str)
+    elif ext == ".json":
+        df = pd.read_json(path)
+    elif ext == ".jsonl":
+        df = pd.read_json(path, lines=True)
+    elif ext == ".tsv":
+        df = pd.read_csv(path, sep="\t")
+    else:
+        df = pd.read_csv(path)
+
+    required = ["date", "home", "away"]
+    if require_scores:
+        required += ["home_score", "away_score"]
+    missing = [column for column in required if column not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    df["date"] = pd.to_datetime(df["date"]).dt.strftime(DATE_FORMAT)
+    return df
@@ -1,74 +1,715 @@
 #main
-async def main(backtest_period: int, output: str):
+if __name__ == "__main__":
+    # Run as a script: the CLI itself needs no part beyond Models; a command
+    # loads the parts it runs with once its arguments parse.
+    import runtime
+
+    runtime.load_modules("Models")
+    runtime.export(globals())
+
+# Parts each command runs with (see ``runtime.load_modules``). --help and
+# argument errors stop before any of them is loaded.
+COMMAND_MODULES = {
+    "scrape": ("main",),
+    "project": ("main", "Checkpoint", "Pipeline", "Statistics", "backtest"),
+    "backtest": ("Statistics", "backtest"),
+    "serve": ("main", "Service"),
+    "shards": ("Shards",),
+    "compare": ("Statistics", "backtest"),
+    "write": ("Writer", "backtest"),
+}
+
+
+def load_settings(
+    path: str = "config.ini", preserve_case: bool = False
+) -> configparser.ConfigParser:
+    """Raw config.ini access for tuning sections not covered by Config."""
+    settings = configparser.ConfigParser()
+    if preserve_case:
+        settings.optionxform = str
+    settings.read(path)
+    return settings
+
+
+def open_snapshot_store(
+    snapshot_dir: Optional[str] = None,
+    offline: bool = False,
+    snapshot_ttl: Optional[float] = None,
+    snapshot_max_mb: Optional[float] = None,
+) -> Optional["SnapshotStore"]:
+    if not (snapshot_dir or offline):
+        return None
+    snapshot_store = SnapshotStore(
+        snapshot_dir or "snapshots",
+        ttl=snapshot_ttl * 3600 if snapshot_ttl is not None else None,
+        max_bytes=int(snapshot_max_mb * 1024 * 1024) if snapshot_max_mb else None,
+        offline=offline,
+    )
+    logger.info(f"Reading pages through snapshot store at {snapshot_store.root}")
+    return snapshot_store
+
+
+def http_client(settings: configparser.ConfigParser) -> "HttpClient":
+    return HttpClient(
+        limit=settings.getint("http", "limit", fallback=100),
+        limit_per_host=settings.getint("http", "limit_per_host", fallback=10),
+        rate=settings.getfloat("http", "rate_limit", fallback=None),
+        burst=settings.getfloat("http", "burst", fallback=None),
+        max_retries=settings.getint("http", "max_retries", fallback=3),
+        backoff=settings.getfloat("http", "backoff", fallback=0.5),
+        timeout=settings.getfloat("http", "timeout", fallback=60),
+        dns_ttl=settings.getint("http", "dns_ttl", fallback=300),
+    )
+
+
+def columnar_options(settings: configparser.ConfigParser) -> Dict[str, Any]:
+    return {
+        "fields": [field.strip() for field in settings.get("CSV", "fields").split(",")],
+        "partition_by": settings.get("columnar", "partition_by", fallback=None) or None,
+        "compression": settings.get("columnar", "compression", fallback="zstd"),
+    }
+
+
+class Components:
+    """The rank, schedule and scoring objects a command runs with.
+
+    Built from config.ini by ``build_components``; ``close`` shuts down
+    the parse pool, if any, and flushes the snapshot store.
+    """
+
+    __slots__ = (
+        "scoring_criteria",
+        "scoring_keys",
+        "team_name_mapping",
+        "rank_history",
+        "snapshot_store",
+        "parse_executor",
+        "resolver",
+        "schedule_processor",
+        "projector",
+    )
+
+    def __init__(
+        self,
+        scoring_criteria: Dict[str, float],
+        scoring_keys: List[str],
+        team_name_mapping: Dict[str, str],
+        rank_history: Optional["RankHistory"],
+        snapshot_store: Optional["SnapshotStore"],
+        parse_executor: Optional["ParseExecutor"],
+        resolver: "RankResolver",
+        schedule_processor: "ScheduleProcessor",
+        projector: "PointsProjector",
+    ):
+        self.scoring_criteria = scoring_criteria
+        self.scoring_keys = scoring_keys
+        self.team_name_mapping = team_name_mapping
+        self.rank_history = rank_history
+        self.snapshot_store = snapshot_store
+        self.parse_executor = parse_executor
+        self.resolver = resolver
+        self.schedule_processor = schedule_processor
+        self.projector = projector
+
+    def close(self) -> None:
+        if self.parse_executor is not None:
+            self.parse_executor.shutdown()
+        if self.snapshot_store is not None:
+            self.snapshot_store.close()
+
+
+def build_components(
+    config: Config,
+    settings: configparser.ConfigParser,
+    session: "HttpClient",
+    snapshot_store: Optional["SnapshotStore"] = None,
+    history_dir: Optional[str] = None,
+    parse_workers: Optional[int] = None,
+    window_days: Optional[int] = None,
+) -> Components:
+    """Wire config -> rank history -> resolver -> scrapers for any command.
+
+    ``parse_workers`` overrides ``[parser] workers``; 0 parses pages on
+    the event loop. ``window_days`` overrides ``[ranks] window_days``.
+    """
+    scoring_criteria = config.scoring_criteria()
+    scoring_keys = [key.lower().replace("%%", "") for key in scoring_criteria]
+    team_name_mapping = dict(settings["team_name_mapping"])
+    rank_history = None
+    if history_dir:
+        rank_history = RankHistory(
+            history_dir, sorted(set(team_name_mapping.values())), scoring_keys
+        )
+    if parse_workers is None:
+        parse_workers = settings.getint("parser", "workers", fallback=0)
+    parse_executor = None
+    if parse_workers > 0:
+        parse_executor = ParseExecutor(
+            parse_workers, settings.get("parser", "executor", fallback="process")
+        )
+    resolver = RankResolver(
+        TeamRankingExtractor(
+            snapshot_store=snapshot_store,
+            parser_backend=settings.get("parser", "backend", fallback="bs4"),
+            parse_executor=parse_executor,
+        ),
+        config.get_categories(),
+        scoring_keys,
+        team_name_mapping,
+        history=rank_history,
+        window_days=window_days or settings.getint("ranks", "window_days", fallback=7),
+    )
+    return Components(
+        scoring_criteria,
+        scoring_keys,
+        team_name_mapping,
+        rank_history,
+        snapshot_store,
+        parse_executor,
+        resolver,
+        ScheduleProcessor(
+            snapshot_store=snapshot_store,
+            parse_executor=parse_executor,
+            concurrency=settings.getint("schedule", "concurrency", fallback=8),
+        ),
+        PointsProjector(
+            config, session, rank_resolver=resolver, rank_history=rank_history
+        ),
+    )
+
+
+async def scrape(
+    backtest_period: int,
+    snapshot_dir: Optional[str] = None,
+    offline: bool = False,
+    snapshot_ttl: Optional[float] = None,
+    snapshot_max_mb: Optional[float] = None,
+    history_dir: Optional[str] = None,
+) -> Dict[str, int]:
+    """Fetch schedules and team ranks for the window without scoring or writing.
+
+    Pages land in the snapshot store and ranks in the rank history, so
+    later ``project`` runs can be served from disk.
+    """
+    config = Config("config.ini")
+    settings = load_settings("config.ini")
+    snapshot_store = open_snapshot_store(
+        snapshot_dir, offline, snapshot_ttl, snapshot_max_mb
+    )
+    if snapshot_store is None and not history_dir:
+        logger.warning(
+            "Scraping with neither --snapshot_dir nor --history_dir keeps nothing."
+        )
+    async with http_client(settings) as session:
+        components = build_components(
+            config, settings, session, snapshot_store, history_dir
+        )
+        try:
+            schedule = await components.schedule_processor.get_schedule(
+                session, backtest_period
+            )
+            resolver = components.resolver
+            await resolver.resolve_matchups(session, schedule["matchups"])
+        finally:
+            components.close()
+    summary = {
+        "games": len(schedule["matchups"]),
+        "team_dates": len(resolver.records),
+        "page_fetches": resolver.fetch_count,
+    }
+    print(
+        f"Scraped {summary['games']} games; ranks for {summary['team_dates']} "
+        f"team-dates ({summary['page_fetches']} page fetches)."
+    )
+    return summary
+
+
+async def serve(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    socket_path: Optional[str] = None,
+    snapshot_dir: Optional[str] = None,
+    offline: bool = False,
+    snapshot_ttl: Optional[float] = None,
+    snapshot_max_mb: Optional[float] = None,
+    history_dir: Optional[str] = None,
+) -> None:
+    """Run the resident projection service until interrupted."""
+    config = Config("config.ini")
+    settings = load_settings("config.ini")
+    snapshot_store = open_snapshot_store(
+        snapshot_dir, offline, snapshot_ttl, snapshot_max_mb
+    )
+    if snapshot_store is not None and snapshot_store.ttl is None:
+        logger.warning(
+            "Snapshots without --snapshot_ttl never expire; background refreshes "
+            "will serve today's pages from the store."
+        )
+    async with http_client(settings) as session:
+        # Live projections use ranks as of today, shared by the whole slate.
+        components = build_components(
+            config, settings, session, snapshot_store, history_dir, window_days=1
+        )
+        service = ProjectionService(
+            session,
+            components.schedule_processor,
+            components.resolver,
+            components.projector,
+            components.scoring_criteria,
+            refresh_interval=settings.getfloat(
+                "service", "refresh_minutes", fallback=15
+            )
+            * 60,
+            lookahead_days=settings.getint("service", "lookahead_days", fallback=0),
+        )
+        try:
+            async with service:
+                address = await service.start(
+                    host or settings.get("service", "host", fallback="127.0.0.1"),
+                    port or settings.getint("service", "port", fallback=8080),
+                    socket_path=socket_path,
+                )
+                print(f"Serving projections on {address}")
+                try:
+                    await asyncio.Event().wait()
+                finally:
+                    print(json.dumps(service.stats()["latency"], indent=2))
+        finally:
+            components.close()
+
+
+def bootstrap(settings: configparser.ConfigParser) -> "Bootstrap":
+    return Bootstrap(
+        resamples=settings.getint("statistics", "resamples", fallback=10000),
+        confidence=settings.getfloat("statistics", "confidence", fallback=0.95),
+        seed=settings.getint("statistics", "seed", fallback=0),
+    )
+
+
+def report_intervals(
+    backtest: "Backtest", settings: configparser.ConfigParser
+) -> Optional[Dict[str, Any]]:
+    """Print bootstrap intervals for the last backtest's win rate and ROI."""
+    if getattr(backtest, "last_results", None) is None or not backtest.last_metrics:
+        return None
+    by_date = settings.getboolean("statistics", "block_by_date", fallback=True)
+    intervals = bootstrap(settings).interval(
+        GameOutcomes.from_results(backtest.last_results), by_date=by_date
+    )
+    for name, key in (("Win Rate", "win_rate"), ("ROI", "roi")):
+        print(format_interval(name, intervals[key], intervals["confidence"]))
+    logger.info(f"Bootstrap intervals: {intervals}")
+    return intervals
+
+
+def compare_projections(
+    base_path: str, candidate_path: str, results_path: str, by_date: bool = True
+) -> Dict[str, Any]:
+    """Paired bootstrap comparison of two projection files on the same results."""
+    actual_results = load_actual_results(results_path)
+    base, candidate = (
+        GameOutcomes.from_projections(
+            load_actual_results(path, require_scores=False), actual_results
+        )
+        for path in (base_path, candidate_path)
+    )
+    comparison = bootstrap(load_settings("config.ini")).compare(
+        base, candidate, by_date=by_date
+    )
+    print(f"{comparison['games']} shared games, {comparison['method']} resampling")
+    for name, key in (("Win Rate", "win_rate"), ("ROI", "roi")):
+        metric = comparison[key]
+        change = format_interval("change", metric, comparison["confidence"])
+        print(
+            f"{name}: {metric['base'] * 100:.2f}% -> {metric['candidate'] * 100:.2f}%, "
+            f"{change}, p={metric['p_value']:.3f}"
+        )
+    return comparison
+
+
+def convert_output(source: str, target: str) -> int:
+    """Rewrite a saved projections file in the format of ``target``."""
+    rows = load_actual_results(source, require_scores=False)
+    writer = DataWriter.infer_writer(
+        target, columnar_options=columnar_options(load_settings("config.ini"))
+    )
+    written = writer.write_stream(target, rows.to_dict("records"))
+    print(f"Wrote {written} rows to {target}")
+    return written
+
+
+async def main(
+    backtest_period: int,
+    output: str,
+    snapshot_dir: Optional[str] = None,
+    offline: bool = False,
+    snapshot_ttl: Optional[float] = None,
+    snapshot_max_mb: Optional[float] = None,
+    history_dir: Optional[str] = None,
+    results_path: Optional[str] = None,
+    state_path: Optional[str] = None,
+    profile_path: Optional[str] = None,
+):
     # Use the pre-configured logger from earlier in the script.
     logger.info("Starting the main function.")
+    METRICS.reset()
+    profiler = None
+    if profile_path:
+        profiler = Profiler()
+        profiler.start()
+    profile_sections: Dict[str, Any] = {}
 
     config = Config("config.ini")
-    backtest = Backtest()
-    categories = config.get_categories()
-    timeout = ClientTimeout(total=60)
-    output_format = config.get_output_format()
-    filename = f"results.{output_format}"
-
-    cache = Cache(LRUCache(CACHE_SIZE))
-    cache_manager = CacheManager(cache)
-
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        projector = PointsProjector(config, session)
-        schedule_processor = ScheduleProcessor()
-
-        schedule = await schedule_processor.get_schedule(session, backtest_period)
-        team_ranks_list = await fetch_and_extract_team_ranks(
-            session, config, schedule, categories, cache_manager
-        )
+    settings = load_settings("config.ini")
+    # The configured format only applies when --output names no suffix.
+    filename = output
+    if not Path(output).suffix:
+        filename = f"{output}.{config.get_output_format()}"
 
-        scoring_keys = [
-            key.lower().replace("%%", "") for key in config.scoring_criteria().keys()
-        ]
-        validated_ranks_list = [
-            TeamRankingExtractor().validate_ranks(ranks, scoring_keys)
-            for ranks in team_ranks_list
-        ]
-
-        paired_ranks = [
-            {"home": validated_ranks_list[i], "away": validated_ranks_list[i + 1]}
-            for i in range(0, len(validated_ranks_list), 2)
-        ]
-
-        projections = await projector.calculate_projections(
-            schedule["matchups"], config.scoring_criteria(), paired_ranks
+    checkpoint = None
+    if state_path:
+        checkpoint = RunCheckpoint(
+            state_path, filename, list(config.scoring_criteria().keys())
         )
 
-        win_rate = backtest.backtest_model(projections, {})
-        print(f"Win Rate: {win_rate * 100:.2f}%")
-        logger.info(f"Projections: {projections}")
+    snapshot_store = open_snapshot_store(
+        snapshot_dir, offline, snapshot_ttl, snapshot_max_mb
+    )
 
-        if not projections:
-            logger.warning("Projections list is empty. No data to save.")
-            return
+    components = None
+    try:
+        async with http_client(settings) as session:
+            profile_sections["http"] = session.stats
+            components = build_components(
+                config, settings, session, snapshot_store, history_dir
+            )
+            backtest = Backtest(rank_history=components.rank_history)
+            schedule_processor = components.schedule_processor
+            scoring_criteria = components.scoring_criteria
+            writer = DataWriter.infer_writer(
+                filename, columnar_options=columnar_options(settings)
+            )
+            pipeline = RunPipeline(
+                session,
+                schedule_processor,
+                components.resolver,
+                components.projector,
+                scoring_criteria,
+                writer=writer,
+                filename=filename,
+                append=checkpoint is not None and checkpoint.has_output,
+                queue_size=settings.getint("pipeline", "queue_size", fallback=4),
+                rank_workers=settings.getint("pipeline", "rank_workers", fallback=2),
+            )
+            dates = ScheduleProcessor.schedule_dates(backtest_period)
+            if checkpoint is not None:
+                all_dates, dates = dates, checkpoint.pending(dates)
+                logger.info(
+                    f"Incremental run: {len(dates)} of {len(all_dates)} days "
+                    "to process."
+                )
+            profile_sections["pipeline"] = pipeline.stage_seconds
+            completed = False
+            try:
+                await pipeline.run(dates)
+                completed = True
+            except (DataWriterError, aiohttp.ClientError, IOError) as e:
+                logger.error(
+                    f"Failed to save results to {filename}. Error: {e}", exc_info=True
+                )
+            except Exception as e:
+                logger.error(f"An unexpected error occurred: {e}", exc_info=True)
 
-        logger.info(f"Attempting to save {len(projections)} projections to {filename}.")
+            projections = pipeline.projections()
+            actual_results = load_actual_results(results_path) if results_path else None
+            if checkpoint is not None:
+                if completed:
+                    checkpoint.mark_days(
+                        dates,
+                        pipeline.batches,
+                        schedule_processor.last_fetch_stats["failed_days"],
+                    )
+                    metrics = checkpoint.settle(
+                        backtest,
+                        projections,
+                        pipeline.category_signals(),
+                        actual_results,
+                        window=all_dates,
+                    )
+                    checkpoint.save()
+                    print(f"Rolling Win Rate: {metrics['win_rate'] * 100:.2f}%")
+                    print(f"Rolling ROI: {metrics['roi'] * 100:.2f}%")
+                    logger.info(f"Rolling backtest metrics: {metrics}")
+                else:
+                    logger.warning(
+                        f"Run failed; checkpoint {state_path} left unchanged."
+                    )
 
-        writer = DataWriter.infer_writer(filename)
-        try:
-            writer.write_data(projections, filename)
-            logger.info(f"Results successfully saved to {filename}")
-        except (DataWriterError, ClientError, IOError) as e:
-            logger.error(
-                f"Failed to save results to {filename}. Error: {e}", exc_info=True
+            if not projections:
+                logger.warning("Projections list is empty. No data to save.")
+                return
+            logger.info(
+                f"Saved {pipeline.rows_written} of {len(projections)} projections "
+                f"to {filename}."
             )
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}", exc_info=True)
 
-        print(f"Check logs for details on saving results to {filename}")
-        
+            win_rate = backtest.backtest_model(
+                projections,
+                actual_results,
+                category_signals=pipeline.category_signals(),
+                categories=list(scoring_criteria.keys()),
+            )
+            print(f"Win Rate: {win_rate * 100:.2f}%")
+            if backtest.last_metrics:
+                print(f"ROI: {backtest.last_metrics['roi'] * 100:.2f}%")
+                report_intervals(backtest, settings)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Process schedules and predictions.")
+            print(f"Check logs for details on saving results to {filename}")
+    finally:
+        if components is not None:
+            components.close()
+            if components.parse_executor is not None:
+                profile_sections["parse_executor"] = components.parse_executor.metrics()
+        if profiler is not None:
+            profiler.stop()
+            print(METRICS.report())
+            if profiler.peak_bytes:
+                print(f"Peak traced memory: {profiler.peak_bytes / 2**20:.1f} MB")
+            export_profile(
+                profile_path, profile=profiler.summary(), **profile_sections
+            )
+            print(f"Profile written to {profile_path}")
+
+
+def _add_store_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--snapshot_dir", type=str, help="Directory of the on-disk page snapshot store."
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve pages from the snapshot store only; never touch the network.",
+    )
+    parser.add_argument(
+        "--snapshot_ttl", type=float, help="Hours before a stored page is refetched."
+    )
+    parser.add_argument(
+        "--snapshot_max_mb", type=float, help="Size cap of the snapshot store in MB."
+    )
+    parser.add_argument(
+        "--history_dir",
+        type=str,
+        help="Directory of the daily rank history; fetched ranks are ingested into it.",
+    )
+
+
+def _add_source_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--backtest_period", type=int, default=1, help="Number of days to backtest."
     )
-    parser.add_argument("--output", type=str, help="Output file path.", required=True)
+    _add_store_arguments(parser)
+
+
+def _add_project_arguments(parser: argparse.ArgumentParser) -> None:
+    _add_source_arguments(parser)
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Output file path; its suffix picks the format ([output] format "
+        "of config.ini when it has none).",
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        help="CSV/JSON file of actual results with home_score and away_score.",
+    )
+    parser.add_argument(
+        "--state",
+        type=str,
+        help="Checkpoint file for incremental runs; only unprocessed days are "
+        "fetched, scored and appended.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="profile.json",
+        help="Capture cProfile/tracemalloc data, print a per-stage summary and "
+        "export it as JSON (default profile.json).",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """CLI surface. Building it touches no heavy dependency, so --help is instant.
+
+    Without a subcommand the full ``project`` run is used, as before.
+    """
+    parser = argparse.ArgumentParser(description="Process schedules and predictions.")
+    _add_project_arguments(parser)
+    commands = parser.add_subparsers(dest="command")
+
+    scrape_cmd = commands.add_parser(
+        "scrape", help="Fetch schedules and ranks into the snapshot store/history."
+    )
+    _add_source_arguments(scrape_cmd)
+
+    project_cmd = commands.add_parser(
+        "project", help="Scrape, score, write and optionally backtest a window."
+    )
+    _add_project_arguments(project_cmd)
+
+    backtest_cmd = commands.add_parser(
+        "backtest", help="Evaluate a saved projections file against results."
+    )
+    backtest_cmd.add_argument("projections", help="Projections file.")
+    backtest_cmd.add_argument("results", help="Actual results file.")
+
+    serve_cmd = commands.add_parser(
+        "serve", help="Run the resident projection service with warm caches."
+    )
+    serve_cmd.add_argument("--host", type=str, help="Defaults to [service] host.")
+    serve_cmd.add_argument("--port", type=int, help="Defaults to [service] port.")
+    serve_cmd.add_argument(
+        "--socket", type=str, help="Serve on this Unix socket instead of TCP."
+    )
+    _add_store_arguments(serve_cmd)
+
+    shards_cmd = commands.add_parser(
+        "shards",
+        help="Backtest a date range in shards across worker processes, then merge.",
+    )
+    shards_cmd.add_argument("--start", required=True, help="First date, YYYY-MM-DD.")
+    shards_cmd.add_argument("--end", required=True, help="Last date, YYYY-MM-DD.")
+    shards_cmd.add_argument("--by", choices=sorted(SHARD_UNITS), default="month")
+    shards_cmd.add_argument(
+        "--root",
+        default="shards",
+        help="Shard directory; may be shared by workers on several hosts.",
+    )
+    shards_cmd.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    shards_cmd.add_argument("--results", type=str, help="Actual results file.")
+    shards_cmd.add_argument("--output", type=str, help="Merged projections file.")
+    shards_cmd.add_argument("--snapshot_dir", type=str)
+    shards_cmd.add_argument("--offline", action="store_true")
+    shards_cmd.add_argument(
+        "--lock_timeout",
+        type=float,
+        default=6.0,
+        help="Hours after which another worker's shard lock counts as stale.",
+    )
+    shards_cmd.add_argument(
+        "--merge_only", action="store_true", help="Only merge finished shards."
+    )
+
+    compare_cmd = commands.add_parser(
+        "compare",
+        help="Paired bootstrap test of two projection files against results.",
+    )
+    compare_cmd.add_argument("base", help="Projections of the current config.")
+    compare_cmd.add_argument("candidate", help="Projections of the new config.")
+    compare_cmd.add_argument("results", help="Actual results file.")
+    compare_cmd.add_argument(
+        "--by_game",
+        action="store_true",
+        help="Resample single games instead of whole dates.",
+    )
+
+    write_cmd = commands.add_parser(
+        "write", help="Convert a projections file to another output format."
+    )
+    write_cmd.add_argument("source", help="Projections file to read.")
+    write_cmd.add_argument("target", help="File to write; format from its suffix.")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser()
     args = parser.parse_args()
+    runtime.load_modules(*COMMAND_MODULES[args.command or "project"])
+    runtime.export(globals())
+    logging.basicConfig(
+        level=load_settings().get("logging", "level", fallback="INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
 
-    asyncio.run(main(args.backtest_period, args.output))
\ No newline at end of file
+    if args.command == "scrape":
+        asyncio.run(
+            scrape(
+                args.backtest_period,
+                snapshot_dir=args.snapshot_dir,
+                offline=args.offline,
+                snapshot_ttl=args.snapshot_ttl,
+                snapshot_max_mb=args.snapshot_max_mb,
+                history_dir=args.history_dir,
+            )
+        )
+    elif args.command == "serve":
+        try:
+            asyncio.run(
+                serve(
+                    args.host,
+                    args.port,
+                    socket_path=args.socket,
+                    snapshot_dir=args.snapshot_dir,
+                    offline=args.offline,
+                    snapshot_ttl=args.snapshot_ttl,
+                    snapshot_max_mb=args.snapshot_max_mb,
+                    history_dir=args.history_dir,
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "shards":
+        runner = ShardedBacktest(
+            args.root,
+            args.start,
+            args.end,
+            by=args.by,
+            results_path=args.results,
+            snapshot_dir=args.snapshot_dir,
+            offline=args.offline,
+            lock_timeout=args.lock_timeout * 3600,
+        )
+        if not args.merge_only:
+            for status in runner.run(args.workers):
+                print(
+                    f"{status['shard']}: {status['status']} {status.get('error', '')}"
+                )
+        if runner.pending():
+            print(
+                f"{len(runner.pending())} shards unfinished; rerun to resume "
+                "before merging."
+            )
+            sys.exit(1)
+        metrics = runner.merge(args.output)
+        print(f"Merged {len(runner.shards)} shards: {metrics['games']} games")
+        if "win_rate" in metrics:
+            print(f"Win Rate: {metrics['win_rate'] * 100:.2f}%")
+            print(f"ROI: {metrics['roi'] * 100:.2f}%")
+    elif args.command == "backtest":
+        backtest = Backtest()
+        backtest.run_backtest(args.projections, args.results)
+        report_intervals(backtest, load_settings("config.ini"))
+    elif args.command == "compare":
+        compare_projections(
+            args.base, args.candidate, args.results, by_date=not args.by_game
+        )
+    elif args.command == "write":
+        convert_output(args.source, args.target)
+    else:
+        if not args.output:
+            parser.error("the following arguments are required: --output")
+        asyncio.run(
+            main(
+                args.backtest_period,
+                args.output,
+                snapshot_dir=args.snapshot_dir,
+                offline=args.offline,
+                snapshot_ttl=args.snapshot_ttl,
+                snapshot_max_mb=args.snapshot_max_mb,
+                history_dir=args.history_dir,
+                results_path=args.results,
+                state_path=args.state,
+                profile_path=args.profile,
+            )
+        )
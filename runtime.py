@@ -0,0 +1,272 @@
+"""Shared namespace the project's modules run in.
+
+``Teams.py``, ``Pipeline.py``, ``main.py`` and the rest are parts of one
+program: they carry no imports and use each other's names directly. This
+module supplies the standard-library imports and the small shared helpers
+they expect, and ``load_modules`` executes parts, with the parts they
+require, in dependency order into its own globals. Compiled parts are
+cached as ordinary ``.pyc`` files under ``__pycache__``, so a start does
+not recompile unchanged sources.
+
+A script loads only what its command runs with (see main.py). Reading a
+name of a part not loaded yet, as ``runtime.parse_team_ranks`` or a worker
+process unpickling it by reference does, loads every part first; after
+``import runtime`` the namespace is therefore always ready to use.
+
+Heavy third-party packages are bound lazily by ``Lazy.py``; only NumPy is
+imported up front.
+"""
+
+import _imp
+import argparse
+import asyncio
+import bisect
+import configparser
+import csv
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import itertools
+import json
+import logging
+import marshal
+import os
+import random
+import re
+import shlex
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from html.parser import HTMLParser
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlparse
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+
+# Load order: a module comes after every module its class bodies, default
+# arguments and unquoted annotations refer to.
+MODULES = (
+    "Lazy",
+    "Metrics",
+    "Models",
+    "Http",
+    "Snapshots",
+    "History",
+    "Extraction",
+    "Teams",
+    "Projection",
+    "backtest",
+    "Writer",
+    "Checkpoint",
+    "Pipeline",
+    "Service",
+    "Shards",
+    "Statistics",
+    "Optimizer",
+    "Benchmark",
+    "main",
+)
+
+# Parts each part needs in the namespace, when it is loaded or when its
+# functions run. ``main`` lists the helpers other parts call (settings,
+# HTTP client, components); its commands name their own extra parts.
+REQUIRES: Dict[str, Tuple[str, ...]] = {
+    "Lazy": (),
+    "Metrics": (),
+    "Models": (),
+    "Http": ("Lazy", "Metrics"),
+    "Snapshots": ("Metrics",),
+    "History": (),
+    "Extraction": ("Lazy", "Metrics", "Models"),
+    "Teams": ("Extraction", "Lazy", "Metrics", "Models", "Snapshots"),
+    "Projection": ("Metrics",),
+    "backtest": ("Lazy", "Writer"),
+    "Writer": ("Lazy", "Metrics"),
+    "Checkpoint": ("Teams",),
+    "Pipeline": ("Extraction", "Metrics", "Projection", "Teams", "Writer"),
+    "Service": ("Extraction", "Metrics", "Models", "Projection", "Teams"),
+    "Shards": (
+        "Lazy",
+        "Models",
+        "Pipeline",
+        "Snapshots",
+        "Teams",
+        "Writer",
+        "backtest",
+        "main",
+    ),
+    "Statistics": ("Lazy", "backtest"),
+    "Optimizer": ("History", "Lazy", "Projection", "backtest", "main"),
+    "Benchmark": (
+        "Extraction",
+        "Http",
+        "Lazy",
+        "Metrics",
+        "Projection",
+        "Service",
+        "Snapshots",
+        "Teams",
+        "Writer",
+        "main",
+    ),
+    "main": ("Extraction", "History", "Http", "Projection", "Snapshots", "Teams"),
+}
+
+DATE_FORMAT = "%Y-%m-%d"
+CACHE_SIZE = 100
+
+logger = logging.getLogger("backtest")
+
+
+class LRUCache:
+    """Bounded mapping that drops the least recently used entry when full."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.cache: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        if key not in self.cache:
+            return None
+        self.cache.move_to_end(key)
+        return self.cache[key]
+
+    def put(self, key: Any, value: Any) -> None:
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+
+
+class Config:
+    """Typed access to the sections of config.ini the run is driven by."""
+
+    def __init__(self, path: str = "config.ini"):
+        self.path = path
+        self.parser = configparser.ConfigParser()
+        if not self.parser.read(path):
+            raise FileNotFoundError(f"Config file not found: {path}")
+
+    def scoring_criteria(self) -> Dict[str, float]:
+        """Category weights keyed by lowercased category name."""
+        return {
+            key: float(value) for key, value in self.parser["scoring_criteria"].items()
+        }
+
+    def get_categories(self) -> List[str]:
+        """Category labels exactly as they appear on the team stats pages."""
+        return [
+            category.strip()
+            for category in self.parser.get("categories", "categories").split(",")
+        ]
+
+    def get_output_format(self) -> str:
+        return self.parser.get("output", "format", fallback="csv")
+
+    def log_level(self) -> str:
+        return self.parser.get("logging", "level", fallback="INFO").upper()
+
+
+LOADED: List[str] = []
+
+
+def _code(name: str) -> types.CodeType:
+    """Compiled ``<name>.py``, read from or written to its standard ``.pyc``."""
+    path = ROOT / f"{name}.py"
+    cache = Path(importlib.util.cache_from_source(str(path)))
+    stat = path.stat()
+    header = importlib.util.MAGIC_NUMBER + struct.pack(
+        "<III", 0, int(stat.st_mtime) & 0xFFFFFFFF, stat.st_size & 0xFFFFFFFF
+    )
+    try:
+        with open(cache, "rb") as f:
+            code = marshal.load(f) if f.read(16) == header else None
+    except (OSError, EOFError, ValueError, TypeError):
+        code = None
+    if isinstance(code, types.CodeType):
+        # compileall or another checkout may have written it under another
+        # file name; point tracebacks here, as importlib does.
+        _imp._fix_co_filename(code, str(path))
+        return code
+    code = compile(path.read_bytes(), str(path), "exec", dont_inherit=True)
+    if not sys.dont_write_bytecode:
+        tmp_path = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+        try:
+            cache.parent.mkdir(exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(header + marshal.dumps(code))
+            os.replace(tmp_path, cache)
+        except OSError:
+            # A read-only checkout just compiles on every start.
+            pass
+    return code
+
+
+def load_modules(*names: str) -> None:
+    """Execute ``names`` and the parts they require, in load order.
+
+    Without names every part is loaded. Parts already loaded are skipped.
+    """
+    wanted = set()
+    pending = list(names or MODULES)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(REQUIRES[name])
+    namespace = globals()
+    for name in MODULES:
+        if name in wanted and name not in LOADED:
+            exec(_code(name), namespace)
+            LOADED.append(name)
+
+
+def __getattr__(name: str) -> Any:
+    # A name of a part not loaded yet: load them all, then look again.
+    if name.startswith("__") or len(LOADED) == len(MODULES):
+        raise AttributeError(f"module 'runtime' has no attribute {name!r}")
+    load_modules()
+    try:
+        return globals()[name]
+    except KeyError:
+        raise AttributeError(f"module 'runtime' has no attribute {name!r}") from None
+
+
+def export(namespace: Dict[str, Any]) -> None:
+    """Copy the loaded names into a script's globals (see main.py).
+
+    Names the script already defines are kept; call again after ``load_modules``
+    to add the parts loaded since.
+    """
+    for name, value in globals().items():
+        if not name.startswith("__"):
+            namespace.setdefault(name, value)
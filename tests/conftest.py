@@ -0,0 +1,82 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+
+import runtime  # noqa: E402
+
+
+@pytest.fixture
+def rt():
+    """The shared namespace every module of the program is loaded into."""
+    return runtime
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """config.ini without the HTTP rate limit, for runs against a stub site."""
+    lines = (ROOT / "config.ini").read_text(encoding="utf-8").splitlines()
+    path = tmp_path / "config.ini"
+    path.write_text(
+        "\n".join(
+            line for line in lines if not line.startswith(("rate_limit", "burst"))
+        ),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+class ThreadedStubSite:
+    """``StubSite`` served from its own event loop thread.
+
+    Code under test may start and stop event loops of its own (shards call
+    ``asyncio.run`` per shard), so the site cannot share the test's loop.
+    """
+
+    def __init__(self, root):
+        self.site = runtime.StubSite(root)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.site.__aenter__(), self.loop).result()
+        return self.site
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.site.__aexit__(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def stub_site(tmp_path, monkeypatch):
+    """A stub of the stats site over 45 fixture days, with the scrapers aimed at it.
+
+    Teams are the ``[team_name_mapping]`` of config.ini.
+    """
+    settings = runtime.load_settings(str(ROOT / "config.ini"))
+    teams = {
+        name.title(): slug for name, slug in settings["team_name_mapping"].items()
+    }
+    categories = runtime.Config(str(ROOT / "config.ini")).get_categories()
+    root = runtime.generate_fixtures(
+        tmp_path / "fixtures", teams, categories, days=45, page_kb=1, seed=3
+    )
+    with ThreadedStubSite(root) as site:
+        monkeypatch.setattr(
+            runtime.ScheduleProcessor,
+            "SCHEDULE_URL",
+            site.base_url + "/mlb/schedules/?date={date}",
+        )
+        monkeypatch.setattr(
+            runtime.RankResolver, "STATS_URL", site.base_url + "/mlb/team/{slug}/stats"
+        )
+        yield site
@@ -0,0 +1,106 @@
+import pytest
+
+from conftest import FIXTURES
+
+CATEGORIES = ["batting avg", "whip", "hits/9"]
+
+
+@pytest.fixture
+def fixture_run(rt):
+    projections = rt.load_actual_results(
+        str(FIXTURES / "projections.csv"), require_scores=False
+    )
+    results = rt.load_actual_results(str(FIXTURES / "results.csv"))
+    signals = projections[CATEGORIES].to_numpy()
+    rows = projections[["date", "home", "away", "projected"]].to_dict("records")
+    return rows, results, signals
+
+
+def rowwise(rows, results, signals, odds=-110):
+    """Reference: one game at a time, first result row per game wins."""
+    scores = {}
+    for result in results.to_dict("records"):
+        key = (result["date"], result["home"], result["away"])
+        scores.setdefault(key, (result["home_score"], result["away_score"]))
+    bets = wins = 0
+    calls = [0] * signals.shape[1]
+    hits = [0] * signals.shape[1]
+    matched = 0
+    for row, signal in zip(rows, signals):
+        score = scores.get((row["date"], row["home"], row["away"]))
+        if score is None:
+            continue
+        matched += 1
+        margin = score[0] - score[1]
+        outcome = (margin > 0) - (margin < 0)
+        pick = (row["projected"] > 0) - (row["projected"] < 0)
+        if pick and outcome:
+            bets += 1
+            wins += pick == outcome
+        for i, value in enumerate(signal):
+            if value and outcome:
+                calls[i] += 1
+                hits[i] += value == outcome
+    profit = wins * (100 / -odds) - (bets - wins)
+    return {
+        "games": len(rows),
+        "matched": matched,
+        "bets": bets,
+        "wins": wins,
+        "win_rate": wins / bets,
+        "profit": profit,
+        "roi": profit / bets,
+        "category_calls": dict(zip(CATEGORIES, calls)),
+        "category_hit_rates": {
+            name: hit / call for name, hit, call in zip(CATEGORIES, hits, calls)
+        },
+    }
+
+
+def test_evaluate_pins_fixture_metrics(rt, fixture_run):
+    rows, results, signals = fixture_run
+    metrics = rt.Backtest().evaluate(rows, results, signals, CATEGORIES)
+    assert metrics["games"] == 12
+    assert metrics["matched"] == 11
+    assert (metrics["bets"], metrics["wins"]) == (8, 6)
+    assert metrics["win_rate"] == pytest.approx(0.75)
+    assert metrics["profit"] == pytest.approx(6 * 100 / 110 - 2)
+    assert metrics["roi"] == pytest.approx((6 * 100 / 110 - 2) / 8)
+    assert metrics["category_calls"] == {"batting avg": 6, "whip": 8, "hits/9": 5}
+    assert metrics["category_hit_rates"] == pytest.approx(
+        {"batting avg": 5 / 6, "whip": 0.5, "hits/9": 0.6}
+    )
+
+
+def test_evaluate_matches_rowwise_loop(rt, fixture_run):
+    rows, results, signals = fixture_run
+    metrics = rt.Backtest().evaluate(rows, results, signals, CATEGORIES)
+    expected = rowwise(rows, results, signals)
+    for key, value in expected.items():
+        assert metrics[key] == pytest.approx(value), key
+
+
+def test_backtest_model_keeps_metrics(rt, fixture_run):
+    rows, results, signals = fixture_run
+    backtest = rt.Backtest()
+    assert backtest.backtest_model(rows, results, signals, CATEGORIES) == 0.75
+    assert backtest.last_metrics["matched"] == 11
+    assert backtest.backtest_model([], results) == 0.0
+    assert backtest.last_metrics == {}
+
+
+def test_unplayed_games_place_no_bet(rt, fixture_run):
+    rows, results, signals = fixture_run
+    unplayed = {"date": "2023-04-03", "home": "Texas", "away": "Seattle"}
+    results = rt.pd.concat([results, rt.pd.DataFrame([unplayed])], ignore_index=True)
+    assert results["home_score"].isna().sum() == 1
+    backtest = rt.Backtest()
+    metrics = backtest.evaluate(rows, results, signals, CATEGORIES)
+    assert metrics["matched"] == 12
+    assert (metrics["bets"], metrics["wins"]) == (8, 6)
+    assert metrics["category_calls"] == {"batting avg": 6, "whip": 8, "hits/9": 5}
+    expected = rowwise(rows, results, signals)
+    for key, value in expected.items():
+        assert metrics[key] == pytest.approx(value), key
+    outcomes = rt.GameOutcomes.from_results(backtest.last_results)
+    assert outcomes.totals()[:2].tolist() == [8.0, 6.0]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+CATEGORIES = ["runs", "hits"]
+
+
+def game(date, home, away, projected):
+    return {"date": date, "home": home, "away": away, "projected": projected}
+
+
+def results(rt, rows):
+    return rt.pd.DataFrame(
+        rows, columns=["date", "home", "away", "home_score", "away_score"]
+    )
+
+
+@pytest.fixture
+def output(tmp_path):
+    path = tmp_path / "results.csv"
+    path.touch()
+    return str(path)
+
+
+@pytest.fixture
+def checkpoint(rt, tmp_path, output):
+    return rt.RunCheckpoint(tmp_path / "state.json", output, CATEGORIES)
+
+
+def test_unplayed_games_stay_unsettled_until_scored(rt, checkpoint):
+    projections = [
+        game("2023-04-01", "Boston", "Texas", 2),
+        game("2023-04-01", "Miami", "Houston", -1),
+    ]
+    signals = np.array([[1, 1], [-1, 0]])
+    pending = results(
+        rt,
+        [
+            ("2023-04-01", "Boston", "Texas", 5, 3),
+            ("2023-04-01", "Miami", "Houston", None, None),
+        ],
+    )
+    metrics = checkpoint.settle(rt.Backtest(), projections, signals, pending)
+    assert (metrics["matched"], metrics["bets"], metrics["wins"]) == (1, 1, 1)
+    assert metrics["unsettled"] == 1
+
+    final = results(rt, [("2023-04-01", "Miami", "Houston", 2, 6)])
+    metrics = checkpoint.settle(rt.Backtest(), [], np.zeros((0, 2)), final)
+    assert (metrics["matched"], metrics["bets"], metrics["wins"]) == (2, 2, 2)
+    assert metrics["unsettled"] == 0
+    assert metrics["category_calls"] == {"runs": 2, "hits": 1}
+
+
+def test_rolling_metrics_cover_only_the_window(rt, checkpoint, tmp_path, output):
+    projections = [
+        game("2023-04-01", "Boston", "Texas", 2),
+        game("2023-04-08", "Miami", "Houston", 1),
+    ]
+    scores = results(
+        rt,
+        [
+            ("2023-04-01", "Boston", "Texas", 5, 3),
+            ("2023-04-08", "Miami", "Houston", 2, 6),
+        ],
+    )
+    checkpoint.mark_days(["2023-04-01", "2023-04-08"], [], [])
+    everything = checkpoint.settle(rt.Backtest(), projections, np.zeros((2, 2)), scores)
+    assert (everything["bets"], everything["wins"]) == (2, 1)
+
+    window = ["2023-04-08"]
+    recent = checkpoint.metrics(window)
+    assert (recent["days"], recent["bets"], recent["wins"]) == (1, 1, 0)
+    checkpoint.save()
+    reloaded = rt.RunCheckpoint(tmp_path / "state.json", output, CATEGORIES)
+    assert reloaded.metrics(window) == recent
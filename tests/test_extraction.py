@@ -0,0 +1,244 @@
+import asyncio
+import os
+import time
+from datetime import date
+
+import pytest
+
+
+def make_resolver(rt, config_path, window_days):
+    config, settings = rt.Config(config_path), rt.load_settings(config_path)
+    return rt.RankResolver(
+        rt.TeamRankingExtractor(parser_backend="stream"),
+        config.get_categories(),
+        list(config.scoring_criteria()),
+        dict(settings["team_name_mapping"]),
+        window_days=window_days,
+    )
+
+
+async def resolve_season(rt, config_path, window_days, dates):
+    resolver = make_resolver(rt, config_path, window_days)
+    async with rt.HttpClient() as session:
+        schedule = await rt.ScheduleProcessor().get_schedule(
+            session, len(dates), dates=dates
+        )
+        await resolver.resolve_matchups(session, schedule["matchups"])
+    return resolver, schedule["matchups"]
+
+
+@pytest.mark.parametrize("window_days", [1, 7])
+def test_rank_fetches_grow_with_teams_times_windows(
+    rt, config_path, stub_site, window_days
+):
+    dates = rt.fixture_dates(45)
+    resolver, matchups = asyncio.run(
+        resolve_season(rt, config_path, window_days, dates)
+    )
+    teams = {m[side] for m in matchups for side in ("home", "away")}
+    windows = {resolver.as_of_for(m["date"]) for m in matchups}
+    team_windows = {
+        (m[side], resolver.as_of_for(m["date"]))
+        for m in matchups
+        for side in ("home", "away")
+    }
+    assert resolver.fetch_count == len(team_windows) <= len(teams) * len(windows)
+    if window_days == 7:
+        assert len(windows) == 7
+        assert resolver.fetch_count < len(matchups)
+    # Every game is scored from its own teams' window record.
+    home, away = resolver.rank_matrices(matchups, resolver.expected_keys)
+    assert not (home == -1).all(axis=1).any()
+    assert not (away == -1).all(axis=1).any()
+
+
+def test_rank_windows_start_on_mondays_and_never_after_the_game(rt, config_path):
+    resolver = make_resolver(rt, config_path, 7)
+    for game_date in rt.fixture_dates(30):
+        as_of = date.fromisoformat(resolver.as_of_for(game_date))
+        assert as_of.weekday() == 0
+        assert 0 <= (date.fromisoformat(game_date) - as_of).days < 7
+    daily = make_resolver(rt, config_path, 1)
+    assert daily.as_of_for("2023-04-05") == "2023-04-05"
+    with pytest.raises(ValueError):
+        make_resolver(rt, config_path, 0)
+
+
+def test_benchmark_reports_rank_fetches(rt, config_path, stub_site, tmp_path):
+    config, settings = rt.Config(config_path), rt.load_settings(config_path)
+    results = asyncio.run(
+        rt.benchmark_scenario(
+            stub_site,
+            rt.fixture_dates(14),
+            config.get_categories(),
+            config.scoring_criteria(),
+            dict(settings["team_name_mapping"]),
+            tmp_path,
+        )
+    )
+    scrape = results["scrape"]
+    assert scrape["window_days"] == 7
+    assert scrape["pages"] <= scrape["teams"] * scrape["windows"]
+    assert scrape["games"] == results["schedule"]["games"]
+
+
+CATEGORIES = ["Batting Avg", "Home Runs/9", "On Base %", "WHIP", "Hits/9"]
+EDGE_PAGES = {
+    "plain": "<table><tr><td>WHIP</td><td>1.21 (#4)</td></tr></table>",
+    "no_rank_then_repeat": (
+        "<table><tr><td>WHIP</td><td>1.21</td></tr>"
+        "<tr><td>WHIP</td><td>1.21 (#4)</td></tr></table>"
+    ),
+    "text_and_br": (
+        "<table><tr><td>Home Runs/9<br></td><td>1.1 (#7)</td></tr>"
+        "<tr><td>Home Runs/9</td><td>1.1 (#8)</td></tr></table>"
+    ),
+    "self_closing_br": "<table><tr><td>WHIP<br/></td><td>(#2)</td></tr></table>",
+    "last_cell_in_row": (
+        "<table><tr><td>WHIP</td></tr><tr><td>1.21 (#4)</td></tr></table>"
+    ),
+    "single_tag_child": (
+        "<table><tr><td><b>Batting Avg</b></td><td>.251 (#3)</td></tr></table>"
+    ),
+    "padded_label": "<table><tr><td> WHIP </td><td>(#5)</td></tr></table>",
+    "label_with_comment": (
+        "<table><tr><td>WHIP<!-- x --></td><td>(#5)</td></tr></table>"
+    ),
+    "cdata_label": "<table><tr><td><![CDATA[WHIP]]></td><td>(#5)</td></tr></table>",
+    "cdata_rank": (
+        "<table><tr><td>WHIP</td><td>1.21 <![CDATA[(#4)]]></td></tr></table>"
+    ),
+    "cdata_beside_label": (
+        "<table><tr><td>WHIP<![CDATA[ ]]></td><td>(#5)</td></tr>"
+        "<tr><td>WHIP</td><td>(#6)</td></tr></table>"
+    ),
+    "header_between": (
+        "<table><tr><td>WHIP</td><th>(#9)</th><td>(#3)</td></tr></table>"
+    ),
+    "nested_rank_text": (
+        "<table><tr><td>Hits/9</td><td><span>8.1</span> <i>(#12)</i></td></tr>"
+        "</table>"
+    ),
+    "entity_label": (
+        "<table><tr><td>On Base &#37;</td><td>.321 (#6)</td></tr></table>"
+    ),
+    "unclosed_cells": "<table><tr><td>WHIP<td>(#3)</tr></table>",
+    "stray_end_tags": (
+        "<table></span><tr><td>WHIP</td></b><td>(#3)</td></tr></table>"
+    ),
+    "sibling_in_other_parent": (
+        "<table><tr><td>WHIP</td><div><td>(#1)</td></div><td>(#2)</td></tr></table>"
+    ),
+    "truncated": "<table><tr><td>Hits/9</td><td>8.1 (#11)",
+    "label_in_rank_cell": (
+        "<table><tr><td>WHIP</td><td>Hits/9</td><td>(#7)</td></tr></table>"
+    ),
+}
+
+
+def fixture_pages(rt, tmp_path):
+    root = rt.generate_fixtures(
+        tmp_path, {"Boston": "boston-red-sox"}, CATEGORIES, days=1, page_kb=4
+    )
+    return [path.read_text(encoding="utf-8") for path in root.rglob("teams/*.html")]
+
+
+@pytest.mark.parametrize("name", sorted(EDGE_PAGES))
+@pytest.mark.parametrize("chunk_size", [65536, 5])
+def test_stream_parser_matches_bs4(rt, name, chunk_size):
+    html = EDGE_PAGES[name]
+    expected = rt.TeamRankingExtractor._parse_html_bs4(html, CATEGORIES)
+    assert rt.parse_stats_stream(html, CATEGORIES, chunk_size) == expected
+
+
+def test_stream_parser_matches_bs4_on_generated_pages(rt, tmp_path):
+    pages = fixture_pages(rt, tmp_path)
+    assert pages
+    for html in pages:
+        expected = rt.TeamRankingExtractor._parse_html_bs4(html, CATEGORIES)
+        assert len(expected) == len(CATEGORIES)
+        assert rt.parse_stats_stream(html, CATEGORIES) == expected
+        assert rt.parse_stats_stream(html, CATEGORIES, chunk_size=97) == expected
+
+
+@pytest.mark.parametrize("kind", ["process", "thread"])
+@pytest.mark.parametrize("backend", ["bs4", "stream"])
+def test_parse_executor_matches_in_process_parse(rt, tmp_path, kind, backend):
+    pages = fixture_pages(rt, tmp_path) + [EDGE_PAGES["plain"]]
+    expected = [rt.parse_team_ranks(html, CATEGORIES, backend) for html in pages]
+
+    async def parse_all(executor):
+        return await asyncio.gather(
+            *(
+                executor.run(rt.parse_team_ranks, html, CATEGORIES, backend)
+                for html in pages
+            )
+        )
+
+    with rt.ParseExecutor(2, kind) as executor:
+        assert asyncio.run(parse_all(executor)) == expected
+        assert executor.metrics()["tasks"] == len(pages)
+
+
+@pytest.mark.parametrize("kind", ["process", "thread"])
+def test_parse_executor_survives_errors_and_shuts_down(rt, kind):
+    executor = rt.ParseExecutor(1, kind)
+
+    async def parse(html):
+        return await executor.run(rt.parse_team_ranks, html, CATEGORIES, "stream")
+
+    with pytest.raises(TypeError):
+        asyncio.run(parse(None))
+    assert executor.queue_depth == 0
+    assert asyncio.run(parse(EDGE_PAGES["plain"])) == {"WHIP": 4}
+    executor.shutdown()
+    with pytest.raises(RuntimeError):
+        executor.pool.submit(rt.parse_team_ranks, "", CATEGORIES)
+    with pytest.raises(ValueError):
+        rt.ParseExecutor(1, "fiber")
+
+
+def test_parse_executor_defaults_to_the_cpu_count(rt):
+    with rt.ParseExecutor(kind="thread") as executor:
+        assert executor.workers == (os.cpu_count() or 1)
+        assert executor.metrics()["workers"] == executor.workers
+
+
+def test_parse_stage_excludes_time_queued_for_a_worker(rt):
+    rt.METRICS.reset()
+
+    async def naps(executor):
+        await asyncio.gather(
+            *(executor.run(time.sleep, 0.1, stage="nap") for _ in range(3))
+        )
+
+    with rt.ParseExecutor(1, "thread") as executor:
+        asyncio.run(naps(executor))
+
+    calls, total, worst = rt.METRICS.timers["nap"]
+    assert calls == 3
+    assert worst < 0.2
+    # One worker: the second call waits one nap, the third two.
+    assert rt.METRICS.timers["nap_wait"][1] >= 0.25
+
+
+def test_extract_and_extract_async_share_the_ranks_cache(rt):
+    html = EDGE_PAGES["plain"]
+    rt.METRICS.reset()
+    with rt.ParseExecutor(1, "thread") as executor:
+        extractor = rt.TeamRankingExtractor(parse_executor=executor)
+        parsed = asyncio.run(extractor.extract_async(html, CATEGORIES))
+        assert extractor.extract(html, CATEGORIES) == parsed
+        assert asyncio.run(extractor.extract_async(html, CATEGORIES)) == parsed
+        assert executor.metrics()["tasks"] == 1
+    assert rt.METRICS.timers["parse"][0] == 1
+    assert rt.METRICS.counters["ranks_cache.hit"] == 2
+    assert rt.METRICS.counters["ranks_cache.miss"] == 1
+
+
+def test_parse_executor_shuts_down_when_its_block_fails(rt):
+    with pytest.raises(KeyError):
+        with rt.ParseExecutor(1, "process") as executor:
+            raise KeyError("boom")
+    with pytest.raises(RuntimeError):
+        executor.pool.submit(rt.parse_team_ranks, "", CATEGORIES)
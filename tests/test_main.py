@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def settings(rt, config_path):
+    return rt.Config(config_path), rt.load_settings(config_path)
+
+
+def test_build_components_shares_one_resolver_and_history(rt, settings, tmp_path):
+    config, raw = settings
+    components = rt.build_components(
+        config, raw, None, history_dir=str(tmp_path / "history"), parse_workers=0
+    )
+    assert components.parse_executor is None
+    assert components.resolver.history is components.rank_history is not None
+    assert components.projector.rank_resolver is components.resolver
+    assert components.projector.rank_history is components.rank_history
+    assert components.scoring_keys == list(components.scoring_criteria)
+    assert components.resolver.categories == config.get_categories()
+    components.close()
+
+
+def test_build_components_parse_pool_is_shared_and_closed(rt, settings):
+    config, raw = settings
+    raw.set("parser", "executor", "thread")
+    components = rt.build_components(config, raw, None, parse_workers=2)
+    executor = components.parse_executor
+    assert executor.workers == 2
+    assert components.resolver.extractor.parse_executor is executor
+    assert components.schedule_processor.parse_executor is executor
+    components.close()
+    with pytest.raises(RuntimeError):
+        executor.pool.submit(print)
+
+
+def run_project(rt, argv):
+    """Parse ``argv`` and run the default project command as main.py does."""
+    args = rt.build_parser().parse_args(argv)
+    asyncio.run(
+        rt.main(
+            args.backtest_period,
+            args.output,
+            results_path=args.results,
+            state_path=args.state,
+        )
+    )
+
+
+@pytest.fixture
+def project_dir(rt, tmp_path, config_path, stub_site, monkeypatch):
+    """The stub site's first days as the run period, config.ini in the cwd."""
+    dates = ["2023-03-30", "2023-03-31", "2023-04-01"]
+    monkeypatch.setattr(
+        rt.ScheduleProcessor, "schedule_dates", staticmethod(lambda period: dates)
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_project_writes_to_the_output_path(rt, project_dir):
+    run_project(rt, ["--output", "out/projections.parquet", "--state", "state.json"])
+
+    output = project_dir / "out" / "projections.parquet"
+    assert output.is_dir()  # partitioned by month in config.ini
+    assert not list(project_dir.glob("results.*"))
+    rows = rt.load_actual_results(str(output), require_scores=False)
+    assert len(rows) > 0
+    assert set(rows["date"]) == {"2023-03-30", "2023-03-31", "2023-04-01"}
+    state = json.loads((project_dir / "state.json").read_text(encoding="utf-8"))
+    assert state["output"] == "out/projections.parquet"
+
+
+def test_output_without_suffix_takes_the_configured_format(rt, project_dir):
+    run_project(rt, ["--output", "projections"])
+
+    assert (project_dir / "projections.csv").exists()
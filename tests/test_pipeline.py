@@ -0,0 +1,79 @@
+import asyncio
+import csv
+import random
+
+import numpy as np
+
+
+class SlowSchedule:
+    """Schedule stub whose days arrive in random order, some of them empty."""
+
+    concurrency = 8
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.last_fetch_stats = None
+
+    async def _fetch_day(self, session, date_value, semaphore, stats):
+        async with semaphore:
+            await asyncio.sleep(self.random.uniform(0, 0.02))
+        day = int(date_value[-2:])
+        if day % 4 == 0:
+            return []
+        return [
+            {"date": date_value, "home": f"h{day}-{game}", "away": f"a{day}-{game}"}
+            for game in range(day % 3 + 1)
+        ]
+
+
+class SlowResolver:
+    """Rank stub: deterministic ranks per team, resolved after a random delay."""
+
+    def __init__(self, seed, categories):
+        self.random = random.Random(seed)
+        self.categories = categories
+
+    async def resolve_matchups(self, session, matchups):
+        await asyncio.sleep(self.random.uniform(0, 0.02))
+
+    def _ranks(self, team):
+        seed = sum(map(ord, team))
+        return [float((seed * (i + 7)) % 30 + 1) for i in range(len(self.categories))]
+
+    def rank_matrices(self, matchups, categories):
+        home = np.array([self._ranks(m["home"]) for m in matchups])
+        away = np.array([self._ranks(m["away"]) for m in matchups])
+        return home, away
+
+
+def test_written_rows_match_projections_row_for_row(rt, tmp_path):
+    scoring = {"runs": 3.0, "hits": 5.0, "era": 2.0}
+    dates = rt.ScheduleProcessor.date_range("2023-04-01", "2023-04-20")
+    filename = str(tmp_path / "projections.csv")
+    pipeline = rt.RunPipeline(
+        None,
+        SlowSchedule(seed=1),
+        SlowResolver(seed=2, categories=list(scoring)),
+        rt.PointsProjector,
+        scoring,
+        writer=rt.DataWriter.infer_writer(filename),
+        filename=filename,
+        queue_size=2,
+        rank_workers=4,
+    )
+    batches = asyncio.run(pipeline.run(dates))
+
+    with open(filename, newline="", encoding="utf-8") as f:
+        written = list(csv.DictReader(f))
+    projections = pipeline.projections()
+    assert [batch.date for batch in batches] == sorted(batch.date for batch in batches)
+    assert len(written) == len(projections) == pipeline.rows_written > 0
+    for row, projection in zip(written, projections):
+        assert (row["date"], row["home"], row["away"]) == (
+            projection["date"],
+            projection["home"],
+            projection["away"],
+        )
+        assert int(row["projected"]) == projection["projected"]
+    signals = pipeline.category_signals()
+    assert signals.sum(axis=1).tolist() == [row["projected"] for row in projections]
@@ -0,0 +1,52 @@
+import asyncio
+import random
+
+import pytest
+
+CATEGORIES = ["slugging", "on base", "runs", "hits", "walks", "strikeouts"]
+
+
+def random_ranks(rng):
+    ranks = {}
+    for category in CATEGORIES:
+        roll = rng.random()
+        if roll < 0.15:
+            continue  # category missing from the page
+        if roll < 0.25:
+            ranks[category] = -1  # validate_ranks sentinel
+        elif roll < 0.3:
+            ranks[category] = None
+        else:
+            ranks[category] = rng.randint(1, 30)
+    return ranks
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_scores_match_calculate_score(rt, seed):
+    rng = random.Random(seed)
+    criteria = {category: rng.choice([0, 2.5, 5, 9.5, 14]) for category in CATEGORIES}
+    home = [random_ranks(rng) for _ in range(300)]
+    away = [random_ranks(rng) for _ in range(300)]
+    projector = rt.PointsProjector(None, None)
+
+    async def one_by_one():
+        return [
+            await projector.calculate_score(h, a, criteria) for h, a in zip(home, away)
+        ]
+
+    batch = projector.calculate_scores_batch(home, away, criteria)
+
+    assert batch.tolist() == asyncio.run(one_by_one())
+
+
+def test_batch_scores_skip_categories_missing_from_one_side(rt):
+    criteria = {"slugging": 1, "runs": 1, "hits": 1}
+    home = [{"slugging": 2, "runs": -1}]
+    away = [{"slugging": 20, "runs": 10, "hits": 1}]
+
+    scores = rt.PointsProjector(None, None).calculate_scores_batch(
+        home, away, criteria
+    )
+
+    # slugging goes home, the -1 sentinel outranks 10 for runs, hits is skipped.
+    assert scores.tolist() == [2]
@@ -0,0 +1,153 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+DAY = "2023-04-02"
+
+
+def build_service(rt, config_path, session, **kwargs):
+    config, settings = rt.Config(config_path), rt.load_settings(config_path)
+    components = rt.build_components(
+        config, settings, session, parse_workers=0, window_days=1
+    )
+    return rt.ProjectionService(
+        session,
+        components.schedule_processor,
+        components.resolver,
+        components.projector,
+        components.scoring_criteria,
+        refresh_interval=0,
+        **kwargs,
+    )
+
+
+async def serve_requests(rt, config_path, requests):
+    """Run each (path, params) against a fresh service; (status, body, fetches)."""
+    settings = rt.load_settings(config_path)
+    responses = []
+    async with rt.http_client(settings) as session:
+        service = build_service(rt, config_path, session)
+        async with TestClient(TestServer(service.app())) as client:
+            for path, params in requests:
+                response = await client.get(path, params=params)
+                responses.append(
+                    (response.status, await response.json(), service.stats())
+                )
+    return responses
+
+
+def test_slate_and_matchup_are_served_from_memory(rt, config_path, stub_site):
+    slate, slate_again, matchup, matchup_again = asyncio.run(
+        serve_requests(
+            rt,
+            config_path,
+            [
+                ("/slate", {"date": DAY}),
+                ("/slate", {"date": DAY}),
+                ("/matchup", {"home": "Boston", "away": "Texas", "date": DAY}),
+                ("/matchup", {"home": "Boston", "away": "Texas", "date": DAY}),
+            ],
+        )
+    )
+    assert slate[0] == slate_again[0] == 200
+    assert slate[1] == slate_again[1] and slate[1]["games"]
+    fetches = slate[2]["page_fetches"]
+    assert fetches == 2 * len(slate[1]["games"])
+    assert slate_again[2]["page_fetches"] == fetches
+    assert slate_again[2]["cache_hit_rates"]["slates"] > 0
+
+    assert matchup[0] == matchup_again[0] == 200
+    assert matchup[1] == matchup_again[1]
+    assert matchup[1]["home"] == "Boston"
+    assert matchup_again[2]["page_fetches"] == matchup[2]["page_fetches"]
+    assert matchup[2]["page_fetches"] <= fetches + 2
+
+
+def test_matchup_rejects_unknown_teams(rt, config_path, stub_site):
+    unknown, missing = asyncio.run(
+        serve_requests(
+            rt,
+            config_path,
+            [
+                ("/matchup", {"home": "Atlantis", "away": "Texas", "date": DAY}),
+                ("/matchup", {"home": "Boston", "date": DAY}),
+            ],
+        )
+    )
+    assert unknown[0] == 404
+    assert unknown[1] == {"error": "Unknown team: Atlantis"}
+    assert unknown[2]["page_fetches"] == 0
+    assert missing[0] == 400
+
+
+def games_of(slate):
+    return [(game["home"], game["away"]) for game in slate or []]
+
+
+def test_refresh_swaps_in_new_ranks_only_after_fetching(
+    rt, config_path, stub_site, monkeypatch
+):
+    settings = rt.load_settings(config_path)
+    settings["http"]["max_retries"] = "0"
+
+    async def scenario():
+        async with rt.http_client(settings) as session:
+            service = build_service(rt, config_path, session)
+            games = await service.refresh([DAY])
+            records = dict(service.resolver.records)
+            slate = service.slates.get(DAY)
+            seen = []
+            refetch = service.resolver.refetch
+
+            async def watched(session, keys):
+                # Requests arriving now must still find every cached entry.
+                seen.append(
+                    (dict(service.resolver.records), service.slates.get(DAY))
+                )
+                await refetch(session, keys)
+
+            monkeypatch.setattr(service.resolver, "refetch", watched)
+            fetches = service.resolver.fetch_count
+            assert await service.refresh([DAY]) == games
+            refreshed = dict(service.resolver.records)
+
+            down = "http://127.0.0.1:9"
+            monkeypatch.setattr(rt.RankResolver, "STATS_URL", down + "/{slug}")
+            monkeypatch.setattr(rt.ScheduleProcessor, "SCHEDULE_URL", down + "/{date}")
+            assert await service.refresh([DAY]) == games
+            return records, slate, seen, fetches, refreshed, service
+
+    records, slate, seen, fetches, refreshed, service = asyncio.run(scenario())
+    assert games_of(slate) and seen[0] == (records, slate)
+    assert refreshed.keys() == records.keys()
+    assert all(refreshed[key] is not records[key] for key in records)
+    assert service.resolver.fetch_count > fetches
+    # The failed refresh kept what the last good one loaded.
+    assert seen[1] == (refreshed, slate)
+    assert service.resolver.records == refreshed
+    assert service.slates.get(DAY) == slate
+
+
+def test_slates_and_ranks_are_bounded(rt, config_path, stub_site):
+    settings = rt.load_settings(config_path)
+    dates = ["2023-04-02", "2023-04-03", "2023-04-04"]
+
+    async def scenario():
+        async with rt.http_client(settings) as session:
+            service = build_service(
+                rt, config_path, session, max_slates=2, max_team_dates=6
+            )
+            sizes, slates = [], []
+            for date_value in dates:
+                slates.append(await service.project_slate(date_value))
+                sizes.append((len(service.slates.cache), len(service.resolver.records)))
+            unbounded = build_service(rt, config_path, session)
+            expected = [await unbounded.project_slate(d) for d in dates]
+            return service, sizes, slates, expected
+
+    service, sizes, slates, expected = asyncio.run(scenario())
+    assert slates == expected
+    assert max(slates for slates, _ in sizes) == 2
+    assert max(records for _, records in sizes) <= 6
+    assert service.slates.get(dates[0]) is None
+    assert service.slates.get(dates[-1])
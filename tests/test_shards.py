@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+GAME = re.compile(r"#\d+ (.+?) at #\d+ (.+?)</a>")
+START, END = "2023-03-30", "2023-05-13"
+COMPARED = [
+    "games",
+    "matched",
+    "bets",
+    "wins",
+    "win_rate",
+    "roi",
+    "category_hit_rates",
+    "category_calls",
+]
+
+
+def write_results(fixtures, path, seed=0):
+    """Final scores, ties included, for every game on the fixture schedules."""
+    rng = random.Random(seed)
+    rows = []
+    for page in sorted((fixtures / "schedules").glob("*.html")):
+        for away, home in GAME.findall(page.read_text(encoding="utf-8")):
+            rows.append(
+                {
+                    "date": page.stem,
+                    "home": home,
+                    "away": away,
+                    "home_score": rng.randint(0, 6),
+                    "away_score": rng.randint(0, 6),
+                }
+            )
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def sharded_backtest(rt, root, by, results, config_path):
+    return rt.ShardedBacktest(
+        root, START, END, by=by, results_path=results, config_path=config_path
+    )
+
+
+def test_merged_shards_match_one_unsharded_run(rt, tmp_path, config_path, stub_site):
+    results = write_results(stub_site.root, tmp_path / "results.csv")
+    whole = sharded_backtest(rt, tmp_path / "whole", "season", results, config_path)
+    sharded = sharded_backtest(rt, tmp_path / "months", "month", results, config_path)
+    assert [shard.id for shard in sharded.shards] == ["2023-03", "2023-04", "2023-05"]
+
+    assert {status["status"] for status in whole.run()} == {"ok"}
+    assert {status["status"] for status in sharded.run()} == {"ok"}
+    with open(whole.shard_dir("2023") / "metrics.json", encoding="utf-8") as f:
+        expected = json.load(f)
+    merged = sharded.merge(str(tmp_path / "merged.csv"))
+
+    assert expected["bets"] > 0
+    assert sum(expected["category_calls"].values()) > 0
+    for key in COMPARED:
+        assert merged[key] == pytest.approx(expected[key]), key
+    merged_rows = pd.read_csv(tmp_path / "merged.csv")
+    whole_rows = pd.read_csv(whole.shard_dir("2023") / "projections.csv")
+    pd.testing.assert_frame_equal(merged_rows, whole_rows)
+
+
+def test_merge_aligns_signals_by_game_not_position(
+    rt, tmp_path, config_path, stub_site
+):
+    results = write_results(stub_site.root, tmp_path / "results.csv")
+    sharded = sharded_backtest(rt, tmp_path / "months", "month", results, config_path)
+    sharded.run()
+    expected = sharded.merge()
+    # Rows written in another order must still meet their own signals.
+    for shard in sharded.shards:
+        path = sharded.shard_dir(shard.id) / "projections.csv"
+        rows = pd.read_csv(path)
+        rows.iloc[::-1].to_csv(path, index=False)
+    reordered = sharded.merge()
+    for key in COMPARED:
+        assert reordered[key] == pytest.approx(expected[key]), key
+
+
+def write_lock(backtest, shard_id, pid, age):
+    lock = backtest.shard_dir(shard_id) / backtest.LOCK
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    lock.write_text(
+        json.dumps({"host": os.uname().nodename, "pid": pid, "claimed_at": 0}),
+        encoding="utf-8",
+    )
+    stamp = time.time() - age
+    os.utime(lock, (stamp, stamp))
+    return lock
+
+
+def test_stale_lock_of_live_process_is_not_taken(rt, tmp_path):
+    backtest = rt.ShardedBacktest(tmp_path, START, END, lock_timeout=60)
+    write_lock(backtest, "2023-04", os.getpid(), age=3600)
+    assert not backtest.claim("2023-04")
+
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    write_lock(backtest, "2023-04", dead.pid, age=30)
+    assert not backtest.claim("2023-04")
+    write_lock(backtest, "2023-04", dead.pid, age=3600)
+    assert backtest.claim("2023-04")
+
+
+def test_running_shard_keeps_its_lock_fresh(rt, tmp_path):
+    backtest = rt.ShardedBacktest(tmp_path, START, END, lock_timeout=0.4)
+    assert backtest.claim("2023-04")
+    lock = write_lock(backtest, "2023-04", os.getpid(), age=3600)
+
+    async def run_briefly():
+        heartbeat = asyncio.create_task(backtest._heartbeat("2023-04"))
+        await asyncio.sleep(0.25)
+        heartbeat.cancel()
+
+    asyncio.run(run_briefly())
+    assert time.time() - lock.stat().st_mtime < backtest.lock_timeout
+
+
+def test_offline_rerun_replays_each_shards_snapshots(
+    rt, tmp_path, config_path, stub_site
+):
+    results = write_results(stub_site.root, tmp_path / "results.csv")
+    snapshots = str(tmp_path / "snapshots")
+
+    def backtest(root, offline):
+        return rt.ShardedBacktest(
+            root,
+            START,
+            END,
+            by="month",
+            results_path=results,
+            config_path=config_path,
+            snapshot_dir=snapshots,
+            offline=offline,
+        )
+
+    online = backtest(tmp_path / "online", offline=False)
+    assert {status["status"] for status in online.run()} == {"ok"}
+    offline = backtest(tmp_path / "offline", offline=True)
+    assert {status["status"] for status in offline.run()} == {"ok"}
+    expected, replayed = online.merge(), offline.merge()
+    for key in COMPARED:
+        assert replayed[key] == pytest.approx(expected[key]), key
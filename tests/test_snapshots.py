@@ -0,0 +1,144 @@
+import asyncio
+import random
+
+import pytest
+
+DAY = "2023-04-02"
+
+
+def page(seed, size=4000):
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(size))
+
+
+def blobs(store):
+    return sorted(path.name for path in store.blob_dir.glob("*/*.gz"))
+
+
+def test_round_trip_survives_reopen(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path)
+    store.put("http://site/a", page(1), DAY)
+    store.put("http://site/b", page(1), DAY)
+    store.put("http://site/a", page(2), "2023-04-03")
+    assert store.get("http://site/a", DAY) == page(1)
+    assert store.get("http://site/c", DAY) is None
+    store.close()
+
+    reopened = rt.SnapshotStore(tmp_path)
+    assert reopened.get("http://site/a", DAY) == page(1)
+    assert reopened.get("http://site/b", DAY) == page(1)
+    assert reopened.get("http://site/a", "2023-04-03") == page(2)
+    assert len(blobs(reopened)) == 2
+    assert reopened.total_bytes == store.total_bytes
+
+
+def test_refetching_unchanged_page_keeps_its_blob(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path, max_bytes=10**6)
+    store.put("http://site/a", page(1), DAY)
+    store.put("http://site/a", page(1), DAY)
+    assert len(blobs(store)) == 1
+    assert rt.SnapshotStore(tmp_path).get("http://site/a", DAY) == page(1)
+
+
+def test_offline_miss_raises(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path, offline=True)
+    with pytest.raises(rt.SnapshotStoreError):
+        asyncio.run(store.fetch(None, "http://site/missing", DAY))
+
+
+def test_eviction_keeps_store_under_byte_cap(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path)
+    size = len(__import__("gzip").compress(page(0).encode()))
+    store.max_bytes = 3 * size + size // 2
+    for i in range(3):
+        store.put(f"http://site/{i}", page(i), DAY)
+    # Reading page 0 makes page 1 the least recently used.
+    assert store.get("http://site/0", DAY) == page(0)
+    for i in range(3, 10):
+        store.put(f"http://site/{i}", page(i), DAY)
+        assert store.total_bytes <= store.max_bytes
+    assert store.get("http://site/1", DAY) is None
+    assert store.get("http://site/9", DAY) == page(9)
+    assert len(blobs(store)) == len(store.index) == 3
+    store.close()
+    reopened = rt.SnapshotStore(tmp_path)
+    assert list(reopened.index) == list(store.index)
+    assert reopened.total_bytes == store.total_bytes
+
+
+def test_access_times_are_persisted(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path)
+    store.put("http://site/a", page(1), DAY)
+    store.put("http://site/b", page(2), DAY)
+    store.get("http://site/a", DAY)
+    accessed = store.index[store.make_key("http://site/a", DAY)]["accessed_at"]
+    store.close()
+    reopened = rt.SnapshotStore(tmp_path)
+    key = reopened.make_key("http://site/a", DAY)
+    assert reopened.index[key]["accessed_at"] == accessed
+    assert list(reopened.index)[-1] == key
+
+
+def test_puts_append_to_journal_and_compact(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path)
+    store.MIN_COMPACT_LINES = 8
+    for i in range(8):
+        store.put(f"http://site/{i}", page(i, 200), DAY)
+    assert not (tmp_path / store.INDEX_FILE).exists()
+    journal = (tmp_path / store.JOURNAL_FILE).read_text().splitlines()
+    assert len(journal) == 8
+    store.put("http://site/8", page(8, 200), DAY)
+    assert (tmp_path / store.INDEX_FILE).exists()
+    assert not (tmp_path / store.JOURNAL_FILE).exists()
+    assert len(rt.SnapshotStore(tmp_path).index) == 9
+
+
+def test_offline_store_writes_nothing(rt, tmp_path):
+    writer = rt.SnapshotStore(tmp_path)
+    writer.put("http://site/a", page(1), DAY)
+    writer.close()
+    before = sorted(path.name for path in tmp_path.rglob("*"))
+    journal = (tmp_path / writer.JOURNAL_FILE).read_text()
+    reader = rt.SnapshotStore(tmp_path, offline=True)
+    assert reader.get("http://site/a", DAY) == page(1)
+    reader.close()
+    assert sorted(path.name for path in tmp_path.rglob("*")) == before
+    assert (tmp_path / writer.JOURNAL_FILE).read_text() == journal
+
+
+def test_index_rewrites_grow_logarithmically(rt, tmp_path, monkeypatch):
+    store = rt.SnapshotStore(tmp_path, max_bytes=10**9)
+    store.MIN_COMPACT_LINES = 8
+    saves = []
+    save_index = store._save_index
+    monkeypatch.setattr(store, "_save_index", lambda: saves.append(save_index()))
+    for i in range(2000):
+        store.put(f"http://site/{i}", f"page {i}", DAY)
+    assert len(saves) <= 12
+    assert len(rt.SnapshotStore(tmp_path).index) == 2000
+
+
+def test_close_sweeps_expired_entries_and_orphan_blobs(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path, ttl=60)
+    store.put("http://site/old", page(1), DAY)
+    store.put("http://site/new", page(2), DAY)
+    store.index[store.make_key("http://site/old", DAY)]["fetched_at"] -= 3600
+    orphan = store.blob_dir / "ff" / ("f" * 64 + ".gz")
+    orphan.parent.mkdir(parents=True, exist_ok=True)
+    orphan.write_bytes(b"")
+    store.close()
+
+    reopened = rt.SnapshotStore(tmp_path, ttl=60)
+    assert reopened.get("http://site/old", DAY) is None
+    assert reopened.get("http://site/new", DAY) == page(2)
+    assert len(reopened.index) == 1
+    assert len(blobs(reopened)) == 1
+
+
+def test_offline_replay_serves_expired_pages(rt, tmp_path):
+    store = rt.SnapshotStore(tmp_path)
+    store.put("http://site/a", page(1), DAY)
+    store.close()
+    offline = rt.SnapshotStore(tmp_path, ttl=0, offline=True)
+    assert asyncio.run(offline.fetch(None, "http://site/a", DAY)) == page(1)
+    assert rt.SnapshotStore(tmp_path, ttl=0).get("http://site/a", DAY) is None
@@ -0,0 +1,149 @@
+import ast
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+# What a command may add to starting the interpreter and importing runtime
+# (NumPy and the standard library): parsing its arguments and loading its
+# cached parts, not compiling the sources.
+STARTUP_ALLOWANCE = 0.1
+
+LOADED_PARTS = """
+import runpy, sys
+import runtime
+sys.argv = ["main.py", *sys.argv[1:]]
+try:
+    runpy.run_path("main.py", run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps(runtime.LOADED))
+"""
+
+
+@pytest.mark.parametrize("command", [["--help"], ["backtest", "--help"]])
+def test_cli_help_starts_without_heavy_imports(rt, command):
+    base = rt.benchmark_startup(["-c", "import runtime"], repeat=5)
+    result = rt.benchmark_startup([str(ROOT / "main.py"), *command], repeat=5)
+    assert result["returncode"] == 0, result["stderr"]
+    assert result["heavy_imports"] == []
+    budget = base["best_s"] + STARTUP_ALLOWANCE
+    assert rt.check_startup([result], budget=budget) == []
+
+
+def loaded_parts(*argv):
+    completed = subprocess.run(
+        [sys.executable, "-c", "import json" + LOADED_PARTS, *argv],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def test_commands_load_only_their_parts():
+    assert loaded_parts("--help") == ["Models"]
+    parts = loaded_parts(
+        "backtest",
+        str(ROOT / "tests/fixtures/projections.csv"),
+        str(ROOT / "tests/fixtures/results.csv"),
+    )
+    assert set(parts) == {
+        "Models",
+        "Lazy",
+        "Metrics",
+        "backtest",
+        "Writer",
+        "Statistics",
+    }
+
+
+def part_names(rt):
+    """Each part's parsed tree, and the part that defines each top-level name."""
+    trees, owners = {}, {}
+    for part in rt.MODULES:
+        trees[part] = ast.parse((ROOT / f"{part}.py").read_text(encoding="utf-8"))
+        for node in trees[part].body:
+            targets = [node]
+            if isinstance(node, ast.Assign):
+                targets = node.targets
+            for target in targets:
+                name = getattr(target, "name", None) or getattr(target, "id", None)
+                if name:
+                    owners.setdefault(name, part)
+    return trees, owners
+
+
+def closure(rt, parts):
+    wanted, pending = set(), list(parts)
+    while pending:
+        part = pending.pop()
+        if part not in wanted:
+            wanted.add(part)
+            pending.extend(rt.REQUIRES[part])
+    return wanted
+
+
+def used_parts(node, owners, part):
+    """Parts whose names ``node`` reads; names it binds itself are local."""
+    local = {arg.arg for arg in ast.walk(node) if isinstance(arg, ast.arg)}
+    local |= {
+        name.id
+        for name in ast.walk(node)
+        if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Store)
+    }
+    return {
+        owners[name.id]
+        for name in ast.walk(node)
+        if isinstance(name, ast.Name)
+        and name.id not in local
+        and owners.get(name.id, part) != part
+    }
+
+
+def test_required_parts_cover_every_name_used(rt):
+    trees, owners = part_names(rt)
+    commands = {
+        "scrape": "scrape",
+        "serve": "serve",
+        "main": "project",
+        "bootstrap": "backtest",
+        "report_intervals": "backtest",
+        "compare_projections": "compare",
+        "convert_output": "write",
+    }
+    for part, tree in trees.items():
+        if part != "main":
+            assert used_parts(tree, owners, part) <= closure(rt, [part]), part
+            continue
+        for node in tree.body:
+            name = getattr(node, "name", None)
+            if name is None or name == "build_parser":
+                continue
+            parts = ["main"]
+            if name in commands:
+                parts += rt.COMMAND_MODULES[commands[name]]
+            assert used_parts(node, owners, part) <= closure(rt, parts), name
+
+
+def test_parts_are_compiled_once(rt, monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    rt._code("Models")
+
+    def compile(*args, **kwargs):
+        raise AssertionError("recompiled an unchanged part")
+
+    # Parts compile through the runtime namespace, so this shadows the builtin.
+    monkeypatch.setattr(rt, "compile", compile, raising=False)
+    assert rt._code("Models").co_filename == str(ROOT / "Models.py")
+
+
+def test_crashing_command_reports_stderr(rt):
+    result = rt.benchmark_startup([str(ROOT / "main.py"), "--no-such-flag"], repeat=1)
+    failures = rt.check_startup([result], budget=30.0)
+    assert len(failures) == 1
+    assert "exited with 2" in failures[0]
+    assert "unrecognized arguments: --no-such-flag" in failures[0]
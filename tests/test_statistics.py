@@ -0,0 +1,101 @@
+import tracemalloc
+
+import numpy as np
+
+
+def gather_totals(bootstrap, units):
+    """Reference: sum the picked rows of ``units`` for every resample."""
+    rng = np.random.default_rng(bootstrap.seed)
+    totals = []
+    for start in range(0, bootstrap.resamples, bootstrap.chunk_size):
+        rows = min(bootstrap.chunk_size, bootstrap.resamples - start)
+        picks = rng.integers(0, len(units), size=(rows, len(units)))
+        totals.append(units[picks].sum(axis=1))
+    return np.vstack(totals)
+
+
+def season_units(games=400, seed=0):
+    rng = np.random.default_rng(seed)
+    bets = rng.random(games) < 0.8
+    wins = bets & (rng.random(games) < 0.55)
+    profit = np.where(wins, 100 / 110, -1.0) * bets
+    return np.column_stack([bets, wins, profit]).astype(np.float64)
+
+
+def test_resample_totals_match_row_gather(rt):
+    units = season_units()
+    bootstrap = rt.Bootstrap(resamples=1100, chunk_size=300, seed=7)
+    totals = bootstrap.resample_totals(units)
+    np.testing.assert_allclose(totals, gather_totals(bootstrap, units), atol=1e-9)
+    np.testing.assert_array_equal(totals, bootstrap.resample_totals(units))
+
+
+def test_resample_memory_is_counts_not_gathered_rows(rt):
+    units = season_units(games=3000)
+    bootstrap = rt.Bootstrap(resamples=500, chunk_size=500)
+    gathered = bootstrap.chunk_size * len(units) * units.shape[1] * 8
+    tracemalloc.start()
+    bootstrap.resample_totals(units)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < gathered
+
+
+def test_interval_brackets_the_estimate(rt):
+    outcomes = rt.GameOutcomes(None, np.arange(400) // 10, season_units())
+    bootstrap = rt.Bootstrap(resamples=2000)
+    interval = bootstrap.interval(outcomes)
+    for metric in ("win_rate", "roi"):
+        assert interval[metric]["low"] <= interval[metric]["estimate"]
+        assert interval[metric]["estimate"] <= interval[metric]["high"]
+    by_date = bootstrap.interval(outcomes, by_date=True)
+    assert by_date["method"] == "block-by-date"
+    assert by_date["win_rate"]["estimate"] == interval["win_rate"]["estimate"]
+
+
+def outcomes(rt, stats, first=0):
+    """Outcomes for games ``first``.. of a season, ten to a day."""
+    games = np.arange(first, first + len(stats))
+    keys = rt.pd.DataFrame(
+        {
+            "date": [f"2023-{4 + g // 300:02d}-{g // 10 % 30 + 1:02d}" for g in games],
+            "home": [f"home{g}" for g in games],
+            "away": [f"away{g}" for g in games],
+        }
+    )
+    day = rt.pd.factorize(keys["date"], sort=True)[0]
+    return rt.GameOutcomes(keys, day, stats)
+
+
+def test_paired_compare_aligns_shared_games(rt):
+    units = season_units()
+    base = outcomes(rt, units[:300])
+    candidate = outcomes(rt, units[100:], first=100)
+    aligned_base, aligned_candidate = base.align(candidate)
+    assert len(aligned_base) == len(aligned_candidate) == 200
+    np.testing.assert_array_equal(aligned_base.stats, units[100:300])
+    np.testing.assert_array_equal(aligned_candidate.stats, units[100:300])
+
+    result = rt.Bootstrap(resamples=500).compare(base, candidate)
+    assert result["games"] == 200
+    for metric in ("win_rate", "roi"):
+        assert result[metric]["estimate"] == 0.0
+        assert result[metric]["low"] == result[metric]["high"] == 0.0
+        assert result[metric]["p_value"] == 1.0
+
+
+def test_paired_compare_detects_a_better_candidate(rt):
+    units = season_units()
+    better = units.copy()
+    # Turn every other losing bet into a win.
+    losses = np.flatnonzero((units[:, 0] == 1) & (units[:, 1] == 0))[::2]
+    better[losses, 1] = 1
+    better[losses, 2] = 100 / 110
+    base, candidate = outcomes(rt, units), outcomes(rt, better)
+    for by_date in (False, True):
+        result = rt.Bootstrap(resamples=2000).compare(base, candidate, by_date)
+        for metric in ("win_rate", "roi"):
+            assert result[metric]["estimate"] > 0
+            assert result[metric]["candidate"] > result[metric]["base"]
+            assert result[metric]["low"] > 0
+            assert result[metric]["p_value"] < 0.01
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+TEAMS = ["Boston", "Texas", "Miami", "Houston", "Seattle", "Toronto"]
+
+
+def schedule(games=120, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(games):
+        home, away = rng.sample(TEAMS, 2)
+        day = rng.randint(1, 30)
+        rows.append({"date": f"2023-04-{day:02d}", "home": home, "away": away})
+    return rows
+
+
+def ordered(rows):
+    return sorted(rows, key=lambda row: (row["date"], row["home"], row["away"]))
+
+
+@pytest.mark.parametrize("start, end", [("2023-04-05", "2023-04-12"), (None, None)])
+def test_index_queries_match_a_scan(rt, start, end):
+    rows = schedule()
+    index = rt.ScheduleIndex(rows)
+
+    def within(row):
+        return (start is None or row["date"] >= start) and (
+            end is None or row["date"] <= end
+        )
+
+    if start is not None:
+        assert ordered(index.between(start, end)) == ordered(filter(within, rows))
+    for team in TEAMS:
+        games = [
+            row for row in rows if team in (row["home"], row["away"]) and within(row)
+        ]
+        assert ordered(index.for_team(team, start, end)) == ordered(games)
+    for day, games in index.group_by_date().items():
+        assert games == index.on(day)
+        assert {row["date"] for row in games} == {day.strftime(rt.DATE_FORMAT)}
+    assert sum(map(len, index.group_by_date().values())) == len(rows)
+
+
+def test_unknown_team_has_no_games_and_is_not_registered(rt):
+    index = rt.ScheduleIndex(schedule(games=10))
+    teams = len(index.teams)
+    assert index.teams.lookup("Nowhere") == rt.TeamRegistry.UNKNOWN
+    assert index.team_positions("Nowhere") == []
+    assert index.for_team("Nowhere", "2023-04-01", "2023-04-30") == []
+    assert len(index.teams) == teams
+    assert not index.teams.known("Nowhere")
@@ -0,0 +1,94 @@
+import pytest
+
+ROWS = [
+    {"date": "2023-04-28", "home": "Boston", "away": "Texas", "projected": 2},
+    {"date": "2023-04-29", "home": "Texas", "away": "Boston", "projected": -1},
+    {"date": "2023-05-01", "home": "Miami", "away": "Houston", "projected": 0},
+    {"date": "2023-05-02", "home": "Houston", "away": "Miami", "projected": 3},
+]
+FIELDS = ["date", "home", "away", "projected"]
+
+
+@pytest.fixture(params=[".parquet", ".arrow"])
+def partitioned(rt, request, tmp_path):
+    path = str(tmp_path / f"projections{request.param}")
+    writer = rt.DataWriter.infer_writer(
+        path, {"fields": FIELDS, "partition_by": "month", "compression": None}
+    )
+    return writer, path
+
+
+def test_partitioned_rewrite_replaces_rows(rt, partitioned):
+    writer, path = partitioned
+    writer.write_stream(path, ROWS)
+    writer.write_stream(path, ROWS)
+    assert rt.read_columnar(path).num_rows == len(ROWS)
+
+
+def test_partitioned_append_adds_rows(rt, partitioned):
+    writer, path = partitioned
+    writer.write_stream(path, ROWS)
+    writer.write_stream(path, ROWS, append=True)
+    assert rt.read_columnar(path).num_rows == 2 * len(ROWS)
+
+
+def test_partitioned_rewrite_keeps_untouched_partitions(rt, partitioned):
+    writer, path = partitioned
+    writer.write_stream(path, ROWS, append=True)
+    writer.write_stream(path, ROWS[:2], append=True)
+    writer.write_stream(path, ROWS[:1])
+    table = rt.read_columnar(path, columns=["date", "month"]).to_pandas()
+    assert table["month"].tolist().count(4) == 1
+    assert table["month"].tolist().count(5) == 2
+
+
+@pytest.mark.parametrize("partition_by", [None, "month"])
+@pytest.mark.parametrize("ext", [".parquet", ".arrow"])
+def test_columnar_output_loads_back(rt, tmp_path, ext, partition_by):
+    path = str(tmp_path / f"projections{ext}")
+    writer = rt.DataWriter.infer_writer(
+        path, {"fields": FIELDS, "partition_by": partition_by, "compression": None}
+    )
+    writer.write_stream(path, ROWS)
+    loaded = rt.load_actual_results(path, require_scores=False)
+    loaded = loaded.sort_values("date").reset_index(drop=True)
+    assert loaded[FIELDS].to_dict("records") == ROWS
+
+
+def test_columnar_results_feed_backtest(rt, tmp_path):
+    path = str(tmp_path / "results.parquet")
+    results = [dict(row, home_score=4, away_score=2) for row in ROWS]
+    fields = FIELDS + ["home_score", "away_score"]
+    writer = rt.DataWriter.infer_writer(
+        path, {"fields": fields, "partition_by": "season", "compression": None}
+    )
+    writer.write_stream(path, results)
+    metrics = rt.Backtest().evaluate(ROWS, rt.load_actual_results(path))
+    assert (metrics["matched"], metrics["bets"], metrics["wins"]) == (4, 3, 2)
+
+
+@pytest.mark.parametrize("ext", [".json", ".xlsx"])
+def test_non_streaming_writer_refuses_to_append(rt, tmp_path, ext):
+    path = tmp_path / f"projections{ext}"
+    path.write_text("existing", encoding="utf-8")
+    writer = rt.DataWriter.infer_writer(str(path))
+
+    async def rows():
+        for row in ROWS:
+            yield row
+
+    with pytest.raises(rt.DataWriterError):
+        writer.write_stream(str(path), ROWS, append=True)
+    with pytest.raises(rt.DataWriterError):
+        rt.asyncio.run(writer.write_stream_async(str(path), rows(), append=True))
+    assert path.read_text(encoding="utf-8") == "existing"
+
+
+def test_rows_with_missing_keys_are_rejected(rt, tmp_path):
+    path = str(tmp_path / "projections.csv")
+    rows = ROWS[:2] + [{key: ROWS[2][key] for key in FIELDS[:3]}]
+    writer = rt.DataWriter.infer_writer(path)
+    with pytest.raises(ValueError, match="Inconsistent"):
+        writer.write_stream(path, rows)
+    with pytest.raises(ValueError, match="Inconsistent"):
+        writer.write_data(path, rows)